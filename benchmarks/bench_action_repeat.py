@@ -0,0 +1,45 @@
+"""
+Measure the controller and observation cost per simulated second with the "action_repeat" setting, for a controller
+which reads every asteroid of the data it is given
+
+Run from the repository root with:
+python -m benchmarks.bench_action_repeat
+"""
+import time
+
+from src.fuzzy_asteroids.fuzzy_asteroids import HeadlessEnvironment, ControllerBase, SpaceShip, Scenario
+
+
+class Aiming(ControllerBase):
+    @property
+    def name(self) -> str:
+        return "Aiming"
+
+    def actions(self, ship: SpaceShip, input_data) -> None:
+        x, y = ship.position
+        nearest = min(input_data["asteroids"], default=None,
+                      key=lambda asteroid: (asteroid["position"][0] - x) ** 2 + (asteroid["position"][1] - y) ** 2)
+        ship.turn_rate = 90.0 if nearest else 0.0
+        ship.thrust = 100.0
+        ship.fire_bullet = True
+
+
+def run(repeat: int, seconds: float) -> float:
+    scenario = Scenario(num_asteroids=30, seed=1, time_limit=seconds, ship_states=[
+        {"position": (300, 400), "team": 1, "lives": 1000}, {"position": (700, 400), "team": 2, "lives": 1000}])
+    game = HeadlessEnvironment(settings={"action_repeat": repeat}, track_compute_cost=True)
+
+    t0 = time.perf_counter()
+    score = game.run(controller={1: Aiming(), 2: Aiming()}, scenario=scenario)
+    elapsed = time.perf_counter() - t0
+    calls = sum(stats["count"] for stats in score.evaluation_stats)
+    controller_time = sum(stats["count"] * stats["mean"] for stats in score.evaluation_stats)
+    return elapsed / score.time, controller_time / score.time, calls / score.time
+
+
+if __name__ == "__main__":
+    seconds = 20
+    for repeat in (1, 3, 6):
+        total, controller, calls = run(repeat, seconds)
+        print(f"action_repeat={repeat}: {1E3 * total:6.1f} ms per simulated second, {1E3 * controller:6.1f} ms in the "
+              f"controllers (with observations), {calls:5.1f} calls")
@@ -0,0 +1,54 @@
+"""
+Measure how many sprites are constructed per frame with and without the bullet/asteroid recycling pools
+
+Run from the repository root with:
+python -m benchmarks.bench_allocations
+"""
+import gc
+import time
+import tracemalloc
+
+from src.fuzzy_asteroids.fuzzy_asteroids import HeadlessEnvironment, ControllerBase, SpaceShip, Scenario
+
+
+class Shooter(ControllerBase):
+    @property
+    def name(self) -> str:
+        return "Shooter"
+
+    def actions(self, ship: SpaceShip, input_data) -> None:
+        ship.turn_rate = 90.0
+        ship.thrust = 100.0
+        ship.fire_bullet = True
+
+
+def measure(pooled: bool, frames: int = 1800) -> dict:
+    scenario = Scenario(num_asteroids=40, seed=1, time_limit=frames / 30, ship_states=[
+        {"position": (300, 400), "team": 1, "lives": 1000}, {"position": (700, 400), "team": 2, "lives": 1000}])
+    game = HeadlessEnvironment()
+    bullet_pool, asteroid_pool = game.bullet_pool, game.asteroid_pool
+    for pool in (bullet_pool, asteroid_pool):
+        pool.max_size = 1024 if pooled else 0
+
+    gc.collect()
+    collections = sum(stat["collections"] for stat in gc.get_stats())
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    score = game.run(controller={1: Shooter(), 2: Shooter()}, scenario=scenario)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "sprites constructed / frame": (bullet_pool.created + asteroid_pool.created) / score.frame_count,
+        "sprites reused / frame": (bullet_pool.reused + asteroid_pool.reused) / score.frame_count,
+        "gc collections / 1000 frames": 1000 * (sum(stat["collections"] for stat in gc.get_stats()) - collections) / score.frame_count,
+        "peak traced memory (kB)": peak / 1E3,
+        "time / frame (us, traced)": 1E6 * elapsed / score.frame_count,
+    }
+
+
+if __name__ == "__main__":
+    results = {"no pools": measure(pooled=False), "pools": measure(pooled=True)}
+    for key in results["pools"]:
+        print(f"{key:30s} {results['no pools'][key]:10.2f} {results['pools'][key]:10.2f}")
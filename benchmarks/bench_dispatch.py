@@ -0,0 +1,51 @@
+"""
+Measure the overhead of running a controller call with a deadline, for the asyncio event loop and thread pool used
+before ``dispatch.DeadlineDispatcher`` and for the dispatcher itself
+
+Run from the repository root with:
+python -m benchmarks.bench_dispatch
+"""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.fuzzy_asteroids.dispatch import DeadlineDispatcher
+
+
+def controller() -> None:
+    pass
+
+
+def asyncio_overhead(calls: int, timeout: float) -> float:
+    executor = ThreadPoolExecutor(4)
+    loop = asyncio.new_event_loop()
+
+    async def coro():
+        await loop.run_in_executor(executor, controller)
+
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        loop.run_until_complete(asyncio.wait_for(coro(), timeout=timeout))
+    elapsed = time.perf_counter() - t0
+
+    loop.close()
+    executor.shutdown()
+    return elapsed / calls
+
+
+def dispatcher_overhead(calls: int, timeout: float) -> float:
+    dispatcher = DeadlineDispatcher()
+
+    t0 = time.perf_counter()
+    for _ in range(calls):
+        dispatcher.run(1, controller, (), timeout=timeout)
+    elapsed = time.perf_counter() - t0
+
+    dispatcher.close()
+    return elapsed / calls
+
+
+if __name__ == "__main__":
+    calls, timeout = 20000, 0.5 / 60
+    for name, function in (("asyncio + thread pool", asyncio_overhead), ("deadline dispatcher", dispatcher_overhead)):
+        print(f"{name:>22}: {1E6 * function(calls, timeout):7.1f} us per call")
@@ -0,0 +1,79 @@
+"""
+Measure the time of evaluating a two input, two output fuzzy system on the asteroids of a frame, with a loop over the
+asteroids (one inference per asteroid, as hand written controllers do) and with the compiled systems of
+``fuzzy_inference``, against the 1/60 s budget of a frame
+
+Run from the repository root with:
+python -m benchmarks.bench_fuzzy_inference
+"""
+import time
+
+import numpy as np
+
+from src.fuzzy_asteroids.fuzzy_inference import (FuzzyVariable, Rule, MamdaniSystem, SugenoSystem, TriangularMF,
+                                                 TrapezoidalMF, GaussianMF)
+
+DISTANCE = FuzzyVariable("distance", 0, 1000, {"near": TrapezoidalMF(0, 0, 100, 400),
+                                               "mid": TriangularMF(100, 400, 700),
+                                               "far": TrapezoidalMF(400, 700, 1000, 1000)})
+ANGLE = FuzzyVariable("angle", -180, 180, {"left": TriangularMF(-180, -180, 0),
+                                           "ahead": GaussianMF(0, 30),
+                                           "right": TriangularMF(0, 180, 180)})
+TURN = FuzzyVariable("turn", -180, 180, {"left": TriangularMF(-180, -90, 0),
+                                         "none": TriangularMF(-45, 0, 45),
+                                         "right": TriangularMF(0, 90, 180)})
+THRUST = FuzzyVariable("thrust", -480, 480, {"back": TriangularMF(-480, -480, 0),
+                                             "forward": TriangularMF(0, 480, 480)})
+
+TURNS = {"left": "left", "ahead": "none", "right": "right"}
+THRUSTS = {"near": "back", "mid": "forward", "far": "forward"}
+RULES = [Rule({"distance": distance, "angle": angle}, {"turn": TURNS[angle], "thrust": THRUSTS[distance]})
+         for distance in DISTANCE.terms for angle in ANGLE.terms]
+
+
+def python_loop(x_distance: np.ndarray, x_angle: np.ndarray) -> None:
+    universes = {variable.name: variable.universe for variable in (TURN, THRUST)}
+    for distance, angle in zip(x_distance.tolist(), x_angle.tolist()):
+        memberships = {"distance": DISTANCE.memberships(distance), "angle": ANGLE.memberships(angle)}
+        for variable in (TURN, THRUST):
+            aggregated = np.zeros(variable.resolution)
+            for rule in RULES:
+                strength = min(float(memberships[name][term]) for name, term in rule.antecedents.items())
+                term = variable.terms[rule.consequents[variable.name]](universes[variable.name])
+                aggregated = np.maximum(aggregated, np.minimum(strength, term))
+            aggregated @ universes[variable.name] / aggregated.sum()
+
+
+def centroid(variable: FuzzyVariable, term: str) -> float:
+    memberships = variable.terms[term](variable.universe)
+    return float(memberships @ variable.universe / memberships.sum())
+
+
+def per_call(function, repeats: int, *args) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeats):
+        function(*args)
+    return (time.perf_counter() - t0) / repeats
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    mamdani = MamdaniSystem([DISTANCE, ANGLE], [TURN, THRUST], RULES)
+    weighted = MamdaniSystem([DISTANCE, ANGLE], [TURN, THRUST], RULES, defuzzification="weighted_average")
+    # Same rules with the centroids of the output terms as constant outputs
+    sugeno = SugenoSystem([DISTANCE, ANGLE], ["turn", "thrust"],
+                          [Rule(rule.antecedents, {"turn": centroid(TURN, rule.consequents["turn"]),
+                                                   "thrust": centroid(THRUST, rule.consequents["thrust"])})
+                           for rule in RULES])
+    table = mamdani.lookup(resolution=(101, 73))
+
+    print(f"{len(RULES)} rules, frame budget {1E3 / 60:.2f} ms")
+    for asteroids in (1, 10, 50, 200):
+        x_distance, x_angle = rng.uniform(0, 1000, asteroids), rng.uniform(-180, 180, asteroids)
+        inputs = {"distance": x_distance, "angle": x_angle}
+        print(f"{asteroids:>4} asteroids: "
+              f"python loop {1E3 * per_call(python_loop, max(1, 200 // asteroids), x_distance, x_angle):8.3f} ms, "
+              f"mamdani {1E3 * per_call(mamdani.evaluate, 500, inputs):.3f} ms, "
+              f"weighted average {1E3 * per_call(weighted.evaluate, 500, inputs):.3f} ms, "
+              f"sugeno {1E3 * per_call(sugeno.evaluate, 500, inputs):.3f} ms, "
+              f"lookup table {1E3 * per_call(table.evaluate, 500, inputs):.3f} ms")
@@ -0,0 +1,57 @@
+"""
+Measure the games per second of a genetic algorithm generation (a population of parameter vectors over a portfolio
+of scenarios and seeds) played in this process and spread over worker processes
+
+Run from the repository root with:
+python -m benchmarks.bench_population
+"""
+import os
+import time
+
+import numpy as np
+
+from src.fuzzy_asteroids.fuzzy_asteroids import ControllerBase, SpaceShip, Scenario
+from src.fuzzy_asteroids.population import PopulationEvaluator
+from src.fuzzy_asteroids.util import Score
+
+
+class Tunable(ControllerBase):
+    def __init__(self, turn_rate: float, thrust: float, fire: float):
+        self.turn_rate = turn_rate
+        self.thrust = thrust
+        self.fire = fire
+
+    @property
+    def name(self) -> str:
+        return "Tunable"
+
+    def actions(self, ship: SpaceShip, input_data) -> None:
+        ship.turn_rate = self.turn_rate
+        ship.thrust = self.thrust
+        ship.fire_bullet = self.fire > 0.5
+
+
+def build(parameters: np.ndarray) -> ControllerBase:
+    return Tunable(*parameters)
+
+
+def fitness(score: Score) -> float:
+    return sum(score.asteroids_hit) - 10 * sum(score.deaths)
+
+
+if __name__ == "__main__":
+    portfolio = [Scenario(name=f"scenario {idx}", num_asteroids=5 + 5 * idx, time_limit=10,
+                          ship_states=[{"position": (400, 400)}]) for idx in range(4)]
+    rng = np.random.default_rng(0)
+    population = np.column_stack([rng.uniform(-180, 180, 24), rng.uniform(-100, 100, 24), rng.uniform(0, 1, 24)])
+
+    for processes in (1, None):
+        with PopulationEvaluator(build, portfolio, fitness, seeds=(1, 2), processes=processes) as evaluator:
+            games = population.shape[0] * len(portfolio) * 2
+            for generation in range(2):
+                t0 = time.perf_counter()
+                matrix = evaluator.evaluate(population)
+                elapsed = time.perf_counter() - t0
+                print(f"{evaluator.workers:2d} process(es), generation {generation}: {games} games in {elapsed:6.2f} s "
+                      f"({games / elapsed:6.1f} games/s), best fitness {matrix.mean(axis=(1, 2)).max():.1f}")
+    print(f"{os.cpu_count()} CPUs")
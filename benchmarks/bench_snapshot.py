@@ -0,0 +1,50 @@
+"""
+Measure how many snapshots and restores of a game can be made per second with each engine, for a lookahead which
+branches the game at every frame
+
+Run from the repository root with:
+python -m benchmarks.bench_snapshot
+"""
+import time
+
+from src.fuzzy_asteroids.fuzzy_asteroids import HeadlessEnvironment, ControllerBase, SpaceShip, Scenario
+
+
+class Spinner(ControllerBase):
+    @property
+    def name(self) -> str:
+        return "Spinner"
+
+    def actions(self, ship: SpaceShip, input_data) -> None:
+        ship.turn_rate = 90.0
+        ship.thrust = 100.0
+        ship.fire_bullet = True
+
+
+def per_second(function, seconds: float = 1.0) -> float:
+    calls, t0 = 0, time.perf_counter()
+    while time.perf_counter() - t0 < seconds:
+        function()
+        calls += 1
+    return calls / (time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    for engine in ("arcade", "numpy"):
+        for asteroids in (10, 50):
+            scenario = Scenario(num_asteroids=asteroids, seed=1, time_limit=60, ship_states=[
+                {"position": (300, 400), "team": 1, "lives": 1000}, {"position": (700, 400), "team": 2, "lives": 1000}])
+            game = HeadlessEnvironment(settings={"engine": engine})
+            game.start_new_game(controller={1: Spinner(), 2: Spinner()}, scenario=scenario)
+            for _ in range(120):
+                game.on_update(1 / game.frequency)
+            snapshot = game.snapshot()
+
+            def branch():
+                game.restore(snapshot)
+                game.on_update(1 / game.frequency)
+
+            print(f"{engine:>6}, {len(game.asteroid_list):3} asteroids, {len(game.bullet_list):3} bullets "
+                  f"({snapshot.nbytes} bytes): {per_second(game.snapshot):8.0f} snapshots/s, "
+                  f"{per_second(lambda: game.restore(snapshot)):8.0f} restores/s, "
+                  f"{per_second(branch):6.0f} restored frames/s")
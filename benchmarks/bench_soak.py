@@ -0,0 +1,76 @@
+"""
+Soak test of a long training run: play thousands of short episodes in pooled environments and check that the resident
+memory (RSS) and the number of Python objects stop growing once the pools are warm
+
+Exits with an error if they keep growing. Run from the repository root with:
+python -m benchmarks.bench_soak
+"""
+import gc
+import resource
+import sys
+import time
+
+from src.fuzzy_asteroids.env_pool import EnvironmentPool
+from src.fuzzy_asteroids.fuzzy_asteroids import ControllerBase, SpaceShip, Scenario
+
+EPISODES = 5000
+WARMUP = 1000
+CHECKPOINTS = 10
+
+# Allowed growth between the end of the warmup (once the pools and engine arrays reached their largest size) and the
+# end of the run
+MAX_RSS_GROWTH = 8 * 2 ** 20  # bytes
+MAX_OBJECT_GROWTH = 1000
+
+
+class Shooter(ControllerBase):
+    @property
+    def name(self) -> str:
+        return "Shooter"
+
+    def actions(self, ship: SpaceShip, input_data) -> None:
+        ship.turn_rate = 90.0
+        ship.thrust = 60.0
+        ship.fire_bullet = True
+
+
+def rss() -> int:
+    """
+    Current resident memory of the process in bytes (the peak one where /proc is not available)
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def soak(engine: str) -> bool:
+    scenario = Scenario(num_asteroids=5, time_limit=2, ship_states=[
+        {"position": (300, 400), "team": 1}, {"position": (700, 400), "team": 2}])
+
+    t0 = time.perf_counter()
+    samples = []
+    with EnvironmentPool(settings={"engine": engine, "prints": False}, max_size=2) as pool:
+        for episode in range(1, EPISODES + 1):
+            # Different asteroids every episode, like a training run
+            scenario.seed = episode
+            pool.run(controller={1: Shooter(), 2: Shooter()}, scenario=scenario)
+
+            if episode >= WARMUP and (episode - WARMUP) % ((EPISODES - WARMUP) // CHECKPOINTS) == 0:
+                gc.collect()
+                samples.append((episode, rss(), len(gc.get_objects())))
+                print(f"{engine:>6} episode {episode:6d}: {samples[-1][1] / 2 ** 20:7.1f} MB, {samples[-1][2]:7d} objects, "
+                      f"{(time.perf_counter() - t0) / episode * 1E3:5.1f} ms per episode")
+
+    rss_growth = samples[-1][1] - samples[0][1]
+    object_growth = samples[-1][2] - samples[0][2]
+    bounded = rss_growth <= MAX_RSS_GROWTH and object_growth <= MAX_OBJECT_GROWTH
+    print(f"{engine:>6}: {rss_growth / 2 ** 20:+.1f} MB and {object_growth:+d} objects after the warmup "
+          f"({'bounded' if bounded else 'GROWING'})")
+    return bounded
+
+
+if __name__ == "__main__":
+    results = [soak(engine) for engine in ("arcade", "numpy")]
+    sys.exit(0 if all(results) else 1)
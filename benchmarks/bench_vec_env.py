@@ -0,0 +1,56 @@
+"""
+Compare running many seeded games one after the other with ``HeadlessEnvironment`` against stepping them together
+with ``VecEnv``
+
+Run from the repository root with:
+python -m benchmarks.bench_vec_env
+"""
+import time
+
+import numpy as np
+
+from src.fuzzy_asteroids.fuzzy_asteroids import HeadlessEnvironment, ControllerBase, SpaceShip, Scenario
+from src.fuzzy_asteroids.vec_env import VecEnv
+
+
+class Shooter(ControllerBase):
+    @property
+    def name(self) -> str:
+        return "Shooter"
+
+    def actions(self, ship: SpaceShip, input_data) -> None:
+        ship.turn_rate = 90.0
+        ship.thrust = 100.0
+        ship.fire_bullet = True
+
+
+def scenarios(num_envs: int, frames: int):
+    return [Scenario(num_asteroids=20, seed=seed, time_limit=frames / 30, ship_states=[
+        {"position": (300, 400), "team": 1, "lives": 1000}, {"position": (700, 400), "team": 2, "lives": 1000}])
+        for seed in range(num_envs)]
+
+
+def serial(num_envs: int, frames: int) -> float:
+    t0 = time.perf_counter()
+    for scenario in scenarios(num_envs, frames):
+        HeadlessEnvironment(settings={"engine": "numpy"}).run(controller={1: Shooter(), 2: Shooter()},
+                                                               scenario=scenario)
+    return time.perf_counter() - t0
+
+
+def vectorized(num_envs: int, frames: int) -> float:
+    t0 = time.perf_counter()
+    env = VecEnv(scenarios(num_envs, frames), auto_reset=False)
+    actions = {"turn_rate": np.full((num_envs, 2), 90.0), "thrust": np.full((num_envs, 2), 100.0),
+               "fire_bullet": np.ones((num_envs, 2), dtype=bool)}
+    while not env.finished.all():
+        env.step(actions)
+    return time.perf_counter() - t0
+
+
+if __name__ == "__main__":
+    frames = 300
+    for num_envs in (1, 8, 32, 128):
+        serial_time, vectorized_time = serial(num_envs, frames), vectorized(num_envs, frames)
+        print(f"{num_envs:4d} games: serial {1E6 * serial_time / (num_envs * frames):7.1f} us/game-frame, "
+              f"VecEnv {1E6 * vectorized_time / (num_envs * frames):7.1f} us/game-frame")
@@ -2,6 +2,7 @@ from src.fuzzy_asteroids.fuzzy_controller import *
 
 
 from src.fuzzy_asteroids.runner import ScenarioRunner, Scenario
+from src.fuzzy_asteroids.result_cache import ResultCache
 
 
 class FuzzyController1(ControllerBase):
@@ -53,3 +54,10 @@ if __name__ == "__main__":
 
     # Run all scenarios without graphics
     # runner.run_all_controllers(graphics_on=False)
+
+    # Run all scenarios without graphics, spread over one worker process per CPU
+    # runner.run_all_controllers(graphics_on=False, processes=None)
+
+    # Keep the scores of headless games on disk, so that running again only plays the games which changed
+    # runner = ScenarioRunner(controllers, portfolio, cache=ResultCache(".result_cache"))
+    # runner.run_all_controllers(graphics_on=False)
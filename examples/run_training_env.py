@@ -13,6 +13,18 @@ if __name__ == "__main__":
 
     # Because of how the arcade library is implemented, there are memory leaks for instantiating the environment
     # too many times, keep instantiations to a small number and simply reuse the environment
+    # HeadlessEnvironment() behaves the same without creating a window, use it to train without a display or to create
+    # many environments. For long runs, EnvironmentPool (from src.fuzzy_asteroids.env_pool) builds and reuses them
+    # for you: pool.run(controller=...) plays a game in a pooled environment, and pool.close() shuts them down
 
     score = game.run(controller=FuzzyController())
     print(score)
+
+    # The same environment can also be driven one step at a time, for example by an optimizer choosing the actions
+    # reset() starts a new game in place, step() applies the actions of the ships (by ship id) and advances the game
+    observation = game.reset(scenario=Scenario(num_asteroids=3), seed=0)
+    stopping_condition = StoppingCondition.none
+    while stopping_condition == StoppingCondition.none:
+        actions = {ship["id"]: {"turn_rate": 90.0, "fire_bullet": True} for ship in observation["ships"]}
+        observation, deltas, stopping_condition = game.step(actions)
+    print(game.score)
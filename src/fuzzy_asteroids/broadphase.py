@@ -0,0 +1,200 @@
+"""
+Spatial hash broadphase for the collision checks of the Asteroid Smasher game
+
+Entities are binned by their center position into a uniform grid laid over the map. The grid is toroidal: cell
+coordinates wrap around the map edges, the same way the sprites do in their ``on_update()``, so entities which drifted
+past an edge before being wrapped (asteroids only wrap once they are fully off screen) still land in a bounded set of
+cells. Looking up the cells around a query point gives a superset of the entities whose bounding circles reach it, which
+the narrow phase (hit box polygons or circles) then filters exactly, so the collisions found are identical to testing
+every pair.
+"""
+import math
+import numpy as np
+
+from typing import Tuple, List, Any
+
+from .settings import *
+
+
+def _neighbor_cells(cells: np.ndarray, reach: int, num_cells: int) -> np.ndarray:
+    # Wrapped cell coordinates within ``reach`` cells of each of the given ones, without duplicates
+    if 2 * reach + 1 >= num_cells:
+        return np.broadcast_to(np.arange(num_cells), (len(cells), num_cells))
+    return (cells[:, None] + np.arange(-reach, reach + 1)[None, :]) % num_cells
+
+
+class SpatialHash:
+    """
+    Uniform grid broadphase over a toroidal map, rebuilt from the entity positions at the start of each collision check
+
+    Entities are referred to by their index in the arrays given to ``build()``. Entities created during the check (such
+    as the children of a split asteroid) can be registered with ``add()``, they are indexed after the built ones.
+    """
+    min_cell_size = 32.0
+
+    # Below this many entities the grid costs more than it saves, and a single cell covering the whole map is used
+    min_grid_entities = 64
+
+    # Number of candidates above which single point queries are filtered with NumPy
+    vectorize_threshold = 16
+
+    def __init__(self, width: float = SCREEN_WIDTH, height: float = SCREEN_HEIGHT, cell_size: float = None):
+        """
+        :param width: Width of the map (period of the grid along x)
+        :param height: Height of the map (period of the grid along y)
+        :param cell_size: Fixed cell size, by default it is sized to the largest entity when the grid is built
+        """
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.build(np.zeros(0), np.zeros(0), np.zeros(0))
+
+    def __len__(self) -> int:
+        return len(self.x) + len(self._added)
+
+    def build(self, x: np.ndarray, y: np.ndarray, radius: Any) -> None:
+        """
+        Bin entities into the grid, replacing any previous contents
+
+        :param x: Entity x positions
+        :param y: Entity y positions
+        :param radius: Entity bounding radii (array or scalar)
+        """
+        self.x = np.array(x, dtype=np.float64)
+        self.y = np.array(y, dtype=np.float64)
+        self.radius = np.array(np.broadcast_to(radius, self.x.shape), dtype=np.float64)
+        self._added = []
+        self._max_radius = float(self.radius.max()) if len(self.radius) else 0.0
+
+        # Cells at least as large as the biggest entity keep most lookups to the 3x3 cells around the query point
+        if len(self.x) < self.min_grid_entities:
+            cell_size = max(self.width, self.height)
+        else:
+            cell_size = self.cell_size or max(2.0 * self._max_radius, self.min_cell_size)
+        self._columns = max(1, int(self.width // cell_size))
+        self._rows = max(1, int(self.height // cell_size))
+        self._cell_width = self.width / self._columns
+        self._cell_height = self.height / self._rows
+
+        # Entity indices sorted by cell, with the start and count of each cell's run
+        if self._columns * self._rows == 1:
+            self._order = np.arange(len(self.x))
+            self._counts = np.array([len(self.x)])
+        else:
+            cells = self._cells(self.x, self.y)
+            self._order = np.argsort(cells, kind="stable")
+            self._counts = np.bincount(cells, minlength=self._columns * self._rows)
+        self._starts = np.cumsum(self._counts) - self._counts
+
+        # Plain list copies for single point queries, which are dominated by the overhead of NumPy calls otherwise
+        self._order_list = self._order.tolist()
+        self._runs = list(zip(self._starts.tolist(), (self._starts + self._counts).tolist()))
+
+    def add(self, x: Any, y: Any, radius: Any) -> None:
+        """
+        Register entities created after the grid was built, they are checked against every query until the next build
+
+        :param x: Entity x position(s)
+        :param y: Entity y position(s)
+        :param radius: Entity bounding radius (radii)
+        """
+        x, y, radius = np.broadcast_arrays(*(np.atleast_1d(np.asarray(value, dtype=np.float64))
+                                             for value in (x, y, radius)))
+        self._added.extend(zip(x.tolist(), y.tolist(), radius.tolist()))
+        self._max_radius = max(self._max_radius, float(radius.max(initial=0.0)))
+
+    def _cells(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        columns = np.floor(x / self._cell_width).astype(np.int64) % self._columns
+        rows = np.floor(y / self._cell_height).astype(np.int64) % self._rows
+        return rows * self._columns + columns
+
+    def pairs(self, x: Any, y: Any, radius: Any) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Find the (query, entity) pairs whose bounding circles overlap or touch
+
+        :param x: Query x position(s)
+        :param y: Query y position(s)
+        :param radius: Query bounding radius (radii)
+        :return: Tuple of query indices and entity indices, sorted by query and then by entity index
+        """
+        x, y, radius = np.broadcast_arrays(*(np.atleast_1d(np.asarray(value, dtype=np.float64))
+                                             for value in (x, y, radius)))
+        if not len(x) or not len(self):
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        # Test every pair when there is a single cell, which gives them sorted already
+        if self._columns * self._rows == 1 and not self._added:
+            diff_x = x[:, None] - self.x[None, :]
+            diff_y = y[:, None] - self.y[None, :]
+            radius_sum = radius[:, None] + self.radius[None, :]
+            return np.nonzero(diff_x * diff_x + diff_y * diff_y <= radius_sum * radius_sum)
+
+        # Every cell which may hold an entity within reach of each query point
+        reach = float(radius.max()) + self._max_radius
+        columns = _neighbor_cells(np.floor(x / self._cell_width).astype(np.int64),
+                                  math.ceil(reach / self._cell_width), self._columns)
+        rows = _neighbor_cells(np.floor(y / self._cell_height).astype(np.int64),
+                               math.ceil(reach / self._cell_height), self._rows)
+        cells = (rows[:, :, None] * self._columns + columns[:, None, :]).reshape(len(x), -1)
+
+        # Expand the cell runs into candidate pairs
+        counts = self._counts[cells].ravel()
+        query_idxs = np.repeat(np.repeat(np.arange(len(x)), cells.shape[1]), counts)
+        run_offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        entity_idxs = self._order[np.repeat(self._starts[cells].ravel(), counts) + run_offsets]
+
+        diff_x = x[query_idxs] - self.x[entity_idxs]
+        diff_y = y[query_idxs] - self.y[entity_idxs]
+        radius_sum = radius[query_idxs] + self.radius[entity_idxs]
+        keep = diff_x * diff_x + diff_y * diff_y <= radius_sum * radius_sum
+        query_idxs, entity_idxs = query_idxs[keep], entity_idxs[keep]
+
+        # Entities added since the build are few, test them against every query point
+        if self._added:
+            added = np.array(self._added)
+            diff_x = x[:, None] - added[None, :, 0]
+            diff_y = y[:, None] - added[None, :, 1]
+            radius_sum = radius[:, None] + added[None, :, 2]
+            added_query_idxs, added_idxs = np.nonzero(diff_x * diff_x + diff_y * diff_y <= radius_sum * radius_sum)
+            query_idxs = np.concatenate((query_idxs, added_query_idxs))
+            entity_idxs = np.concatenate((entity_idxs, added_idxs + len(self.x)))
+
+        order = np.lexsort((entity_idxs, query_idxs))
+        return query_idxs[order], entity_idxs[order]
+
+    def query(self, x: float, y: float, radius: float) -> List[int]:
+        """
+        Indices (in ascending order) of the entities whose bounding circles overlap or touch the given one
+
+        :param x: Query x position
+        :param y: Query y position
+        :param radius: Query bounding radius
+        """
+        candidates = []
+        reach = radius + self._max_radius
+        for row in self._span(y, reach, self._cell_height, self._rows):
+            for column in self._span(x, reach, self._cell_width, self._columns):
+                start, end = self._runs[row * self._columns + column]
+                candidates.extend(self._order_list[start:end])
+
+        if len(candidates) > self.vectorize_threshold:
+            candidates = np.array(candidates)
+            radius_sum = radius + self.radius[candidates]
+            hits = np.sort(candidates[(x - self.x[candidates]) ** 2 + (y - self.y[candidates]) ** 2
+                                      <= radius_sum * radius_sum]).tolist()
+        else:
+            hits = sorted(idx for idx in candidates if (x - self.x[idx]) ** 2 + (y - self.y[idx]) ** 2
+                          <= (radius + self.radius[idx]) ** 2)
+
+        for idx, (other_x, other_y, other_radius) in enumerate(self._added, len(self.x)):
+            if (x - other_x) ** 2 + (y - other_y) ** 2 <= (radius + other_radius) ** 2:
+                hits.append(idx)
+        return hits
+
+    @staticmethod
+    def _span(position: float, reach: float, cell_size: float, num_cells: int) -> range:
+        # Wrapped cell coordinates covering ``position`` +/- ``reach`` along one axis
+        first, last = math.floor((position - reach) / cell_size), math.floor((position + reach) / cell_size)
+        if last - first + 1 >= num_cells:
+            return range(num_cells)
+        return (cell % num_cells for cell in range(first, last + 1))
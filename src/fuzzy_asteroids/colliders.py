@@ -0,0 +1,173 @@
+"""
+Circle collider mode for the Asteroid Smasher game
+
+Instead of the polygon hit box tests done by the Python Arcade library, every asteroid, bullet and ship is treated as a
+circle with a precomputed radius (per asteroid size, and per ship image), so all of the pairs in a frame can be tested
+in one batched NumPy pass over the candidate pairs found by a ``SpatialHash``. It is selected by passing ``{"collider": "circle"}`` in the settings of ``AsteroidGame`` (or
+any of its children), and works with both the "arcade" and "numpy" engines.
+
+This is an approximation of the hit box collisions, results will differ slightly from the default "hitbox" collider.
+"""
+import arcade
+import numpy as np
+
+from typing import Tuple, List, Dict, Any
+
+from .settings import *
+from .sprites import BULLET_IMAGE, SHIP_IMAGES, ASTEROID_IMAGES, get_texture
+from .engine import SpriteGeometry, get_geometry, geometry_id, _ArrayList
+from .broadphase import SpatialHash
+
+
+def circle_radius(image: str, scale: float) -> float:
+    """
+    Radius of the circle used to represent a sprite, the mean of its half width and half height
+
+    :param image: Image file the sprite is drawn with
+    :param scale: Scale the sprite is drawn at
+    """
+    shape: SpriteGeometry = get_geometry(geometry_id(get_texture(image), scale))
+    return (shape.width + shape.height) / 4.0
+
+
+class CircleCollider:
+    """
+    Batched circle collision checks, resolved in the same order as the hit box checks of ``AsteroidGame``:
+    bullets in list order each score one hit and split every asteroid they overlap, then each ship which is not
+    respawning is checked against the asteroids, then against the other ships.
+
+    Every check runs a single overlap pass for the frame, so asteroids created by a split are only collided with from
+    the next frame on.
+    """
+    def __init__(self):
+        self.grid = SpatialHash()
+
+        # Radii lookup tables, indexed by asteroid size and by ship team
+        self.asteroid_radii = np.zeros(max(ASTEROID_IMAGES) + 1)
+        for size, images in ASTEROID_IMAGES.items():
+            self.asteroid_radii[size] = np.mean([circle_radius(image, SCALE * 1.5) for image in images])
+
+        self.bullet_radius = circle_radius(BULLET_IMAGE, SCALE)
+        self.ship_radii = {team: circle_radius(SHIP_IMAGES[team+1 if team in (1, 2) else 1], SCALE)
+                           for team in (0, 1, 2)}
+
+    @staticmethod
+    def _sprites(sprite_list) -> Any:
+        # Engine lists hand out views with stable indices until they are compacted, sprite lists need a snapshot
+        return sprite_list if isinstance(sprite_list, _ArrayList) else list(sprite_list)
+
+    @staticmethod
+    def _positions(sprite_list) -> Tuple[np.ndarray, np.ndarray]:
+        if isinstance(sprite_list, _ArrayList):
+            return sprite_list.positions()
+        positions = np.array([sprite.position for sprite in sprite_list], dtype=np.float64).reshape(-1, 2)
+        return positions[:, 0], positions[:, 1]
+
+    def _asteroid_radii(self, asteroid_list) -> np.ndarray:
+        if isinstance(asteroid_list, _ArrayList):
+            return self.asteroid_radii[asteroid_list.engine.asteroids["size"]]
+        return self.asteroid_radii[np.array([sprite.size for sprite in asteroid_list], dtype=np.int64)]
+
+    def _ship_radii(self, ships: List[Any]) -> np.ndarray:
+        return np.array([self.ship_radii.get(ship.team, self.ship_radii[0]) for ship in ships])
+
+    def _overlaps(self, x: np.ndarray, y: np.ndarray, radius: Any, others_x: np.ndarray, others_y: np.ndarray,
+                  others_radius: np.ndarray) -> Dict[int, List[int]]:
+        """
+        Overlapping circles between two sets
+
+        :return: Dictionary from the index of each circle of the first set which overlaps any of the second, to the
+                 indices (in ascending order) of the circles of the second set it overlaps
+        """
+        self.grid.build(others_x, others_y, others_radius)
+        idxs, others_idxs = self.grid.pairs(x, y, radius)
+
+        # The grid reports touching circles as well, keep the strictly overlapping ones
+        diff_x = x[idxs] - others_x[others_idxs]
+        diff_y = y[idxs] - others_y[others_idxs]
+        radius_sum = np.broadcast_to(radius, x.shape)[idxs] + others_radius[others_idxs]
+        overlapping = diff_x * diff_x + diff_y * diff_y < radius_sum * radius_sum
+
+        hits = dict()
+        for idx, other_idx in zip(idxs[overlapping].tolist(), others_idxs[overlapping].tolist()):
+            hits.setdefault(idx, []).append(other_idx)
+        return hits
+
+    @staticmethod
+    def _compact(game) -> None:
+        if game.engine:
+            game.engine.compact()
+
+    def check_bullet_asteroid_collisions(self, game) -> None:
+        if not game.bullet_list or not game.asteroid_list:
+            return
+
+        bullets, asteroids = self._sprites(game.bullet_list), self._sprites(game.asteroid_list)
+        hits = self._overlaps(*self._positions(game.bullet_list), self.bullet_radius,
+                              *self._positions(game.asteroid_list), self._asteroid_radii(game.asteroid_list))
+
+        # Each asteroid can only be destroyed once, by the first bullet (in list order) that overlaps it
+        destroyed = set()
+        for bullet_idx in sorted(hits):
+            asteroid_idxs = [idx for idx in hits[bullet_idx] if idx not in destroyed]
+            if not asteroid_idxs:
+                continue
+
+            bullet = bullets[bullet_idx]
+            game.score.bullets_hit_asteroids[bullet.team-1] += 1
+            for asteroid_idx in asteroid_idxs:
+                game.split_asteroid(asteroids[asteroid_idx], bullet.team)
+            destroyed.update(asteroid_idxs)
+            bullet.remove_from_sprite_lists()
+
+        self._compact(game)
+
+    def check_asteroid_ship_collisions(self, game) -> None:
+        if not game.player_sprite_list or not game.asteroid_list:
+            return
+
+        ships, asteroids = list(game.player_sprite_list), self._sprites(game.asteroid_list)
+        hits = self._overlaps(*self._positions(game.player_sprite_list), self._ship_radii(ships),
+                              *self._positions(game.asteroid_list), self._asteroid_radii(game.asteroid_list))
+
+        destroyed = set()
+        for ship_idx, ship in enumerate(ships):
+            if ship.respawn_time_left:
+                continue
+
+            game.score.distance_travelled += (ship.change_x ** 2 + ship.change_y ** 2) ** 0.5  # meters
+
+            asteroid_idxs = [idx for idx in hits.get(ship_idx, []) if idx not in destroyed]
+            if asteroid_idxs:
+                game.score.deaths[ship.team-1] += 1
+
+                game._print_terminal(f"Ship {ship.id} crashed into asteroid: at {ship.position_str}, t={game.score.time:.3f} seconds")
+
+                game.split_asteroid(asteroids[asteroid_idxs[0]], ship.team)
+                destroyed.add(asteroid_idxs[0])
+                game.kill_ship(ship)
+
+        self._compact(game)
+
+    def check_ship_ship_collisions(self, game) -> None:
+        if len(game.player_sprite_list) < 2:
+            return
+
+        ships = list(game.player_sprite_list)
+        x, y = self._positions(game.player_sprite_list)
+        hits = self._overlaps(x, y, self._ship_radii(ships), x, y, self._ship_radii(ships))
+
+        for ship_idx, ship in enumerate(ships):
+            # Ships killed earlier in this pass are respawning (or out of the game)
+            if ship.respawn_time_left or ship not in game.player_sprite_list:
+                continue
+
+            collided_ships = [ships[idx] for idx in hits.get(ship_idx, []) if idx != ship_idx and
+                              ships[idx] in game.player_sprite_list and not ships[idx].respawn_time_left]
+
+            if collided_ships:
+                for other in collided_ships + [ship]:
+                    game.score.deaths[other.team-1] += 1
+
+                    game._print_terminal(f"Ship {other.id} crashed into other ship: at {other.position_str}, t={game.score.time:.3f} seconds")
+                    game.kill_ship(other)
@@ -15,22 +15,33 @@ class Dashboard:
         self.graphics_on = graphics_on
 
         # GUI widgets
-        self.player_sprite_list = player_sprite_list
+        self.player_sprite_list = None
         self.ship_life_list = arcade.SpriteList(is_static=True)
         self.static_batched_elements = arcade.ShapeElementList()
 
-        # Get the starting point for the dash board elements, starting from the right
-        self.meter_x = map_size[0] - 50
-
         # Starting point for the ship lives (creates offset in-case the control actions shouldn't be shown)
         self.life_y_offset = 80 if full_dashboard else 0
 
+        self.reset(player_sprite_list, map_size)
+
+    def reset(self, player_sprite_list: arcade.SpriteList, map_size) -> None:
+        """
+        Set the dashboard up for the ships of a new game, reusing its sprite and shape lists
+        """
+        self.player_sprite_list = player_sprite_list
+        self.ship_life_list.clear()
+        for shape in tuple(self.static_batched_elements):
+            self.static_batched_elements.remove(shape)
+
+        # Get the starting point for the dash board elements, starting from the right
+        self.meter_x = map_size[0] - 50
+
         if self.graphics_on:
             # Instantiate UI elements which can be drawn faster using batching
             self.create_ship_lives()
 
             # Create reusable dashboard elements (if desired)
-            if full_dashboard:
+            if self.full_dashboard:
                 self.create_dashboard_elements()
 
     def x_pos(self, idx: int) -> int:
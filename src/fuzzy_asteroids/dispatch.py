@@ -0,0 +1,158 @@
+"""
+Deadline driven dispatch of controller calls, used by ``FuzzyAsteroidGame`` when controller timeouts are on
+
+Each team gets one long-lived worker thread, started the first time the team is dispatched to. A frame hands the
+call to the worker and waits until it finishes or the deadline passes. A call which misses its deadline keeps running
+in the background: its worker stays busy, so later frames of that team time out right away instead of piling up calls
+behind it. The result of the late call is discarded when it finishes.
+"""
+import threading
+import time
+
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class _Worker:
+    """
+    Thread running the calls of one team, one at a time
+    """
+    def __init__(self, name: str):
+        self._request = threading.Event()
+        self._done = threading.Event()
+
+        # The call is handed over in ``_job`` and its outcome in ``_result``, each tagged with the ticket of the call.
+        # The events order the two threads, so neither attribute needs a lock
+        self._job: Optional[Tuple[int, Callable, Tuple[Any, ...]]] = None
+        self._result: Optional[Tuple[int, Optional[BaseException], float]] = None
+        self._ticket = 0
+        self._skipped = False
+        self.busy = False
+
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def _loop(self) -> None:
+        while True:
+            self._request.wait()
+            self._request.clear()
+
+            job, self._job = self._job, None
+            if job is None:
+                return
+
+            ticket, function, args = job
+            error = None
+            try:
+                function(*args)
+            except BaseException as e:
+                error = e
+
+            # Drop the references to the call before signalling, so a late call does not keep its frame alive
+            del job, function, args
+            self._result = (ticket, error, time.perf_counter())
+            self._done.set()
+
+    def start(self, function: Callable, args: Tuple[Any, ...]) -> bool:
+        """
+        Hand a call to the worker, unless it is still running a late call (then ``wait()`` times out right away)
+        """
+        if self.busy:
+            if not self._done.is_set():
+                self._skipped = True
+                return False
+
+            # The late call finished since, its result is stale
+            self.busy = False
+
+        self._skipped = False
+        self._ticket += 1
+        self._done.clear()
+        self._job = (self._ticket, function, args)
+        self.busy = True
+        self._request.set()
+        return True
+
+    def wait(self, timeout: Optional[float]) -> float:
+        """
+        Wait for the call handed over by ``start()``
+
+        :return: Time (``time.perf_counter()``) the call finished at
+        """
+        if self._skipped:
+            raise TimeoutError("The controller is still running the call of an earlier frame")
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"The controller did not finish within {timeout:.4f} seconds")
+
+        ticket, error, finished_at = self._result
+        self._result = None
+        self.busy = False
+        if ticket != self._ticket:
+            raise RuntimeError("Controller worker returned the result of another call")
+        if error is not None:
+            raise error
+        return finished_at
+
+    def stop(self) -> None:
+        self._job = None
+        self._request.set()
+
+
+class DeadlineDispatcher:
+    """
+    Runs controller calls on one persistent worker thread per key (team), each with a deadline
+
+    ``run()`` raises ``TimeoutError`` when the call misses its deadline (or the previous call of the same key is still
+    running), and re-raises any exception raised by the call.
+    """
+    def __init__(self, name: str = "controller"):
+        """
+        :param name: Prefix of the worker thread names
+        """
+        self.name = name
+        self._workers: Dict[Hashable, _Worker] = dict()
+
+    def _worker(self, key: Hashable) -> _Worker:
+        worker = self._workers.get(key)
+        if worker is None:
+            worker = self._workers[key] = _Worker(f"{self.name}-{key}")
+        return worker
+
+    def run(self, key: Hashable, function: Callable, args: Tuple[Any, ...], timeout: Optional[float]) -> float:
+        """
+        Call ``function(*args)`` on the worker of ``key`` and wait for it to finish
+
+        :param key: Worker to use, created on first use
+        :param function: Function to call
+        :param args: Arguments of the call
+        :param timeout: Deadline of the call in seconds, ``None`` to wait for as long as it takes
+        :return: Time (``time.perf_counter()``) the call finished at
+        """
+        self.submit(key, function, args)
+        return self.wait(key, timeout)
+
+    def submit(self, key: Hashable, function: Callable, args: Tuple[Any, ...]) -> None:
+        """
+        Start a call on the worker of ``key`` without waiting for it, to run the calls of several keys at once
+        """
+        self._worker(key).start(function, args)
+
+    def wait(self, key: Hashable, timeout: Optional[float]) -> float:
+        """
+        Wait for the call submitted to the worker of ``key``, see ``run()``
+        """
+        return self._worker(key).wait(timeout)
+
+    def busy(self, key: Hashable) -> bool:
+        """
+        Whether the worker of ``key`` is still running a call which missed its deadline
+        """
+        worker = self._workers.get(key)
+        return worker is not None and worker.busy and not worker._done.is_set()
+
+    def close(self) -> None:
+        """
+        Stop the worker threads once they are done with their current call
+        """
+        for worker in self._workers.values():
+            worker.stop()
+        self._workers.clear()
@@ -0,0 +1,1120 @@
+"""
+Structure-of-arrays simulation engine for the Asteroid Smasher game
+
+The ``ArrayEngine`` keeps asteroids, bullets and ships as NumPy arrays and advances them with vectorized operations,
+reproducing the behavior of the sprite based ``AsteroidGame.on_update()`` (including the hit box based wraparound and
+collision checks of the Python Arcade library). It is selected by passing ``{"engine": "numpy"}`` in the settings of
+``AsteroidGame`` (or any of its children), which must have graphics turned off.
+
+The engine exposes ``asteroid_list``, ``bullet_list`` and ``player_sprite_list`` collections which follow the subset of
+the ``arcade.SpriteList`` interface used by the game environment, so that controllers and ``Score`` subclasses which
+read sprite attributes keep working unchanged.
+"""
+import math
+import heapq
+import random
+import arcade
+import numpy as np
+
+from typing import Dict, Tuple, List, Any, Iterator, Sequence
+
+from .settings import *
+from .sprites import AsteroidSprite, ShipSprite, BULLET_IMAGE, ASTEROID_IMAGES, get_texture
+from .broadphase import SpatialHash
+
+
+class SpriteGeometry:
+    """
+    Size and hit box of a texture drawn at a given scale, shared by every entity which uses that texture
+    """
+    __slots__ = ("width", "height", "scale", "hit_box", "bounding_radius", "_rotated")
+
+    # Number of rotated hit boxes kept per geometry, bullets keep their angle and asteroids are often checked against
+    # several bullets in the same frame
+    cache_size = 1024
+
+    def __init__(self, texture: arcade.Texture, scale: float):
+        self.width = texture.width * scale
+        self.height = texture.height * scale
+        self.scale = scale
+        self.hit_box = tuple(tuple(point) for point in texture.hit_box_points)
+
+        # Radius of a circle containing the hit box at any rotation (padded for the rounding done by rotate_point)
+        self.bounding_radius = (max(math.hypot(*point) for point in self.hit_box) + 0.01) * scale + 1E-6
+        self._rotated = {}
+
+    def rotated_hit_box(self, angle: float) -> Tuple[Tuple[float, float], ...]:
+        """
+        Unscaled hit box points rotated by ``angle`` degrees, like ``arcade.Sprite.get_adjusted_hit_box()`` does
+        """
+        if not angle:
+            return self.hit_box
+
+        points = self._rotated.get(angle)
+        if points is None:
+            if len(self._rotated) >= self.cache_size:
+                self._rotated.clear()
+            points = tuple(tuple(arcade.rotate_point(point[0], point[1], 0, 0, angle)) for point in self.hit_box)
+            self._rotated[angle] = points
+        return points
+
+
+# Registry of the geometries used by the engine, entities store the index into this registry
+_geometries: List[SpriteGeometry] = []
+_geometry_ids: Dict[Tuple[str, float], int] = {}
+
+
+def geometry_id(texture: arcade.Texture, scale: float) -> int:
+    """
+    Get the registry index of the geometry of a texture at a given scale (registering it if it is new)
+
+    :param texture: Loaded arcade Texture
+    :param scale: Scale the texture is drawn at
+    :return: Index into the geometry registry
+    """
+    key = (texture.name, scale)
+    if key not in _geometry_ids:
+        _geometry_ids[key] = len(_geometries)
+        _geometries.append(SpriteGeometry(texture, scale))
+    return _geometry_ids[key]
+
+
+def get_geometry(idx: int) -> SpriteGeometry:
+    return _geometries[idx]
+
+
+def adjusted_hit_box(geometry: SpriteGeometry, angle: float, x: float, y: float) -> List[List[float]]:
+    """
+    Hit box points of an entity in map coordinates, computed the same way as ``arcade.Sprite.get_adjusted_hit_box()``
+    """
+    return [[point[0] * geometry.scale + x, point[1] * geometry.scale + y] for point in geometry.rotated_hit_box(angle)]
+
+
+def sprite_bounds(sprites: Sequence[arcade.Sprite]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Center positions and hit box bounding radii of arcade sprites, as used by the collision broadphase
+
+    :param sprites: Sprites to get the bounds of
+    :return: Tuple of x positions, y positions and bounding radii
+    """
+    bounds = np.array([(sprite.center_x, sprite.center_y,
+                        get_geometry(geometry_id(sprite.texture, sprite.scale)).bounding_radius)
+                       for sprite in sprites], dtype=np.float64).reshape(-1, 3)
+    return bounds[:, 0], bounds[:, 1], bounds[:, 2]
+
+
+class EntityArrays:
+    """
+    Growable structure-of-arrays container, where every field is a 1-D NumPy array of the same length
+
+    Fields are accessed by name (``arrays["x"]``) and return views of the live entries, so in-place NumPy operations
+    update the stored state directly.
+    """
+    def __init__(self, fields: Dict[str, Any], capacity: int = 64):
+        self.fields = fields
+        self.count = 0
+        self._data = {name: np.zeros(capacity, dtype=dtype) for name, dtype in fields.items()}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._data[name][:self.count]
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        self._data[name][:self.count] = value
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Full storage array of a field (including unused capacity), for cheap indexing of single entries
+        """
+        return self._data[name]
+
+    @property
+    def capacity(self) -> int:
+        return len(self._data["x"])
+
+    def _reserve(self, count: int) -> None:
+        # Grow the storage (doubling) so that at least ``count`` entries fit
+        if count > self.capacity:
+            capacity = max(count, 2 * self.capacity)
+            for name, array in self._data.items():
+                grown = np.zeros(capacity, dtype=array.dtype)
+                grown[:self.count] = array[:self.count]
+                self._data[name] = grown
+
+    def append(self, **values) -> int:
+        """
+        Append a single entity
+
+        :return: Index of the new entity
+        """
+        self._reserve(self.count + 1)
+        idx = self.count
+        for name, value in values.items():
+            self._data[name][idx] = value
+        self.count += 1
+        return idx
+
+    def keep(self, mask: np.ndarray) -> None:
+        """
+        Remove every entity where ``mask`` is False, preserving the order of the remaining entities
+        """
+        kept = int(np.count_nonzero(mask))
+        for array in self._data.values():
+            array[:kept] = array[:self.count][mask]
+        self.count = kept
+
+    def clear(self) -> None:
+        self.count = 0
+
+    def table(self) -> np.ndarray:
+        """
+        Copy of the entities as a (count, fields) float64 array, with the columns in field order
+        """
+        table = np.empty((self.count, len(self.fields)))
+        for col, name in enumerate(self.fields):
+            table[:, col] = self._data[name][:self.count]
+        return table
+
+    def load_table(self, table: np.ndarray) -> None:
+        """
+        Replace the entities with the rows of a ``table()``
+        """
+        self.count = 0
+        self._reserve(len(table))
+        for col, name in enumerate(self.fields):
+            self._data[name][:len(table)] = table[:, col]
+        self.count = len(table)
+
+
+class EntityBatch:
+    """
+    Entities of the same type for several engines, stored as (rows, capacity) padded arrays
+
+    Each engine uses one row through an ``EntityArrays`` (``batch.rows[idx]``), entries past the count of a row are
+    padding. Indexing the batch by field name gives the whole 2-D array, so the vectorized motion updates below can
+    advance every row in one pass.
+    """
+    def __init__(self, fields: Dict[str, Any], num_rows: int, capacity: int = 64):
+        self.fields = fields
+        self._data = {name: np.zeros((num_rows, capacity), dtype=dtype) for name, dtype in fields.items()}
+        self.rows = [_BatchRow(self, idx) for idx in range(num_rows)]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._data[name]
+
+    def __setitem__(self, name: str, value: Any) -> None:
+        self._data[name][...] = value
+
+    @property
+    def capacity(self) -> int:
+        return self._data["x"].shape[1]
+
+    def counts(self) -> np.ndarray:
+        return np.array([row.count for row in self.rows], dtype=np.int64)
+
+    def valid(self) -> np.ndarray:
+        """
+        Mask of the entries which hold an entity (as opposed to padding)
+        """
+        return np.arange(self.capacity)[None, :] < self.counts()[:, None]
+
+    def reserve(self, count: int) -> None:
+        # Grow every row (doubling) so that at least ``count`` entries fit, the rows are pointed at the new storage
+        if count > self.capacity:
+            capacity = max(count, 2 * self.capacity)
+            for name, array in self._data.items():
+                grown = np.zeros((len(array), capacity), dtype=array.dtype)
+                grown[:, :array.shape[1]] = array
+                self._data[name] = grown
+            for row in self.rows:
+                row.bind()
+
+
+class _BatchRow(EntityArrays):
+    """
+    ``EntityArrays`` whose storage is one row of an ``EntityBatch``
+    """
+    def __init__(self, batch: EntityBatch, idx: int):
+        self.fields = batch.fields
+        self.count = 0
+        self.batch = batch
+        self.idx = idx
+        self.bind()
+
+    def bind(self) -> None:
+        self._data = {name: batch_array[self.idx] for name, batch_array in self.batch._data.items()}
+
+    def _reserve(self, count: int) -> None:
+        self.batch.reserve(count)
+
+
+ASTEROID_FIELDS = {
+    "x": np.float64, "y": np.float64, "vx": np.float64, "vy": np.float64, "angle": np.float64,
+    "spin": np.float64, "size": np.int64, "geometry": np.int64, "half_width": np.float64,
+    "half_height": np.float64, "radius": np.float64, "alive": np.bool_,
+}
+
+BULLET_FIELDS = {
+    "x": np.float64, "y": np.float64, "vx": np.float64, "vy": np.float64, "angle": np.float64,
+    "team": np.int64, "alive": np.bool_,
+}
+
+SHIP_FIELDS = {
+    "x": np.float64, "y": np.float64, "vx": np.float64, "vy": np.float64, "angle": np.float64,
+    "speed": np.float64, "thrust": np.float64, "turn_rate": np.float64, "max_speed": np.float64,
+    "drag": np.float64, "respawning": np.float64, "respawn_time": np.float64, "fire_limiter": np.float64,
+    "fire_time": np.float64, "lives": np.int64, "bullets_remaining": np.int64, "team": np.int64, "id": np.int64,
+    "geometry": np.int64, "alive": np.bool_,
+}
+
+
+# Motion updates, written for the arrays of one engine (``EntityArrays``) or of several at once (``EntityBatch``)
+
+
+def move_asteroids(a: Any) -> None:
+    a["x"] += a["vx"]
+    a["y"] += a["vy"]
+    a["angle"] += a["spin"]
+
+    # Keep the angle within (-180, 180)
+    angle = a["angle"]
+    a["angle"] = np.where(angle > 180.0, angle - 360.0, np.where(angle < -180.0, angle + 360.0, angle))
+
+    # Wrap around the map edges
+    x, y, half_width, half_height = a["x"], a["y"], a["half_width"], a["half_height"]
+    a["x"] = np.where(x < LEFT_LIMIT - half_width, RIGHT_LIMIT + half_width,
+                      np.where(x > RIGHT_LIMIT + half_width, LEFT_LIMIT - half_width, x))
+    a["y"] = np.where(y > TOP_LIMIT + half_height, BOTTOM_LIMIT - half_height,
+                      np.where(y < BOTTOM_LIMIT - half_height, TOP_LIMIT + half_height, y))
+
+
+def move_bullets(b: Any, geometry: SpriteGeometry, valid: np.ndarray = None) -> None:
+    """
+    Move the bullets, marking those which left the screen as not alive (the caller drops them)
+
+    :param valid: Mask of the entries to update, by default all of them
+    """
+    x = b["x"] + b["vx"]
+    y = b["y"] + b["vy"]
+    width, height = geometry.width, geometry.height
+    off_screen = ((x < LEFT_LIMIT - width) | (x > SCREEN_WIDTH + width) |
+                  (y < BOTTOM_LIMIT - height) | (y > SCREEN_HEIGHT + height))
+    moved = np.ones(x.shape, dtype=bool) if valid is None else valid.copy()
+    if valid is not None:
+        off_screen &= valid
+
+    # A bullet which removes itself makes the sprite list iteration skip the following bullet for this frame
+    alive = b["alive"]
+    skipped = None
+    for position in np.argwhere(off_screen).tolist():
+        *row, idx = position
+        if (*row, idx) == skipped:
+            continue
+        alive[(*row, idx)] = False
+        skipped = (*row, idx + 1)
+        if idx + 1 < x.shape[-1]:
+            moved[skipped] = False
+
+    b["x"] = np.where(moved, x, b["x"])
+    b["y"] = np.where(moved, y, b["y"])
+
+
+def move_ships(s: Any, frequency: float, moving: np.ndarray) -> None:
+    """
+    Move the ships selected by the ``moving`` mask, except for the hit box based wraparound (see
+    ``ArrayEngine._wrap_ship()``)
+    """
+    f = frequency
+    x, y, vx, vy = s["x"][moving], s["y"][moving], s["vx"][moving], s["vy"][moving]
+
+    # Position update via the velocity of the last frame
+    x += vx
+    y += vy
+
+    # Handle respawning and fire rate timers
+    respawning = s["respawning"][moving]
+    respawning = np.where(respawning != 0, respawning - (1/f), respawning)
+    s["respawning"][moving] = np.where(respawning <= 0.0, 0, respawning)
+    fire_limiter = s["fire_limiter"][moving]
+    s["fire_limiter"][moving] = np.where(fire_limiter <= 0.0, 0.0, fire_limiter - (1/f))
+
+    # Apply drag
+    speed = s["speed"][moving]
+    slowed = np.where(speed > 0, speed - s["drag"][moving] / f, speed + s["drag"][moving] / f)
+    speed = np.where(speed > 0, np.where(slowed < 0, 0, slowed),
+                     np.where(speed < 0, np.where(slowed > 0, 0, slowed), speed))
+
+    # Apply thrust to speed and bounds check it
+    speed += s["thrust"][moving] / f
+    max_speed = s["max_speed"][moving]
+    speed = np.where(speed > max_speed, max_speed, np.where(speed < -max_speed, -max_speed, speed))
+
+    # Update the angle based on turning rate, keeping it within (-180, 180)
+    angle = s["angle"][moving] + s["turn_rate"][moving] / f
+    angle = np.where(angle > 180.0, angle - 360.0, np.where(angle < -180.0, angle + 360.0, angle))
+
+    # Use speed magnitude to get velocity vector, and update the position
+    radians = np.radians(angle)
+    vx = -np.sin(radians) * speed / f
+    vy = np.cos(radians) * speed / f
+    s["x"][moving] = x + vx / f
+    s["y"][moving] = y + vy / f
+    s["vx"][moving], s["vy"][moving], s["speed"][moving], s["angle"][moving] = vx, vy, speed, angle
+
+
+class AsteroidView:
+    """
+    Read-only, sprite-like view of one asteroid stored in an ``ArrayEngine``
+
+    Views index into the engine arrays, they are only valid until the asteroid list is next modified
+    """
+    __slots__ = ("_engine", "_idx")
+
+    def __init__(self, engine: "ArrayEngine", idx: int):
+        self._engine = engine
+        self._idx = idx
+
+    def _get(self, name: str):
+        return self._engine.asteroids.column(name)[self._idx]
+
+    @property
+    def frequency(self) -> float:
+        return self._engine.frequency
+
+    @property
+    def center_x(self) -> float:
+        return float(self._get("x"))
+
+    @property
+    def center_y(self) -> float:
+        return float(self._get("y"))
+
+    @property
+    def position(self) -> Tuple[float, float]:
+        return self.center_x, self.center_y
+
+    @property
+    def change_x(self) -> float:
+        return float(self._get("vx"))
+
+    @property
+    def change_y(self) -> float:
+        return float(self._get("vy"))
+
+    @property
+    def velocity(self) -> Tuple[float, float]:
+        return self.change_x, self.change_y
+
+    @property
+    def angle(self) -> float:
+        return float(self._get("angle"))
+
+    @property
+    def size(self) -> int:
+        return int(self._get("size"))
+
+    @property
+    def state(self) -> Dict[str, Tuple[float, float]]:
+        return {
+            "frequency": float(self.frequency),
+            "position": self.position,
+            "velocity": self.velocity,
+            "size": self.size,
+            "angle": self.angle
+        }
+
+    def split(self) -> List[Dict[str, Any]]:
+        """
+        Build the three child asteroids, drawing random numbers in the same order as ``AsteroidSprite.split()``
+        """
+        return [self._engine.new_asteroid(self.position, self.size - 1) for _ in range(3)]
+
+    def remove_from_sprite_lists(self) -> None:
+        self._engine.asteroids["alive"][self._idx] = False
+
+
+class BulletView:
+    """
+    Read-only, sprite-like view of one bullet stored in an ``ArrayEngine``
+    """
+    __slots__ = ("_engine", "_idx")
+
+    def __init__(self, engine: "ArrayEngine", idx: int):
+        self._engine = engine
+        self._idx = idx
+
+    def _get(self, name: str):
+        return self._engine.bullets.column(name)[self._idx]
+
+    @property
+    def frequency(self) -> float:
+        return self._engine.frequency
+
+    @property
+    def center_x(self) -> float:
+        return float(self._get("x"))
+
+    @property
+    def center_y(self) -> float:
+        return float(self._get("y"))
+
+    @property
+    def position(self) -> Tuple[float, float]:
+        return self.center_x, self.center_y
+
+    @property
+    def change_x(self) -> float:
+        return float(self._get("vx"))
+
+    @property
+    def change_y(self) -> float:
+        return float(self._get("vy"))
+
+    @property
+    def velocity(self) -> Tuple[float, float]:
+        return self.change_x, self.change_y
+
+    @property
+    def angle(self) -> float:
+        return float(self._get("angle"))
+
+    @property
+    def team(self) -> int:
+        return int(self._get("team"))
+
+    @property
+    def state(self) -> Dict[str, Tuple[float, float]]:
+        return {
+            "frequency": float(self.frequency),
+            "position": self.position,
+            "velocity": self.velocity,
+            "speed": float(self._engine.bullet_speed),
+            "angle": self.angle,
+            "team": self.team
+        }
+
+    def remove_from_sprite_lists(self) -> None:
+        self._engine.bullets["alive"][self._idx] = False
+
+
+class ShipView:
+    """
+    Sprite-like view of one ship stored in an ``ArrayEngine``, supporting everything the game environment, the
+    ``Dashboard`` and ``SpaceShip`` read from (or write to) a ``ShipSprite``
+
+    One view exists per ship for the whole game, so it can be held onto like the sprite it replaces
+    """
+    def __init__(self, engine: "ArrayEngine", idx: int, thrust_range: Tuple[float, float],
+                 turn_rate_range: Tuple[float, float]):
+        self._engine = engine
+        self._idx = idx
+        self.thrust_range = thrust_range
+        self.turn_rate_range = turn_rate_range
+
+        # SpaceShip handed to the controllers for this ship, reused every frame (see ``SpaceShip.of()``)
+        self.space_ship = None
+
+    def _get(self, name: str):
+        return self._engine.ships.column(name)[self._idx]
+
+    def _set(self, name: str, value) -> None:
+        self._engine.ships.column(name)[self._idx] = value
+
+    @property
+    def frequency(self) -> float:
+        return self._engine.frequency
+
+    @property
+    def id(self) -> int:
+        return int(self._get("id"))
+
+    @property
+    def team(self) -> int:
+        return int(self._get("team"))
+
+    @property
+    def lives(self) -> int:
+        return int(self._get("lives"))
+
+    @property
+    def alive(self) -> bool:
+        return bool(self._get("alive"))
+
+    @property
+    def center_x(self) -> float:
+        return float(self._get("x"))
+
+    @property
+    def center_y(self) -> float:
+        return float(self._get("y"))
+
+    @property
+    def position(self) -> Tuple[float, float]:
+        return self.center_x, self.center_y
+
+    @property
+    def change_x(self) -> float:
+        return float(self._get("vx"))
+
+    @property
+    def change_y(self) -> float:
+        return float(self._get("vy"))
+
+    @property
+    def velocity(self) -> Tuple[float, float]:
+        return self.change_x, self.change_y
+
+    @property
+    def angle(self) -> float:
+        return float(self._get("angle"))
+
+    @property
+    def speed(self) -> float:
+        return float(self._get("speed"))
+
+    @property
+    def max_speed(self) -> float:
+        return float(self._get("max_speed"))
+
+    @property
+    def drag(self) -> float:
+        return float(self._get("drag"))
+
+    @property
+    def thrust(self) -> float:
+        return float(self._get("thrust"))
+
+    @thrust.setter
+    def thrust(self, thrust: float):
+        self._set("thrust", thrust)
+
+    @property
+    def turn_rate(self) -> float:
+        return float(self._get("turn_rate"))
+
+    @turn_rate.setter
+    def turn_rate(self, turn_rate: float):
+        self._set("turn_rate", turn_rate)
+
+    @property
+    def bullets_remaining(self) -> int:
+        return int(self._get("bullets_remaining"))
+
+    @property
+    def _respawning(self) -> float:
+        return float(self._get("respawning"))
+
+    @_respawning.setter
+    def _respawning(self, value: float):
+        self._set("respawning", value)
+
+    @property
+    def is_respawning(self) -> bool:
+        return True if self._respawning else False
+
+    @property
+    def respawn_time_left(self) -> float:
+        return self._respawning
+
+    @property
+    def respawn_time(self) -> float:
+        return float(self._get("respawn_time"))
+
+    @property
+    def can_fire(self) -> bool:
+        return (not self._get("fire_limiter")) and self.bullets_remaining != 0
+
+    @property
+    def fire_rate(self) -> float:
+        return 1 / float(self._get("fire_time"))
+
+    @property
+    def fire_wait_time(self) -> float:
+        return float(self._get("fire_limiter"))
+
+    @property
+    def state(self) -> Dict[str, Any]:
+        return {
+            "is_respawning": True if self.is_respawning else False,
+            "respawn_time_left": float(self.respawn_time_left),
+            "frequency": float(self.frequency),
+            "position": self.position,
+            "velocity": self.velocity,
+            "speed": self.speed,
+            "angle": self.angle,
+            "max_speed": self.max_speed,
+            "id": self.id,
+            "team": self.team,
+            "lives_remaining": self.lives
+        }
+
+    @property
+    def position_str(self) -> str:
+        return f"({self.center_x:.3f}, {self.center_y:.3f})"
+
+    def destroy(self) -> None:
+        self._set("lives", self.lives - 1)
+
+    def respawn(self, position: Tuple[float, float], angle: float = 0.0) -> None:
+        self._set("respawning", self.respawn_time)
+        self._set("x", position[0])
+        self._set("y", position[1])
+        self._set("speed", 0)
+        self._set("angle", angle)
+
+    def fire_bullet(self) -> Dict[str, Any]:
+        """
+        Fire a bullet, starting at this ship's position/angle
+
+        :return: Bullet state which can be appended to the engine's ``bullet_list``
+        """
+        self._set("fire_limiter", self._get("fire_time"))
+
+        # remove a bullet from bullets remaining
+        if self.bullets_remaining > 0:
+            self._set("bullets_remaining", self.bullets_remaining - 1)
+
+        return self._engine.new_bullet(self.angle, self.position, self.team)
+
+    def remove_from_sprite_lists(self) -> None:
+        self._set("alive", False)
+        self._engine.player_sprite_list.refresh()
+
+
+class _ArrayList:
+    """
+    Minimal ``arcade.SpriteList`` stand-in backed by the arrays of an ``ArrayEngine``
+    """
+    def __init__(self, engine: "ArrayEngine"):
+        self.engine = engine
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def positions(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Center positions (x, y) of the entities in list order
+        """
+        raise NotImplementedError()
+
+
+class AsteroidList(_ArrayList):
+    def __len__(self) -> int:
+        return len(self.engine.asteroids)
+
+    def __getitem__(self, idx: int) -> AsteroidView:
+        return AsteroidView(self.engine, range(len(self))[idx])
+
+    def __iter__(self) -> Iterator[AsteroidView]:
+        return (AsteroidView(self.engine, idx) for idx in range(len(self)))
+
+    def append(self, asteroid: Dict[str, Any]) -> None:
+        self.engine.asteroids.append(**asteroid)
+
+    def extend(self, asteroids: List[Dict[str, Any]]) -> None:
+        for asteroid in asteroids:
+            self.append(asteroid)
+
+    def positions(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.engine.asteroids["x"], self.engine.asteroids["y"]
+
+    def on_update(self, delta_time: float = 1/60) -> None:
+        self.engine.update_asteroids()
+
+
+class BulletList(_ArrayList):
+    def __len__(self) -> int:
+        return len(self.engine.bullets)
+
+    def __getitem__(self, idx: int) -> BulletView:
+        return BulletView(self.engine, range(len(self))[idx])
+
+    def __iter__(self) -> Iterator[BulletView]:
+        return (BulletView(self.engine, idx) for idx in range(len(self)))
+
+    def append(self, bullet: Dict[str, Any]) -> None:
+        self.engine.bullets.append(**bullet)
+
+    def positions(self) -> Tuple[np.ndarray, np.ndarray]:
+        return self.engine.bullets["x"], self.engine.bullets["y"]
+
+    def on_update(self, delta_time: float = 1/60) -> None:
+        self.engine.update_bullets()
+
+
+class ShipList(_ArrayList):
+    def __init__(self, engine: "ArrayEngine"):
+        super().__init__(engine)
+        self.views: List[ShipView] = []
+        self._alive_views: List[ShipView] = []
+
+    def __len__(self) -> int:
+        return len(self._alive_views)
+
+    def __getitem__(self, idx: int) -> ShipView:
+        return self._alive_views[idx]
+
+    def __iter__(self) -> Iterator[ShipView]:
+        return iter(self._alive_views)
+
+    def positions(self) -> Tuple[np.ndarray, np.ndarray]:
+        slots = [view._idx for view in self._alive_views]
+        return self.engine.ships["x"][slots], self.engine.ships["y"][slots]
+
+    def refresh(self) -> None:
+        # Rebuild the ordered list of ships which are still in the game
+        self._alive_views = [view for view in self.views if view.alive]
+
+    def on_update(self, delta_time: float = 1/60) -> None:
+        self.engine.update_ships()
+
+
+class ArrayEngine:
+    """
+    Vectorized simulation backend reproducing ``AsteroidGame.on_update()``
+
+    The game environment keeps the role of the referee (score, printing, sounds, killing ships), while this class
+    moves every entity and resolves the collisions. The order of operations follows the sprite lists exactly, including
+    the way arcade's Python list iteration skips the entity following one that is removed mid-iteration, so that
+    games evolve identically with either backend.
+    """
+    bullet_speed = 800
+
+    def __init__(self, frequency: float, rng: Any = None):
+        """
+        :param frequency: Operating frequency of the game (Hz)
+        :param rng: Random number generator for the split asteroids, the ``random`` module by default
+        """
+        self.frequency = frequency
+        self.rng = rng if rng is not None else random
+
+        self.asteroids = EntityArrays(ASTEROID_FIELDS)
+        self.bullets = EntityArrays(BULLET_FIELDS)
+        self.ships = EntityArrays(SHIP_FIELDS, capacity=8)
+
+        # Sprite list stand-ins used by the game environment
+        self.asteroid_list = AsteroidList(self)
+        self.bullet_list = BulletList(self)
+        self.player_sprite_list = ShipList(self)
+
+        # Broadphase grids, rebuilt at the start of each collision check
+        self.asteroid_grid = SpatialHash()
+        self.ship_grid = SpatialHash()
+
+        self._bullet_geometry = get_geometry(geometry_id(get_texture(BULLET_IMAGE), SCALE))
+        self._asteroid_geometries = {size: [geometry_id(get_texture(image), SCALE * 1.5) for image in images]
+                                     for size, images in ASTEROID_IMAGES.items()}
+
+    def use_arrays(self, asteroids: EntityArrays, bullets: EntityArrays, ships: EntityArrays) -> None:
+        """
+        Store the entities in the given arrays from now on, such as rows of the ``EntityBatch`` of a ``VecEnv``
+
+        :param asteroids: Arrays with the ``ASTEROID_FIELDS``
+        :param bullets: Arrays with the ``BULLET_FIELDS``
+        :param ships: Arrays with the ``SHIP_FIELDS``
+        """
+        self.asteroids, self.bullets, self.ships = asteroids, bullets, ships
+
+    """
+    Entity creation
+    """
+    def load(self, ships: List[ShipSprite], asteroids: List[AsteroidSprite]) -> None:
+        """
+        Reset the engine to the starting state described by the given sprites (as built by a ``Scenario``)
+
+        :param ships: ShipSprites to start with
+        :param asteroids: AsteroidSprites to start with
+        """
+        self.asteroids.clear()
+        self.bullets.clear()
+        self.ships.clear()
+
+        for sprite in asteroids:
+            self.asteroid_list.append(self._asteroid_state(sprite.position, sprite.change_x, sprite.change_y,
+                                                           sprite.angle, sprite.change_angle, sprite.size,
+                                                           geometry_id(sprite.texture, sprite.scale)))
+
+        self.player_sprite_list.views = []
+        for sprite in ships:
+            idx = self.ships.append(x=sprite.center_x, y=sprite.center_y, vx=sprite.change_x, vy=sprite.change_y,
+                                    angle=sprite.angle, speed=sprite.speed, thrust=sprite.thrust,
+                                    turn_rate=sprite.turn_rate, max_speed=sprite.max_speed, drag=sprite.drag,
+                                    respawning=sprite._respawning, respawn_time=sprite._respawn_time,
+                                    fire_limiter=sprite._fire_limiter, fire_time=sprite._fire_time,
+                                    lives=sprite.lives, bullets_remaining=sprite.bullets_remaining, team=sprite.team,
+                                    id=sprite.id, geometry=geometry_id(sprite.texture, sprite.scale), alive=True)
+            self.player_sprite_list.views.append(ShipView(self, idx, sprite.thrust_range, sprite.turn_rate_range))
+        self.player_sprite_list.refresh()
+
+    def snapshot(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Tuple[Any, ...]]:
+        """
+        Copy of the asteroid, bullet and ship tables (see ``EntityArrays.table()``), with the control ranges of the
+        ships
+        """
+        ranges = tuple((view.thrust_range, view.turn_rate_range) for view in self.player_sprite_list.views)
+        return self.asteroids.table(), self.bullets.table(), self.ships.table(), ranges
+
+    def restore(self, asteroids: np.ndarray, bullets: np.ndarray, ships: np.ndarray, ranges: Tuple[Any, ...]) -> None:
+        """
+        Go back to the entities of a ``snapshot()``, keeping the ship views when the snapshot has as many ships
+        """
+        self.asteroids.load_table(asteroids)
+        self.bullets.load_table(bullets)
+        self.ships.load_table(ships)
+
+        if len(self.player_sprite_list.views) != len(ships):
+            self.player_sprite_list.views = [ShipView(self, idx, thrust_range, turn_rate_range)
+                                             for idx, (thrust_range, turn_rate_range) in enumerate(ranges)]
+        self.player_sprite_list.refresh()
+
+    @staticmethod
+    def _asteroid_state(position: Tuple[float, float], change_x: float, change_y: float, angle: float,
+                        spin: float, size: int, geometry: int) -> Dict[str, Any]:
+        shape = get_geometry(geometry)
+        return dict(x=position[0], y=position[1], vx=change_x, vy=change_y, angle=angle, spin=spin, size=size,
+                    geometry=geometry, half_width=shape.width / 2.0, half_height=shape.height / 2.0,
+                    radius=shape.bounding_radius, alive=True)
+
+    def new_asteroid(self, position: Tuple[float, float], size: int) -> Dict[str, Any]:
+        """
+        State of a new randomly moving asteroid, mirroring the random draws of the ``AsteroidSprite`` constructor
+        """
+        geometry = self.rng.choice(self._asteroid_geometries[size])
+        spin = (self.rng.random() - 0.5) * 120 / self.frequency
+
+        speed_scaler = 2.0 + (4.0 - size) / 4.0
+        max_speed = 60.0 * speed_scaler
+        starting_angle = self.rng.random()*360.0 - 180.0
+        starting_speed = self.rng.random()*max_speed - max_speed/2.0
+
+        change_x = -starting_speed * math.sin(math.radians(starting_angle)) / self.frequency
+        change_y = starting_speed * math.cos(math.radians(starting_angle)) / self.frequency
+        return self._asteroid_state(position, change_x, change_y, 0.0, spin, size, geometry)
+
+    def new_bullet(self, starting_angle: float, starting_position: Tuple[float, float], team: int) -> Dict[str, Any]:
+        """
+        State of a new bullet, mirroring the ``BulletSprite`` constructor (which moves the bullet by one step)
+        """
+        change_x = -math.sin(math.radians(starting_angle)) * self.bullet_speed / self.frequency
+        change_y = math.cos(math.radians(starting_angle)) * self.bullet_speed / self.frequency
+        angle = math.degrees(math.atan2(change_y, change_x))
+        return dict(x=starting_position[0] + change_x, y=starting_position[1] + change_y, vx=change_x, vy=change_y,
+                    angle=angle, team=team, alive=True)
+
+    """
+    Motion updates
+    """
+    def update_asteroids(self) -> None:
+        if len(self.asteroids):
+            move_asteroids(self.asteroids)
+
+    def update_bullets(self) -> None:
+        if len(self.bullets):
+            move_bullets(self.bullets, self._bullet_geometry)
+            self._compact(self.bullets)
+
+    def update_ships(self) -> None:
+        s = self.ships
+        alive = s["alive"].copy()
+        if not alive.any():
+            return
+
+        move_ships(s, self.frequency, alive)
+
+        # Wraparound depends on the rotated hit box extents, only a handful of ships so resolve them one by one
+        for idx in np.flatnonzero(alive).tolist():
+            self._wrap_ship(idx)
+
+    def _wrap_ship(self, idx: int) -> None:
+        s = self.ships
+        shape = get_geometry(int(s["geometry"][idx]))
+        angle = float(s["angle"][idx])
+
+        x_points = [point[0] for point in adjusted_hit_box(shape, angle, float(s["x"][idx]), float(s["y"][idx]))]
+        if max(x_points) < 0:
+            s["x"][idx] += SCREEN_WIDTH - min(x_points)
+        elif min(x_points) > SCREEN_WIDTH:
+            s["x"][idx] -= max(x_points) - 0
+
+        y_points = [point[1] for point in adjusted_hit_box(shape, angle, float(s["x"][idx]), float(s["y"][idx]))]
+        if min(y_points) < BOTTOM_LIMIT:
+            s["y"][idx] -= max(y_points) - SCREEN_HEIGHT
+        elif max(y_points) > SCREEN_HEIGHT:
+            s["y"][idx] -= min(y_points) - BOTTOM_LIMIT
+
+    """
+    Collision checks
+    """
+    def compact(self) -> None:
+        """
+        Drop the asteroids and bullets which were removed (views handed out before this call become invalid)
+        """
+        self._compact(self.asteroids)
+        self._compact(self.bullets)
+
+    @staticmethod
+    def _compact(arrays: EntityArrays) -> None:
+        alive = arrays["alive"]
+        if not alive.all():
+            arrays.keep(alive)
+
+    @staticmethod
+    def _in_range(x: Any, y: Any, radius: Any, others_x: np.ndarray, others_y: np.ndarray,
+                  others_radius: np.ndarray) -> np.ndarray:
+        # Hit boxes can only intersect if their bounding circles do, a tighter version of arcade's pre-check
+        diff_x = x - others_x
+        diff_y = y - others_y
+        radius_sum = radius + others_radius
+        return diff_x * diff_x + diff_y * diff_y <= radius_sum * radius_sum
+
+    def _build_asteroid_grid(self) -> None:
+        a = self.asteroids
+        self.asteroid_grid.build(a["x"], a["y"], a["radius"])
+
+    def _add_asteroids(self, start: int) -> None:
+        # Register the asteroids appended (by splits) since ``start`` with the grid
+        a = self.asteroids
+        if len(a) > start:
+            self.asteroid_grid.add(a["x"][start:], a["y"][start:], a["radius"][start:])
+
+    def _asteroid_hits(self, shape: SpriteGeometry, angle: float, x: float, y: float) -> List[int]:
+        """
+        Indices (in list order) of the asteroids that collide with an entity of the given shape and pose
+        """
+        a = self.asteroids
+        alive = a["alive"]
+        candidates = [idx for idx in self.asteroid_grid.query(x, y, shape.bounding_radius) if alive[idx]]
+        if not candidates:
+            return []
+
+        hit_box = adjusted_hit_box(shape, angle, x, y)
+        return [idx for idx in candidates
+                if arcade.are_polygons_intersecting(hit_box, adjusted_hit_box(get_geometry(int(a["geometry"][idx])),
+                                                                              float(a["angle"][idx]),
+                                                                              float(a["x"][idx]),
+                                                                              float(a["y"][idx])))]
+
+    def _ships_collide(self, ship: ShipView, other: ShipView) -> bool:
+        s = self.ships
+        shape, other_shape = get_geometry(int(s["geometry"][ship._idx])), get_geometry(int(s["geometry"][other._idx]))
+        if not self._in_range(ship.center_x, ship.center_y, shape.bounding_radius,
+                              other.center_x, other.center_y, other_shape.bounding_radius):
+            return False
+        return arcade.are_polygons_intersecting(adjusted_hit_box(shape, ship.angle, ship.center_x, ship.center_y),
+                                                adjusted_hit_box(other_shape, other.angle, other.center_x,
+                                                                 other.center_y))
+
+    def check_bullet_asteroid_collisions(self, game) -> None:
+        b, a = self.bullets, self.asteroids
+        if not len(b) or not len(a):
+            return
+
+        # Bullets which are within collision range of any asteroid, visited in bullet list order
+        self._build_asteroid_grid()
+        radius = self._bullet_geometry.bounding_radius
+        pending = np.unique(self.asteroid_grid.pairs(b["x"], b["y"], radius)[0]).tolist()  # sorted, so already a heap
+
+        last, skipped = -1, -1
+        while pending:
+            idx = heapq.heappop(pending)
+            if idx <= last or idx == skipped:
+                continue
+            last = idx
+
+            hits = self._asteroid_hits(self._bullet_geometry, float(b["angle"][idx]), float(b["x"][idx]),
+                                       float(b["y"][idx]))
+            if not hits:
+                continue
+
+            team = int(b["team"][idx])
+            game.score.bullets_hit_asteroids[team-1] += 1
+
+            # Break up and remove asteroids, children are appended at the end of the asteroid arrays
+            num_asteroids = len(a)
+            for asteroid_idx in hits:
+                game.split_asteroid(AsteroidView(self, asteroid_idx), team)
+            b["alive"][idx] = False
+
+            # Removing the bullet makes the list iteration skip the next one
+            skipped = idx + 1
+
+            # Bullets later in the list may collide with the newly created asteroids
+            if len(a) > num_asteroids:
+                self._add_asteroids(num_asteroids)
+                later = slice(idx + 1, len(b))
+                in_range = self._in_range(b["x"][later, None], b["y"][later, None], radius,
+                                          a["x"][None, num_asteroids:], a["y"][None, num_asteroids:],
+                                          a["radius"][None, num_asteroids:])
+                for later_idx in (np.flatnonzero(in_range.any(axis=1)) + idx + 1).tolist():
+                    heapq.heappush(pending, later_idx)
+
+        self._compact(b)
+        self._compact(a)
+
+    def check_asteroid_ship_collisions(self, game) -> None:
+        # Iterate like the sprite list, a ship removed from the game makes the iteration skip the next one
+        ships = list(self.player_sprite_list)
+        if ships:
+            self._build_asteroid_grid()
+        idx = 0
+        while idx < len(ships):
+            ship = ships[idx]
+            idx += 1
+
+            if not ship.respawn_time_left:
+                game.score.distance_travelled += (ship.change_x ** 2 + ship.change_y ** 2) ** 0.5  # meters
+
+                hits = self._asteroid_hits(get_geometry(int(self.ships["geometry"][ship._idx])), ship.angle,
+                                           ship.center_x, ship.center_y)
+                if hits:
+                    game.score.deaths[ship.team-1] += 1
+
+                    game._print_terminal(f"Ship {ship.id} crashed into asteroid: at {ship.position_str}, t={game.score.time:.3f} seconds")
+
+                    num_asteroids = len(self.asteroids)
+                    game.split_asteroid(AsteroidView(self, hits[0]), ship.team)
+                    self._add_asteroids(num_asteroids)
+                    game.kill_ship(ship)
+                    if not ship.alive:
+                        ships.remove(ship)
+
+        self._compact(self.asteroids)
+
+    def check_ship_ship_collisions(self, game) -> None:
+        ships = list(self.player_sprite_list)
+        if len(ships) < 2:
+            return
+
+        # Ships only move during the check when they respawn, which also makes them invulnerable
+        s, grid_ships = self.ships, list(ships)
+        idxs = [ship._idx for ship in ships]
+        self.ship_grid.build(s["x"][idxs], s["y"][idxs],
+                             [get_geometry(int(geometry)).bounding_radius for geometry in s["geometry"][idxs]])
+
+        idx = 0
+        while idx < len(ships):
+            ship = ships[idx]
+            idx += 1
+
+            if not ship.respawn_time_left:
+                radius = get_geometry(int(s["geometry"][ship._idx])).bounding_radius
+                collided_ships = [grid_ships[other_idx]
+                                  for other_idx in self.ship_grid.query(ship.center_x, ship.center_y, radius)]
+                collided_ships = [other for other in collided_ships
+                                  if other is not ship and other in ships and self._ships_collide(ship, other)]
+
+                # Filter out collisions if the target ship is still respawning
+                valid_collided_ships = [other for other in collided_ships if not other.respawn_time_left]
+
+                if not valid_collided_ships:
+                    continue
+
+                for other in valid_collided_ships + [ship]:
+                    game.score.deaths[other.team-1] += 1
+
+                    game._print_terminal(f"Ship {other.id} crashed into other ship: at {other.position_str}, t={game.score.time:.3f} seconds")
+                    game.kill_ship(other)
+                    if not other.alive and other in ships:
+                        ships.remove(other)
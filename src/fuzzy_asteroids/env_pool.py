@@ -0,0 +1,142 @@
+"""
+Pool of reusable game environments, for training runs which play a very large number of episodes
+
+Building an environment is expensive (a window or graphics context, sounds, controller worker threads) and arcade
+does not give back everything an environment allocates, so a long run should build a few environments and play every
+episode in them. ``EnvironmentPool`` hands out environments reset for a new game, and takes them back once the game is
+over: their sprite lists, engine arrays, dashboard and controller workers are reused by the next game, while the
+sprites, controllers and score of the finished game are dropped (see ``AsteroidGame.clear_game()``). Closing the pool
+stops the workers of every environment it built.
+"""
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List
+
+from .fuzzy_asteroids import TrainerEnvironment, HeadlessEnvironment
+from .fuzzy_controller import ControllerBase
+from .util import Scenario, Score
+
+
+class EnvironmentPool:
+    """
+    Recycling pool of environments built with the same settings
+
+    ``acquire()`` returns an idle environment (or builds one) with a new game started, ``release()`` gives it back.
+    Up to ``max_size`` idle environments are kept, the environments released past that are closed.
+    """
+    def __init__(self, settings: Dict[str, Any] = None, max_size: int = 8, env_class: type = HeadlessEnvironment,
+                 **kwargs):
+        """
+        :param settings: Settings of the environments (copied for each one)
+        :param max_size: Maximum number of idle environments kept for reuse
+        :param env_class: Environment class, ``HeadlessEnvironment`` or another ``TrainerEnvironment``
+        :param kwargs: Other arguments of the environment constructor (``track_compute_cost``, ``controller_timeout``...)
+        """
+        if not issubclass(env_class, TrainerEnvironment):
+            raise ValueError(f"The environments of a pool must be TrainerEnvironments, not {env_class.__name__}")
+        if max_size < 1:
+            raise ValueError(f"The maximum size of an environment pool must be 1 or more, not {max_size}")
+
+        self.settings = dict(settings) if settings else dict()
+        self.max_size = max_size
+        self.env_class = env_class
+        self.kwargs = kwargs
+        self.closed = False
+
+        self._free: List[TrainerEnvironment] = []
+        self._in_use: Dict[int, TrainerEnvironment] = dict()
+
+        # Counters to measure how effective the pool is
+        self.created = 0
+        self.reused = 0
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+    @property
+    def in_use(self) -> int:
+        """
+        Number of environments handed out and not released yet
+        """
+        return len(self._in_use)
+
+    def acquire(self, scenario: Scenario = None, seed: int = None, controller: Dict[int, ControllerBase] = None,
+                score: Score = None) -> TrainerEnvironment:
+        """
+        Get an environment with a new game started, reusing an idle one if possible
+
+        The arguments are those of ``TrainerEnvironment.reset()``, the game is played with ``run()`` (with the same
+        arguments) or ``step()``.
+        """
+        env = self._get()
+        env.reset(scenario=scenario, seed=seed, controller=controller, score=score)
+        return env
+
+    def _get(self) -> TrainerEnvironment:
+        if self.closed:
+            raise RuntimeError("Cannot acquire an environment from a closed pool")
+
+        if self._free:
+            env = self._free.pop()
+            self.reused += 1
+        else:
+            env = self.env_class(settings=dict(self.settings), **self.kwargs)
+            self.created += 1
+
+        self._in_use[id(env)] = env
+        return env
+
+    def release(self, env: TrainerEnvironment) -> None:
+        """
+        Give back an environment acquired from this pool, the score of its game stays with the caller
+        """
+        if self._in_use.pop(id(env), None) is not env:
+            raise ValueError("The environment was not acquired from this pool (or was already released)")
+
+        env.clear_game()
+        if self.closed or len(self._free) >= self.max_size:
+            self._close(env)
+        else:
+            self._free.append(env)
+
+    @contextmanager
+    def environment(self, **kwargs) -> Iterator[TrainerEnvironment]:
+        """
+        Context manager which acquires an environment (with the arguments of ``acquire()``) and releases it on exit
+        """
+        env = self.acquire(**kwargs)
+        try:
+            yield env
+        finally:
+            self.release(env)
+
+    def run(self, controller: Dict[int, ControllerBase], scenario: Scenario = None, score: Score = None) -> Score:
+        """
+        Play a whole game with the given controllers in a pooled environment
+
+        :return: Score of the game
+        """
+        env = self._get()
+        try:
+            return env.run(controller=controller, scenario=scenario, score=score)
+        finally:
+            self.release(env)
+
+    @staticmethod
+    def _close(env: TrainerEnvironment) -> None:
+        env.release_resources()
+        env.close()
+
+    def close(self) -> None:
+        """
+        Close the idle environments, the environments still in use are closed when they are released
+        """
+        self.closed = True
+        for env in self._free:
+            self._close(env)
+        self._free.clear()
+
+    def __enter__(self) -> "EnvironmentPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
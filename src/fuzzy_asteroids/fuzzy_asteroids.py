@@ -13,13 +13,19 @@ import math
 import arcade
 import time
 import statistics
-import asyncio
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+import weakref
 from contextlib import contextmanager
-from typing import List, Any, Tuple, Dict
+from types import MappingProxyType
+from typing import List, Any, Tuple, Dict, Mapping
 
 from .game import AsteroidGame, ShipSprite, Score, Scenario, StoppingCondition
-from .fuzzy_controller import SpaceShip, ControllerBase
+from .snapshot import GameSnapshot
+from .fuzzy_controller import SpaceShip, ControllerBase, call_controller, _has_batch
+from .observations import observe
+from .dispatch import DeadlineDispatcher
+from .isolation import ProcessIsolation
+from .profiling import ControllerProfiler
+from .stats import EvaluationStats, combined
 from .settings import *
 
 
@@ -49,6 +55,27 @@ class FuzzyAsteroidGame(AsteroidGame):
         # Turn off key presses to ensure the controller is doing what it should
         _settings.update({"allow_key_presses": False})
 
+        # Format of the asteroids, bullets and ships given to the controller, "states" dictionaries or "arrays"
+        self.observation_type = _settings.get("observation", "states")
+        if self.observation_type not in ("states", "arrays"):
+            raise ValueError(f"Unknown observation \"{self.observation_type}\", the observation setting must be "
+                             f"\"states\" or \"arrays\"")
+
+        # Where the controllers run, in this process ("thread") or in a worker process per team ("process")
+        self.controller_isolation = _settings.get("controller_isolation", "thread")
+        if self.controller_isolation not in ("thread", "process"):
+            raise ValueError(f"Unknown controller isolation \"{self.controller_isolation}\", the controller_isolation "
+                             f"setting must be \"thread\" or \"process\"")
+
+        # Number of frames each controller decision is held for (the controllers are called one frame out of N)
+        self.action_repeat = _settings.get("action_repeat", 1)
+        if not isinstance(self.action_repeat, int) or self.action_repeat < 1:
+            raise ValueError(f"The action_repeat setting must be a whole number of frames (1 or more), not "
+                             f"{self.action_repeat!r}")
+
+        # Whether the controllers of all teams run at the same time in each frame, sharing one deadline
+        self.concurrent_teams = bool(_settings.get("concurrent_teams", False))
+
         # Call constructor of AsteroidGame to set up the environment
         super().__init__(settings=_settings)
 
@@ -57,7 +84,12 @@ class FuzzyAsteroidGame(AsteroidGame):
         self.controller_timeout = controller_timeout
         self.ignore_exceptions = ignore_exceptions
         self.time_elapsed = 0
+        self.evaluation_stats = [EvaluationStats(), EvaluationStats()]
+
+        # Every evaluation time (and asteroid count) is only kept with the "keep_eval_samples" setting
+        self.keep_eval_samples = bool(_settings.get("keep_eval_samples", False))
         self.evaluation_times = []
+        self.team_evaluation_times = [[], []]
         self.num_asteroids = []
         self.total_controller_evaluation_time = 0
 
@@ -65,24 +97,57 @@ class FuzzyAsteroidGame(AsteroidGame):
         self.timed_out = False
         self.exceptioned_out = False
 
-        # Create threadpool executor to run tasks in, we have access to 2 threadpools which should allow enough overhead
-        # for evaluation times ~2 times operating frequency
-        self.executor = ThreadPoolExecutor(4)
-        self.loop = asyncio.get_event_loop()
+        # Persistent worker thread per team which runs the controllers when they can time out (see ``dispatch``), the
+        # threads are stopped by ``release_resources()`` or when the environment is garbage collected
+        self.dispatcher = DeadlineDispatcher()
+        self._finalizers = [weakref.finalize(self, self.dispatcher.close)]
+
+        # Worker processes of the controllers with the "process" isolation (see ``isolation``), also stopped on collection
+        self.isolation = None
+        if self.controller_isolation == "process":
+            self.isolation = ProcessIsolation(limits=_settings.get("controller_limits"))
+            self._finalizers.append(weakref.finalize(self, self.isolation.close))
+
+        # Optional profiler of the controller calls (see ``profiling``), its sampling thread is stopped on collection
+        self.profiler = ControllerProfiler.from_setting(_settings.get("controller_profile"))
+        if self.profiler:
+            if self.isolation:
+                raise ValueError("Controllers running in their own processes cannot be profiled")
+            self._finalizers.append(weakref.finalize(self, self.profiler.close))
+
+        # Snapshot of the game state returned by ``data``, with the (score, frame, stopping condition) it was built for
+        self._data = None
+        self._data_key = None
 
     @property
-    def data(self) -> Dict[str, Any]:
-        # Getting data via this "getter" method will be read-only and un-assignable
-        return {
-            "frame": int(self.score.frame_count),
-            "time": int(self.score.time),
-            "stopping_condition": self.score.stopping_condition,
-            "map_dimensions": tuple(self.get_size()),
-            "asteroids": tuple(sprite.state for sprite in self.asteroid_list),
-            # "bullets": tuple(sprite.state for sprite in self.asteroid_list),
-            "bullets": tuple(sprite.state for sprite in self.bullet_list),
-            "ships": tuple(sprite.state for sprite in self.player_sprite_list),
-        }
+    def data(self) -> Mapping[str, Any]:
+        """
+        Read-only snapshot of the game state, given to the controllers
+
+        It is built the first time it is read in a frame and then shared by every ship (and team) until the game
+        advances, so the entries (including the sprite state dictionaries) cannot be modified. With the "arrays"
+        observation setting the asteroids, bullets and ships are ``observations.Columns`` of read-only arrays.
+        """
+        key = (self.score, self.score.frame_count, self.score.stopping_condition)
+        if self._data_key != key:
+            if self.observation_type == "arrays":
+                asteroids, bullets, ships = observe(self)
+            else:
+                asteroids = tuple(MappingProxyType(sprite.state) for sprite in self.asteroid_list)
+                bullets = tuple(MappingProxyType(sprite.state) for sprite in self.bullet_list)
+                ships = tuple(MappingProxyType(sprite.state) for sprite in self.player_sprite_list)
+
+            self._data = MappingProxyType({
+                "frame": int(self.score.frame_count),
+                "time": int(self.score.time),
+                "stopping_condition": self.score.stopping_condition,
+                "map_dimensions": tuple(self.get_size()),
+                "asteroids": asteroids,
+                "bullets": bullets,
+                "ships": ships,
+            })
+            self._data_key = key
+        return self._data
 
     def start_new_game(self, controller: Dict[int, ControllerBase] = None, scenario: Scenario = None, score: Score = None) -> None:
         """
@@ -95,6 +160,9 @@ class FuzzyAsteroidGame(AsteroidGame):
         # Store controller
         self.controller = controller
 
+        # A new game always gets a new snapshot, even when the score (and its frame count) is reused
+        self._data_key = None
+
         # Check to see if user has given the fuzzy asteroid game a valid controller
         if not controller:
             raise ValueError("No controller object given to the FuzzyAsteroid() constructor")
@@ -108,82 +176,155 @@ class FuzzyAsteroidGame(AsteroidGame):
         # Call start new game
         AsteroidGame.start_new_game(self, scenario=scenario, score=score)
 
-    # @asyncio.coroutine
-    async def coro(self, loop, ship):
-        # Run the controller actions in an thread pool executor as an async coroutine
-        # This allows the controller to be timed out and the environment to proceed with no inputs
-        # yield from loop.run_in_executor(self.executor, self.controller.actions, ship, self.data)
-        if ship.team > 0:
-            # yield from loop.run_in_executor(self.executor, self.controller[ship.team].actions, ship, self.data)
-            await loop.run_in_executor(self.executor, self.controller[ship.team].actions, ship, self.data)
+    def clear_game(self) -> None:
+        # The controllers and the data of the last game are not kept alive by the environment
+        AsteroidGame.clear_game(self)
+        self.controller = None
+        self._data = None
+        self._data_key = None
+
+    def release_resources(self) -> None:
+        """
+        Stop the controller worker threads (and processes) and the profiler now, instead of when the environment is
+        garbage collected
+        """
+        for finalizer in self._finalizers:
+            finalizer()
+
+    def restore(self, snapshot: GameSnapshot) -> None:
+        # The frame count can go back to the one the current data was built for
+        AsteroidGame.restore(self, snapshot)
+        self._data_key = None
+
+    def run_controller(self, team: int, ships: Tuple[SpaceShip, ...]) -> None:
+        """
+        Run the controller of a team on its ships, with a single ``actions_batch()`` call if the controller has one
+        """
+        if self.profiler and self.profiler.active:
+            self.profiler.call(team, call_controller, self.controller[team], ships, self.data)
         else:
-            # yield from loop.run_in_executor(self.executor, self.controller[1].actions, ship, self.data)
-            await loop.run_in_executor(self.executor, self.controller[1].actions, ship, self.data)
-
-    # # @asyncio.coroutine
-    # async def coro1(self, loop, ship):
-    #     # Run the controller actions in an thread pool executor as an async coroutine
-    #     # This allows the controller to be timed out and the environment to proceed with no inputs
-    #     # yield from loop.run_in_executor(self.executor, self.controller.actions, ship, self.data)
-    #     # if ship.team > 0:
-    #     #     # yield from loop.run_in_executor(self.executor, self.controller[ship.team].actions, ship, self.data)
-    #     #     await loop.run_in_executor(self.executor, self.controller[ship.team].actions, ship, self.data)
-    #     # else:
-    #         # yield from loop.run_in_executor(self.executor, self.controller[1].actions, ship, self.data)
-    #     await loop.run_in_executor(self.executor, self.controller[1].actions, ship, self.data)
-    #
-    # # @asyncio.coroutine
-    # async def coro2(self, loop, ship):
-    #     # Run the controller actions in an thread pool executor as an async coroutine
-    #     # This allows the controller to be timed out and the environment to proceed with no inputs
-    #     # yield from loop.run_in_executor(self.executor, self.controller.actions, ship, self.data)
-    #     # if ship.team > 0:
-    #     #     # yield from loop.run_in_executor(self.executor, self.controller[ship.team].actions, ship, self.data)
-    #     #     await loop.run_in_executor(self.executor, self.controller[ship.team].actions, ship, self.data)
-    #     # else:
-    #         # yield from loop.run_in_executor(self.executor, self.controller[1].actions, ship, self.data)
-    #     await loop.run_in_executor(self.executor, self.controller[2].actions, ship, self.data)
+            call_controller(self.controller[team], ships, self.data)
+
+    def controller_calls(self, ships: Tuple[SpaceShip, ...]) -> List[Tuple[int, Tuple[SpaceShip, ...]]]:
+        """
+        Controller calls to make in a frame, as (team, ships) pairs
+
+        Controllers with an ``actions_batch()`` method are called once with all of their ships (at the position of
+        their first ship), the others once per ship. Ships without a team are run by the team 1 controller.
+        """
+        teams = dict()
+        for ship in ships:
+            teams.setdefault(ship.team if ship.team > 0 else 1, []).append(ship)
+
+        calls = []
+        for ship in ships:
+            team = ship.team if ship.team > 0 else 1
+            if not _has_batch(self.controller[team]):
+                calls.append((team, (ship,)))
+            elif teams[team][0] is ship:
+                calls.append((team, tuple(teams[team])))
+        return calls
+
+    def run_team(self, team: int, calls: List[Tuple[SpaceShip, ...]]) -> None:
+        """
+        Make all of the controller calls of a team in a frame, one after the other
+        """
+        for ships in calls:
+            self.run_controller(team, ships)
+
+    def call_teams_concurrently(self, calls: List[Tuple[int, Tuple[SpaceShip, ...]]]) -> None:
+        """
+        Run the controller calls of every team at the same time, each team on its own worker, with one deadline for
+        the frame. Timeouts, exceptions and evaluation times are counted per team.
+        """
+        teams = dict()
+        for team, ships in calls:
+            teams.setdefault(team, []).append(ships)
+
+        # The snapshot is built here, before the workers (which all read it) start
+        data = self.data
+        t0 = time.perf_counter()
+        deadline = t0 + 0.5 / self.frequency if self.controller_timeout else None
+
+        for team, team_calls in teams.items():
+            if self.isolation:
+                self.isolation.submit(team, self.controller[team], sum(team_calls, ()), data)
+            else:
+                self.dispatcher.submit(team, self.run_team, (team, team_calls))
+
+        for team, team_calls in teams.items():
+            with self.timer_interface(team_calls[0][0], t0=t0) as timing:
+                timeout = max(0.0, deadline - time.perf_counter()) if deadline is not None else None
+                if self.isolation:
+                    timing["end"] = self.isolation.wait(team, sum(team_calls, ()), timeout)
+                else:
+                    with self.releasing(sum(team_calls, ())):
+                        timing["end"] = self.dispatcher.wait(team, timeout)
+
+    @contextmanager
+    def releasing(self, ships: Tuple[SpaceShip, ...]):
+        """
+        Context in which a controller runs on worker threads: if it times out, it may keep writing to its ships, so
+        their sprites let go of them and get new ``SpaceShip`` objects on the next frame
+        """
+        try:
+            yield
+        except TimeoutError:
+            for sprite in self.player_sprite_list:
+                if sprite.space_ship in ships:
+                    sprite.space_ship = None
+            raise
+
+    def repeat_actions(self) -> None:
+        """
+        Hold the actions of the last controller decision for a frame without calling the controllers (see the
+        "action_repeat" setting): the thrust and turn rate stay as they were set, and ships ordered to fire keep firing
+        (as fast as their fire rate allows)
+        """
+        for sprite in tuple(self.player_sprite_list):
+            ship = sprite.space_ship
+            if ship is not None and ship.sync(sprite):
+                self.fire_bullet(sprite)
 
     def call_stored_controller(self) -> None:
         """
         Call the stored controller (if it exists)
         """
-        if self.controller:
+        if self.controller and self.score.frame_count % self.action_repeat:
+            self.repeat_actions()
+
+        elif self.controller:
             # Build list of controllable ships
-            ships = tuple(SpaceShip(ship_sprite) for ship_sprite in self.player_sprite_list)
+            sprites = tuple(self.player_sprite_list)
+            ships = tuple(SpaceShip.of(ship_sprite) for ship_sprite in sprites)
+
+            if self.profiler:
+                self.profiler.start_frame(self.score.frame_count)
 
             # Within the timer_interface context manager (optional time measurement), run the controller
             # If the controller exceeds the loop time, then there will be control dropout with some minor slowdowns due
             # to not taking the environment processing loop into account
             # This prevents major slowdowns and encourages better algorithm design.
-            coro_list = []
-
-            if self.controller_timeout:
-                    for idx, ship in enumerate(ships):
-                        with self.timer_interface(ship):
-                            self.loop.run_until_complete(asyncio.wait_for(self.coro(self.loop, ship),
-                                                                          timeout=(0.5 / self.frequency)))
-
-                        # coro_list.append(self.coro(self.loop, ship))
-                    # self.loop.run_until_complete(asyncio.gather(*coro_list))
-
+            if self.concurrent_teams:
+                self.call_teams_concurrently(self.controller_calls(ships))
             else:
-                for idx, ship in enumerate(ships):
-                    with self.timer_interface(ship):
-                        if ship.team > 0:
-                            self.controller[ship.team].actions(ship, self.data)
+                for team, team_ships in self.controller_calls(ships):
+                    # Timeouts and evaluation times apply per call, to all of the ships given to it
+                    with self.timer_interface(team_ships[0]):
+                        if self.isolation:
+                            self.isolation.run(team, self.controller[team], team_ships, self.data,
+                                               timeout=0.5 / self.frequency if self.controller_timeout else None)
+                        elif self.controller_timeout:
+                            with self.releasing(team_ships):
+                                self.dispatcher.run(team, self.run_controller, (team, team_ships),
+                                                    timeout=0.5 / self.frequency)
                         else:
-                            self.controller[1].actions(ship, self.data)
-
-            # Convert the commands from the controller back to the environment
-            for idx, ship in enumerate(ships):
-                # Take controller actions and send them back to the environment
-                self.player_sprite_list[idx].turn_rate = float(ship.turn_rate) if ship.turn_rate is not None else self.player_sprite_list[idx].turn_rate
-                self.player_sprite_list[idx].thrust = float(ship.thrust) if ship.thrust is not None else self.player_sprite_list[idx].thrust
+                            self.run_controller(team, team_ships)
 
-                # Fire bullet if the user has ordered the ship to shoot
-                if bool(ship.fire_bullet) and ship.fire_bullet is not None:
-                    self.fire_bullet(self.player_sprite_list[idx])
+            # Convert the commands from the controller back to the environment, and fire if ordered to
+            for sprite, ship in zip(sprites, ships):
+                if ship.sync(sprite):
+                    self.fire_bullet(sprite)
 
     def draw_extra(self):
         meter_x = self.get_size()[0] - 50
@@ -221,39 +362,58 @@ class FuzzyAsteroidGame(AsteroidGame):
         # Call on_update() of AsteroidGame parent
         AsteroidGame.on_update(self, delta_time)
 
+        # Attach the profiles of the game, and start over for the next one
+        if self.game_over != StoppingCondition.none and self.profiler:
+            self.score.controller_profiles = [self.profiler.report(team) for team in (1, 2)]
+            self.profiler.reset()
+
         # If the game is over add the information pertaining to the controller
         # computation performance
         if self.game_over != StoppingCondition.none and self.track_eval_time:
+            total = combined(self.evaluation_stats)
+            self.score.evaluation_stats = [stats.summary() for stats in self.evaluation_stats]
+            self.score.mean_eval_time = total.mean
+            self.score.median_eval_time = total.quantile(0.5)
+            self.score.min_eval_time = total.min if total.count else 0.0
+            self.score.max_eval_time = total.max if total.count else 0.0
+
             self.score.num_asteroids = self.num_asteroids.copy()
             self.score.evaluation_times = self.evaluation_times.copy()
-            self.score.mean_eval_time = statistics.mean(self.evaluation_times) if self.evaluation_times else 0.0
-            self.score.median_eval_time = statistics.median(self.evaluation_times) if self.evaluation_times else 0.0
-            self.score.min_eval_time = min(self.evaluation_times) if self.evaluation_times else 0.0
-            self.score.max_eval_time = max(self.evaluation_times) if self.evaluation_times else 0.0
+            self.score.team_evaluation_times = [times.copy() for times in self.team_evaluation_times]
+            if self.evaluation_times:
+                self.score.median_eval_time = statistics.median(self.evaluation_times)
 
+            self.evaluation_stats = [EvaluationStats(), EvaluationStats()]
             self.num_asteroids.clear()
             self.evaluation_times.clear()
+            for times in self.team_evaluation_times:
+                times.clear()
 
     @contextmanager
-    def timer_interface(self, ship):
+    def timer_interface(self, ship, t0: float = None):
         """
         Use the function to wrap code within a timer interface (for performance debugging)
 
         You can also use your favorite IDE's profiling tools to accomplish the same thing.
+
+        :param ship: Ship (of the team) the wrapped controller call is made for
+        :param t0: Optional start time of the call (``time.perf_counter()``), by default when the context is entered.
+                   The context gives a dictionary in which the wrapped code can set the "end" time of the call
         """
-        t0 = time.perf_counter()
+        t0 = time.perf_counter() if t0 is None else t0
+        timing = {"end": None}
         self.timed_out = False
         self.exceptioned_out = False
 
         # If time tracking is not desired, simply yield the context and skip time measurement
         if not self.track_eval_time:
-            yield
+            yield timing
 
         else:
             try:
-                yield
+                yield timing
 
-            except asyncio.TimeoutError as e:
+            except TimeoutError as e:
                 # If there was a timeout, track it and move on
                 self.timed_out = True
                 self.score.timeouts[ship.team-1] += 1
@@ -268,15 +428,23 @@ class FuzzyAsteroidGame(AsteroidGame):
 
             finally:
                 # At this point, always log the time
-                t1 = time.perf_counter()
+                t1 = timing["end"] if timing["end"] is not None else time.perf_counter()
                 self.time_elapsed = t1 - t0
 
                 # Store the evaluation time
-                self.num_asteroids.append(len(self.asteroid_list))
-                self.evaluation_times.append(self.time_elapsed)
+                num_asteroids = len(self.asteroid_list)
+                self.evaluation_stats[ship.team-1].add(self.time_elapsed, num_asteroids)
+                if self.keep_eval_samples:
+                    self.num_asteroids.append(num_asteroids)
+                    self.evaluation_times.append(self.time_elapsed)
+                    self.team_evaluation_times[ship.team-1].append(self.time_elapsed)
 
 
 class TrainerEnvironment(FuzzyAsteroidGame):
+    # Score counters compared by ``step()``, a child class can add the counters of its ``Score``
+    step_fields = ("asteroids_hit", "bullets_hit_asteroids", "bullets_fired", "deaths", "distance_travelled",
+                   "timeouts", "exceptions")
+
     def __init__(self, settings: Dict[str, Any] = None, track_compute_cost: bool = False,
                  controller_timeout: bool = False, ignore_exceptions: bool = False):
         """
@@ -314,4 +482,142 @@ class TrainerEnvironment(FuzzyAsteroidGame):
 
     def on_key_release(self, symbol, modifiers) -> None:
         """Turned off during training"""
-        pass
\ No newline at end of file
+        pass
+
+    def reset(self, scenario: Scenario = None, seed: int = None, controller: Dict[int, ControllerBase] = None,
+              score: Score = None) -> Mapping[str, Any]:
+        """
+        Start a new game in this environment, to be advanced with ``step()``
+
+        The sprite lists (or the numpy engine arrays), sprite pools, worker threads and buffers of the environment are
+        reused, so one environment can play any number of games without growing.
+
+        :param scenario: Scenario of the game, the scenario of the last game if not given
+        :param seed: Optional seed of the asteroids, stored on the scenario (like ``enable_consistent_randomness()``)
+        :param controller: Optional controllers, called by every ``step()``. Without them the ships are driven by the
+                           actions given to ``step()``
+        :param score: Optional Score (should inherit from ``Score``)
+        :return: Observation of the first frame (the controller data, see ``data``)
+        """
+        scenario = scenario if scenario is not None else self.scenario
+        if seed is not None:
+            if scenario is None:
+                scenario = Scenario(num_asteroids=3)
+            scenario.seed = seed
+
+        if controller:
+            self.start_new_game(controller=controller, scenario=scenario, score=score)
+        else:
+            self.controller = None
+            self._data_key = None
+            AsteroidGame.start_new_game(self, scenario=scenario, score=score)
+        return self.data
+
+    def step(self, actions: Mapping[int, Mapping[str, Any]] = None) \
+            -> Tuple[Mapping[str, Any], Dict[str, Any], StoppingCondition]:
+        """
+        Advance the game by one decision: ``action_repeat`` frames (see the "action_repeat" setting), or fewer if the
+        game ends first
+
+        :param actions: Actions of the ships by ship id, dictionaries with any of the "thrust", "turn_rate" and
+                        "fire_bullet" outputs of ``SpaceShip``. Outputs left out keep their previous value (firing
+                        does not). Only given when the environment was reset without controllers
+        :return: Tuple of the observation after the step (see ``data``), the change of the score counters over the
+                 step (see ``step_counters``) and the stopping condition (``StoppingCondition.none`` until the game
+                 is over)
+        """
+        if self.game_over is None or self.game_over != StoppingCondition.none:
+            raise RuntimeError("The game is over, reset() the environment to start a new one")
+        if actions and self.controller:
+            raise ValueError("Actions can only be given to step() when the environment was reset without controllers")
+
+        before = self.step_counters()
+        for frame in range(self.action_repeat):
+            # The controllers (when there are some) are called by on_update()
+            if not self.controller:
+                if frame == 0:
+                    self.apply_actions(actions)
+                else:
+                    self.repeat_actions()
+
+            self.on_update(1 / self.frequency)
+            if self.game_over != StoppingCondition.none:
+                break
+
+        after = self.step_counters()
+        deltas = {name: [now - then for now, then in zip(value, before[name])] if isinstance(value, list)
+                  else value - before[name] for name, value in after.items()}
+        return self.data, deltas, self.game_over
+
+    def step_counters(self) -> Dict[str, Any]:
+        """
+        Current value of the ``step_fields`` of the score, per team counters are copied
+        """
+        counters = dict()
+        for name in self.step_fields:
+            value = getattr(self.score, name)
+            counters[name] = list(value) if isinstance(value, list) else value
+        return counters
+
+    def apply_actions(self, actions: Mapping[int, Mapping[str, Any]] = None) -> None:
+        """
+        Set the actions of ``step()`` on the ships (through their ``SpaceShip``, which checks the limits of the
+        outputs) and fire the bullets ordered, like the controllers of a frame do
+        """
+        for sprite in tuple(self.player_sprite_list):
+            ship = SpaceShip.of(sprite)
+            action = actions.get(sprite.id) if actions else None
+            for name, value in action.items() if action else ():
+                if name not in ("thrust", "turn_rate", "fire_bullet"):
+                    raise ValueError(f"Unknown action \"{name}\", the actions are \"thrust\", \"turn_rate\" and "
+                                     f"\"fire_bullet\"")
+                setattr(ship, name, value)
+            if ship.sync(sprite):
+                self.fire_bullet(sprite)
+
+
+class HeadlessMixin:
+    """
+    Mixin for any game environment class, which never creates a window (or graphics context) and tracks the map size
+    on its own instead of asking the window for it. Put it first in the bases, e.g.
+    ``class HeadlessGame(HeadlessMixin, FuzzyAsteroidGame)``, and keep graphics off.
+    """
+    _map_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+
+    def _create_window(self) -> None:
+        """No window is created"""
+        pass
+
+    def get_size(self) -> Tuple[int, int]:
+        return self._map_size
+
+    def set_size(self, width: int, height: int) -> None:
+        self._map_size = (int(width), int(height))
+
+    def center_window(self) -> None:
+        """There is no window to center"""
+        pass
+
+    def close(self) -> None:
+        """There is no window to close"""
+        pass
+
+
+class HeadlessEnvironment(HeadlessMixin, TrainerEnvironment):
+    def __init__(self, settings: Dict[str, Any] = None, track_compute_cost: bool = False,
+                 controller_timeout: bool = False, ignore_exceptions: bool = False):
+        """
+        The HeadlessEnvironment class is a TrainerEnvironment which never creates a window (or graphics context) and
+        never loads sounds, so that it can be built without a display and cheaply enough to create many of them.
+
+        It keeps the ``run()``, ``start_new_game()``, ``data`` and ``Score`` behavior of TrainerEnvironment, and tracks
+        the map size on its own instead of asking the window for it (see ``HeadlessMixin``).
+        :param settings: Settings dictionary passed to parent class
+        :param track_compute_cost: Whether to track the evaluation costs
+        :param controller_timeout: Whether to timeout the controller if evaluation takes too long
+        :param ignore_exceptions: True allows the program to ignore exceptions, False means exceptions exit the program
+        """
+        super().__init__(settings=settings,
+                         track_compute_cost=track_compute_cost,
+                         controller_timeout=controller_timeout,
+                         ignore_exceptions=ignore_exceptions)
@@ -8,13 +8,39 @@ class SpaceShip:
 
     At each time step the user's controller class will receive a SpaceShip object which limits the amount of
     information/controls the user can access. This SpaceShip class is built directly from the sprite
+
+    Each ship sprite owns one SpaceShip (see ``SpaceShip.of()``), which is refreshed in place every frame instead of
+    being built again.
     """
+    __slots__ = ("id", "angle", "change_x", "change_y", "center_x", "center_y", "is_respawning", "respawn_time_left",
+                 "fire_wait_time", "max_speed", "drag", "team", "_bullets_remaining", "thrust_range", "turn_rate_range",
+                 "_turn_rate_min", "_turn_rate_max", "_thrust_min", "_thrust_max", "_turn_rate", "_thrust",
+                 "_fire_bullet")
+
     def __init__(self, sprite):
         """
         Instantiate the ship based on the Sprite used to represent the ship in the environment
 
         :param: sprite ``ShipSprite` object that this `SpaceShip` object is the interface for
         """
+        self.refresh(sprite)
+
+    @classmethod
+    def of(cls, sprite) -> "SpaceShip":
+        """
+        SpaceShip owned by a ship sprite (or ``ShipView``), created on first use and refreshed from the sprite
+        """
+        ship = sprite.space_ship
+        if ship is None:
+            ship = sprite.space_ship = cls(sprite)
+        else:
+            ship.refresh(sprite)
+        return ship
+
+    def refresh(self, sprite) -> None:
+        """
+        Copy the current state of the sprite and clear the outputs, for a new frame
+        """
         self.id = sprite.id
         self.angle = sprite.angle
         self.change_x = sprite.change_x
@@ -29,9 +55,11 @@ class SpaceShip:
         self.team = sprite.team
         self._bullets_remaining = sprite.bullets_remaining
 
-        # Limitations to output_space
+        # Limitations to output_space, with the bounds kept as floats for clamping
         self.thrust_range = sprite.thrust_range
         self.turn_rate_range = sprite.turn_rate_range
+        self._thrust_min, self._thrust_max = self.thrust_range
+        self._turn_rate_min, self._turn_rate_max = self.turn_rate_range
 
         # Create blank outputs
         self._turn_rate = None
@@ -60,10 +88,10 @@ class SpaceShip:
 
     @turn_rate.setter
     def turn_rate(self, turn_rate: float):
-        if turn_rate < self.output_space["turn_rate"][0]:
-            turn_rate = self.output_space["turn_rate"][0]
-        elif turn_rate > self.output_space["turn_rate"][1]:
-            turn_rate = self.output_space["turn_rate"][1]
+        if turn_rate < self._turn_rate_min:
+            turn_rate = self._turn_rate_min
+        elif turn_rate > self._turn_rate_max:
+            turn_rate = self._turn_rate_max
         elif math.isnan(turn_rate):
             raise ValueError("value given to SpaceShip.turn_rate.setter() cannot be NaN")
 
@@ -75,10 +103,10 @@ class SpaceShip:
 
     @thrust.setter
     def thrust(self, thrust: float):
-        if thrust < self.output_space["thrust"][0]:
-            thrust = self.output_space["thrust"][0]
-        elif thrust > self.output_space["thrust"][1]:
-            thrust = self.output_space["thrust"][1]
+        if thrust < self._thrust_min:
+            thrust = self._thrust_min
+        elif thrust > self._thrust_max:
+            thrust = self._thrust_max
         elif math.isnan(thrust):
             raise ValueError("value given to SpaceShip.thrust.setter() cannot be NaN")
 
@@ -99,6 +127,18 @@ class SpaceShip:
     def bullets_remaining(self):
         return self._bullets_remaining
 
+    def sync(self, sprite) -> bool:
+        """
+        Write the outputs set by the controller back to the sprite (outputs left unset keep their previous value)
+
+        :return: Whether the controller ordered the ship to fire
+        """
+        if self._turn_rate is not None:
+            sprite.turn_rate = float(self._turn_rate)
+        if self._thrust is not None:
+            sprite.thrust = float(self._thrust)
+        return self._fire_bullet is not None and bool(self._fire_bullet)
+
 
 class ControllerBase:
     """
@@ -138,3 +178,35 @@ class ControllerBase:
         raise NotImplementedError(f"{self.__class__} does not have an actions() method defined. Your controller class"
                                   f"needs to have an actions() method defined for it to work properly with the "
                                   f"Fuzzy Asteroids game environment.")
+
+    def actions_batch(self, ships: List[SpaceShip], input_data: Dict[str, Any]) -> None:
+        """
+        Optional, compute control actions of all of this controller's ships at once (for example to share targeting
+        work between them). Perform all command actions via the ``ships`` arguments.
+
+        If this method is overridden, the environment calls it once per frame with every ship the controller is in
+        charge of (timeouts and evaluation times then apply to the whole call), instead of calling ``actions()``
+        once per ship.
+
+        :param ships: Objects to use when controlling the SpaceShips, in environment order
+        :param input_data: Input data which describes the current state of the environment
+        """
+        for ship in ships:
+            self.actions(ship, input_data)
+
+
+def _has_batch(controller: ControllerBase) -> bool:
+    # Only controllers which override actions_batch() are called per team, the others keep one call per ship
+    return getattr(type(controller), "actions_batch", ControllerBase.actions_batch) is not ControllerBase.actions_batch
+
+
+def call_controller(controller: ControllerBase, ships: Tuple[SpaceShip, ...], input_data: Dict[str, Any]) -> None:
+    """
+    Run a controller on some of its ships, with a single ``actions_batch()`` call if the controller overrides it and
+    with one ``actions()`` call per ship otherwise
+    """
+    if _has_batch(controller):
+        controller.actions_batch(list(ships), input_data)
+    else:
+        for ship in ships:
+            controller.actions(ship, input_data)
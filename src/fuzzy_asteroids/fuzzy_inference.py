@@ -0,0 +1,512 @@
+"""
+Vectorized fuzzy inference for controllers
+
+Fuzzy systems are built from ``FuzzyVariable`` objects (a range and named membership functions) and ``Rule`` objects,
+and compiled once into index arrays, so that evaluating the system is a fixed number of NumPy operations whatever the
+number of rules. Every input can be an array (for example one value per asteroid of the ``"arrays"`` observation) and
+all of them are evaluated in the same call, which keeps the inference well within the frame budget of
+``ControllerBase.actions()``.
+
+- ``MamdaniSystem`` has fuzzy output terms, defuzzified by their centroid (or the weighted average of the centroids of
+  the output terms, which is faster)
+- ``SugenoSystem`` (Takagi-Sugeno-Kang) has constant or linear rule outputs, defuzzified by their weighted average
+- ``LookupTable`` samples a system with few inputs on a grid once, then evaluates it by multilinear interpolation
+
+.. code-block:: python
+
+    distance = FuzzyVariable("distance", 0, 1000, {"near": TrapezoidalMF(0, 0, 100, 300),
+                                                   "far": TrapezoidalMF(100, 300, 1000, 1000)})
+    thrust = FuzzyVariable("thrust", -480, 480, {"back": TriangularMF(-480, -480, 0),
+                                                 "forward": TriangularMF(0, 480, 480)})
+    system = MamdaniSystem([distance], [thrust], [Rule({"distance": "near"}, {"thrust": "back"}),
+                                                  Rule({"distance": "far"}, {"thrust": "forward"})])
+    system.evaluate({"distance": [50.0, 600.0]})["thrust"]
+"""
+import itertools
+
+import numpy as np
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+# Prefix of an antecedent term negated (1 - membership)
+NOT = "not "
+
+
+class MembershipFunction:
+    """
+    Membership function of a fuzzy term, evaluated element-wise on arrays
+    """
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        raise NotImplementedError(f"{self.__class__} does not define its membership")
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({', '.join(str(value) for value in vars(self).values())})"
+
+
+class PiecewiseLinearMF(MembershipFunction):
+    """
+    Membership interpolated linearly between (x, membership) points, and constant beyond the first and last points
+    """
+    def __init__(self, xs: Sequence[float], memberships: Sequence[float]):
+        self.xs = np.asarray(xs, dtype=np.float64)
+        self.memberships = np.asarray(memberships, dtype=np.float64)
+        if self.xs.ndim != 1 or self.xs.shape != self.memberships.shape or np.any(np.diff(self.xs) < 0):
+            raise ValueError("A piecewise linear membership needs as many memberships as points, in increasing order")
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        return np.interp(x, self.xs, self.memberships)
+
+
+class TriangularMF(PiecewiseLinearMF):
+    """
+    Triangle rising from ``a`` to its peak at ``b`` and falling to ``c`` (``a == b`` or ``b == c`` make shoulders which
+    stay at 1 beyond the peak)
+    """
+    def __init__(self, a: float, b: float, c: float):
+        if not a <= b <= c:
+            raise ValueError(f"A triangular membership needs a <= b <= c, got {a}, {b}, {c}")
+        # A shoulder keeps the peak membership beyond its edge of the range, where np.interp() extends the end points
+        left = 1.0 if a == b else 0.0
+        right = 1.0 if b == c else 0.0
+        super().__init__((a, b, c), (left, 1.0, right))
+
+    def __repr__(self) -> str:
+        return f"TriangularMF({self.xs[0]}, {self.xs[1]}, {self.xs[2]})"
+
+
+class TrapezoidalMF(PiecewiseLinearMF):
+    """
+    Trapezoid rising from ``a`` to ``b``, at 1 from ``b`` to ``c``, and falling to ``d`` (``a == b`` or ``c == d`` make
+    shoulders which stay at 1 beyond the plateau)
+    """
+    def __init__(self, a: float, b: float, c: float, d: float):
+        if not a <= b <= c <= d:
+            raise ValueError(f"A trapezoidal membership needs a <= b <= c <= d, got {a}, {b}, {c}, {d}")
+        left = 1.0 if a == b else 0.0
+        right = 1.0 if c == d else 0.0
+        super().__init__((a, b, c, d), (left, 1.0, 1.0, right))
+
+    def __repr__(self) -> str:
+        return f"TrapezoidalMF({self.xs[0]}, {self.xs[1]}, {self.xs[2]}, {self.xs[3]})"
+
+
+class GaussianMF(MembershipFunction):
+    """
+    Gaussian bell centered on ``mean``
+    """
+    def __init__(self, mean: float, sigma: float):
+        if sigma <= 0:
+            raise ValueError("The sigma of a gaussian membership must be positive")
+        self.mean = float(mean)
+        self.sigma = float(sigma)
+
+    def __call__(self, x: np.ndarray) -> np.ndarray:
+        return np.exp(-0.5 * np.square((x - self.mean) / self.sigma))
+
+
+class FuzzyVariable:
+    """
+    Input or output variable of a fuzzy system, with its range and named terms
+    """
+    def __init__(self, name: str, low: float, high: float, terms: Mapping[str, MembershipFunction],
+                 resolution: int = 101, default: Optional[float] = None):
+        """
+        :param name: Name of the variable in the rules, and in the inputs and outputs of the system
+        :param low: Lowest value of the variable
+        :param high: Highest value of the variable
+        :param terms: Membership function of each term
+        :param resolution: Number of points the range is sampled with, for centroids and lookup tables
+        :param default: Output value when no rule fires, the middle of the range if not given
+        """
+        if not low < high:
+            raise ValueError(f"The range of \"{name}\" must have low < high")
+        if not terms:
+            raise ValueError(f"\"{name}\" needs at least one term")
+        if resolution < 2:
+            raise ValueError("Variables must be sampled with a resolution of at least 2 points")
+
+        self.name = name
+        self.low = float(low)
+        self.high = float(high)
+        self.terms = dict(terms)
+        self.resolution = int(resolution)
+        self.default = (self.low + self.high) / 2 if default is None else float(default)
+
+    def __repr__(self) -> str:
+        return f"FuzzyVariable({self.name}, [{self.low}, {self.high}], {list(self.terms)})"
+
+    @property
+    def universe(self) -> np.ndarray:
+        """
+        Points the range is sampled with
+        """
+        return np.linspace(self.low, self.high, self.resolution)
+
+    def memberships(self, x: Any) -> Dict[str, np.ndarray]:
+        """
+        Membership of the values in each term
+        """
+        x = np.asarray(x, dtype=np.float64)
+        return {term: function(x) for term, function in self.terms.items()}
+
+
+class Rule:
+    """
+    Fuzzy rule, "if <antecedents> then <consequents>"
+
+    The antecedents map input names to terms (``"not <term>"`` for the complement of a term), and are combined with
+    the "and" or "or" ``connective``. The consequents map output names to terms for a ``MamdaniSystem``, and for a
+    ``SugenoSystem`` to constants or to linear functions of the inputs (coefficients in the order of the inputs of the
+    system, followed by the constant).
+    """
+    connectives = ("and", "or")
+
+    def __init__(self, antecedents: Mapping[str, str], consequents: Mapping[str, Any], connective: str = "and",
+                 weight: float = 1.0):
+        """
+        :param antecedents: Term of each input in the premise of the rule
+        :param consequents: Term (or constant, or linear coefficients) of each output the rule sets
+        :param connective: "and" or "or", how the antecedents are combined
+        :param weight: Weight the firing strength of the rule is multiplied by
+        """
+        if not antecedents or not consequents:
+            raise ValueError("A rule needs at least one antecedent and one consequent")
+        if connective not in self.connectives:
+            raise ValueError(f"Unknown connective \"{connective}\", the connective must be one of {self.connectives}")
+
+        self.antecedents = dict(antecedents)
+        self.consequents = dict(consequents)
+        self.connective = connective
+        self.weight = float(weight)
+
+    def __repr__(self) -> str:
+        premise = f" {self.connective} ".join(f"{name} is {term}" for name, term in self.antecedents.items())
+        conclusion = " and ".join(f"{name} is {term}" for name, term in self.consequents.items())
+        return f"Rule(if {premise} then {conclusion})"
+
+
+class FuzzySystem:
+    """
+    Fuzzy inference system compiled into arrays, with the fuzzification and rule firing shared by its children
+    """
+    def __init__(self, inputs: Sequence[FuzzyVariable], outputs: Sequence[Any], rules: Sequence[Rule],
+                 and_operator: str = "min"):
+        """
+        :param inputs: Input variables
+        :param outputs: Output variables
+        :param rules: Rules of the system
+        :param and_operator: "min" or "product", the t-norm of the "and" rules
+        """
+        if and_operator not in ("min", "product"):
+            raise ValueError(f"Unknown and operator \"{and_operator}\", the operator must be \"min\" or \"product\"")
+        if not rules:
+            raise ValueError("A fuzzy system needs at least one rule")
+
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.rules = list(rules)
+        self.and_operator = and_operator
+        self._compile_antecedents()
+
+    @property
+    def input_names(self) -> List[str]:
+        return [variable.name for variable in self.inputs]
+
+    @property
+    def output_names(self) -> List[str]:
+        return [variable.name for variable in self.outputs]
+
+    def _compile_antecedents(self) -> None:
+        # Rows of the membership table: the terms of every input, their complements, then a row of ones and a row of
+        # zeros to pad the "and" and "or" rules with fewer antecedents
+        self._term_rows: Dict[Tuple[str, str], int] = dict()
+        for variable in self.inputs:
+            for term in variable.terms:
+                self._term_rows[(variable.name, term)] = len(self._term_rows)
+        num_terms = len(self._term_rows)
+        self._ones, self._zeros = 2 * num_terms, 2 * num_terms + 1
+
+        inputs = {variable.name: variable for variable in self.inputs}
+        width = max(len(rule.antecedents) for rule in self.rules)
+        self._antecedents = np.empty((len(self.rules), width), dtype=np.intp)
+        for idx, rule in enumerate(self.rules):
+            rows = []
+            for name, term in rule.antecedents.items():
+                negated = term.startswith(NOT)
+                term = term[len(NOT):] if negated else term
+                if name not in inputs or term not in inputs[name].terms:
+                    raise ValueError(f"{rule} uses the unknown input term \"{name} is {term}\"")
+                rows.append(self._term_rows[(name, term)] + (num_terms if negated else 0))
+            pad = self._ones if rule.connective == "and" else self._zeros
+            self._antecedents[idx] = rows + [pad] * (width - len(rows))
+
+        self._is_or = np.array([rule.connective == "or" for rule in self.rules])
+        self._any_or = bool(self._is_or.any())
+        self._any_and = not bool(self._is_or.all())
+        self._weights = np.array([rule.weight for rule in self.rules], dtype=np.float64)
+
+    def _crisp_inputs(self, inputs: Mapping[str, Any]) -> Tuple[List[np.ndarray], Tuple[int, ...]]:
+        missing = [name for name in self.input_names if name not in inputs]
+        if missing:
+            raise ValueError(f"Missing values for the inputs {missing}")
+        values = np.broadcast_arrays(*(np.asarray(inputs[name], dtype=np.float64) for name in self.input_names))
+        return [value.ravel() for value in values], values[0].shape
+
+    def firing_strengths(self, values: List[np.ndarray]) -> np.ndarray:
+        """
+        (rules, n) array of the firing strength of every rule for n flat values of each input
+        """
+        n = len(values[0])
+        table = np.empty((len(self._term_rows) * 2 + 2, n))
+        row = 0
+        for variable, x in zip(self.inputs, values):
+            for function in variable.terms.values():
+                table[row] = function(x)
+                row += 1
+        np.subtract(1.0, table[:row], out=table[row:2 * row])
+        table[self._ones] = 1.0
+        table[self._zeros] = 0.0
+
+        memberships = table[self._antecedents]
+        if self._any_and:
+            strengths = memberships.min(axis=1) if self.and_operator == "min" else memberships.prod(axis=1)
+        if self._any_or:
+            either = memberships.max(axis=1)
+            strengths = np.where(self._is_or[:, None], either, strengths) if self._any_and else either
+        return strengths * self._weights[:, None]
+
+    def _infer(self, values: List[np.ndarray]) -> Dict[str, np.ndarray]:
+        raise NotImplementedError(f"{self.__class__} does not define its inference")
+
+    def evaluate(self, inputs: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Crisp value of every output
+
+        :param inputs: Value of each input, a number or an array (the inputs are broadcast together)
+        :return: Value of each output, as an array of the broadcast shape of the inputs
+        """
+        values, shape = self._crisp_inputs(inputs)
+        return {name: output.reshape(shape) for name, output in self._infer(values).items()}
+
+    def __call__(self, **inputs: Any) -> Dict[str, np.ndarray]:
+        return self.evaluate(inputs)
+
+    def lookup(self, resolution: Union[int, Sequence[int], None] = None) -> "LookupTable":
+        """
+        Lookup table of the system sampled on a grid, see ``LookupTable``
+        """
+        return LookupTable(self, resolution)
+
+
+class MamdaniSystem(FuzzySystem):
+    """
+    Mamdani fuzzy system: the rules clip (or scale) their output terms, which are aggregated with the maximum and
+    defuzzified
+    """
+    defuzzifications = ("centroid", "weighted_average")
+
+    def __init__(self, inputs: Sequence[FuzzyVariable], outputs: Sequence[FuzzyVariable], rules: Sequence[Rule],
+                 and_operator: str = "min", implication: str = "min", defuzzification: str = "centroid"):
+        """
+        :param inputs: Input variables
+        :param outputs: Output variables
+        :param rules: Rules of the system
+        :param and_operator: "min" or "product", the t-norm of the "and" rules
+        :param implication: "min" to clip the output terms to the rule strengths or "product" to scale them
+        :param defuzzification: "centroid" of the aggregated output, or "weighted_average" of the centroids of the
+            output terms by their strengths
+        """
+        if implication not in ("min", "product"):
+            raise ValueError(f"Unknown implication \"{implication}\", the implication must be \"min\" or \"product\"")
+        if defuzzification not in self.defuzzifications:
+            raise ValueError(f"Unknown defuzzification \"{defuzzification}\", the defuzzification must be one of "
+                             f"{self.defuzzifications}")
+
+        self.implication = implication
+        self.defuzzification = defuzzification
+        super().__init__(inputs, outputs, rules, and_operator)
+        self._compile_consequents()
+
+    def _compile_consequents(self) -> None:
+        # Per output: which rules conclude each of its terms, the sampled terms and their centroids
+        self._consequents = []
+        for variable in self.outputs:
+            terms = list(variable.terms)
+            concludes = np.zeros((len(terms), len(self.rules)), dtype=bool)
+            for idx, rule in enumerate(self.rules):
+                term = rule.consequents.get(variable.name)
+                if term is None:
+                    continue
+                if term not in variable.terms:
+                    raise ValueError(f"{rule} uses the unknown output term \"{variable.name} is {term}\"")
+                concludes[terms.index(term), idx] = True
+
+            universe = variable.universe
+            sampled = np.stack([variable.terms[term](universe) for term in terms])
+            areas = sampled.sum(axis=1)
+            centroids = np.divide(sampled @ universe, areas, out=np.full(len(terms), variable.default),
+                                  where=areas > 0)
+            self._consequents.append((variable, concludes, universe, sampled, centroids))
+
+        outputs = {variable.name for variable in self.outputs}
+        for rule in self.rules:
+            unknown = set(rule.consequents) - outputs
+            if unknown:
+                raise ValueError(f"{rule} sets the unknown outputs {sorted(unknown)}")
+
+    def _infer(self, values: List[np.ndarray]) -> Dict[str, np.ndarray]:
+        strengths = self.firing_strengths(values)
+
+        outputs = dict()
+        for variable, concludes, universe, sampled, centroids in self._consequents:
+            # (terms, n) strength of each output term, the strongest of the rules concluding it
+            term_strengths = np.where(concludes[:, :, None], strengths[None], 0.0).max(axis=1)
+
+            if self.defuzzification == "weighted_average":
+                weights = term_strengths.sum(axis=0)
+                weighted = centroids @ term_strengths
+            else:
+                # (n, terms, universe) implied output terms, aggregated with the maximum over the terms
+                if self.implication == "min":
+                    implied = np.minimum(term_strengths.T[:, :, None], sampled[None])
+                else:
+                    implied = term_strengths.T[:, :, None] * sampled[None]
+                aggregated = implied.max(axis=1)
+                weights = aggregated.sum(axis=1)
+                weighted = aggregated @ universe
+
+            outputs[variable.name] = np.divide(weighted, weights, out=np.full(len(weights), variable.default),
+                                               where=weights > 0)
+        return outputs
+
+
+class SugenoSystem(FuzzySystem):
+    """
+    Takagi-Sugeno-Kang fuzzy system: each rule gives a constant or a linear function of the inputs, defuzzified by
+    the weighted average of the rule outputs by the rule strengths
+
+    The outputs are only names (or ``FuzzyVariable`` objects, for the ``default`` used when no rule fires and the
+    range of lookup tables).
+    """
+    def __init__(self, inputs: Sequence[FuzzyVariable], outputs: Sequence[Union[str, FuzzyVariable]],
+                 rules: Sequence[Rule], and_operator: str = "min"):
+        """
+        :param inputs: Input variables
+        :param outputs: Output names or variables
+        :param rules: Rules of the system
+        :param and_operator: "min" or "product", the t-norm of the "and" rules
+        """
+        super().__init__(inputs, outputs, rules, and_operator)
+        self._compile_consequents()
+
+    @property
+    def output_names(self) -> List[str]:
+        return [getattr(output, "name", output) for output in self.outputs]
+
+    def _compile_consequents(self) -> None:
+        # Per output: the (rules, inputs + 1) linear coefficients of every rule, whether each rule sets it, and the
+        # value when no rule fires
+        self._consequents = []
+        num_inputs = len(self.inputs)
+        for output in self.outputs:
+            name = getattr(output, "name", output)
+            coefficients = np.zeros((len(self.rules), num_inputs + 1))
+            sets = np.zeros(len(self.rules), dtype=bool)
+            for idx, rule in enumerate(self.rules):
+                if name not in rule.consequents:
+                    continue
+                value = np.atleast_1d(np.asarray(rule.consequents[name], dtype=np.float64))
+                if value.shape == (1,):
+                    coefficients[idx, -1] = value[0]
+                elif value.shape == (num_inputs + 1,):
+                    coefficients[idx] = value
+                else:
+                    raise ValueError(f"{rule} needs a constant or {num_inputs + 1} coefficients for \"{name}\"")
+                sets[idx] = True
+            default = output.default if isinstance(output, FuzzyVariable) else 0.0
+            self._consequents.append((name, coefficients, sets, bool(coefficients[:, :-1].any()), default))
+
+        outputs = set(self.output_names)
+        for rule in self.rules:
+            unknown = set(rule.consequents) - outputs
+            if unknown:
+                raise ValueError(f"{rule} sets the unknown outputs {sorted(unknown)}")
+
+    def _infer(self, values: List[np.ndarray]) -> Dict[str, np.ndarray]:
+        strengths = self.firing_strengths(values)
+
+        outputs = dict()
+        for name, coefficients, sets, linear, default in self._consequents:
+            weights = strengths[sets]
+            if linear:
+                # (rules, n) output of each rule for each value
+                rule_outputs = coefficients[sets, :-1] @ np.stack(values) + coefficients[sets, -1:]
+                weighted = (weights * rule_outputs).sum(axis=0)
+            else:
+                weighted = coefficients[sets, -1] @ weights
+            total = weights.sum(axis=0)
+            outputs[name] = np.divide(weighted, total, out=np.full(len(total), default), where=total > 0)
+        return outputs
+
+
+class LookupTable:
+    """
+    Fuzzy system precomputed on a regular grid of its input ranges and evaluated by multilinear interpolation
+
+    Evaluating a table costs the same whatever the number of rules, but its size grows as the product of the
+    resolutions of the inputs, so it is meant for systems with a few inputs. Inputs outside of their range are clamped
+    to it.
+    """
+    def __init__(self, system: FuzzySystem, resolution: Union[int, Sequence[int], None] = None):
+        """
+        :param system: System to tabulate
+        :param resolution: Number of grid points per input (a single number for all of them), the resolution of each
+            input variable if not given
+        """
+        if resolution is None:
+            resolution = [variable.resolution for variable in system.inputs]
+        elif np.ndim(resolution) == 0:
+            resolution = [int(resolution)] * len(system.inputs)
+        if len(resolution) != len(system.inputs) or min(resolution) < 2:
+            raise ValueError("A lookup table needs a resolution of at least 2 points per input")
+
+        self.input_names = system.input_names
+        self.output_names = system.output_names
+        self.low = np.array([variable.low for variable in system.inputs])
+        self.high = np.array([variable.high for variable in system.inputs])
+        self.resolution = np.array(resolution, dtype=np.intp)
+        self._step = (self.high - self.low) / (self.resolution - 1)
+
+        grid = np.meshgrid(*(np.linspace(low, high, points) for low, high, points in
+                             zip(self.low, self.high, self.resolution)), indexing="ij")
+        values = system.evaluate(dict(zip(self.input_names, grid)))
+        self.tables = {name: values[name] for name in self.output_names}
+
+        # Offsets of the corners of a grid cell, and the strides to turn grid indices into flat indices
+        self._corners = np.array(list(itertools.product((0, 1), repeat=len(self.input_names))), dtype=np.intp)
+        self._strides = np.array([int(np.prod(self.resolution[idx + 1:])) for idx in range(len(self.resolution))],
+                                 dtype=np.intp)
+
+    def evaluate(self, inputs: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        """
+        Interpolated value of every output, see ``FuzzySystem.evaluate()``
+        """
+        missing = [name for name in self.input_names if name not in inputs]
+        if missing:
+            raise ValueError(f"Missing values for the inputs {missing}")
+        values = np.broadcast_arrays(*(np.asarray(inputs[name], dtype=np.float64) for name in self.input_names))
+        shape = values[0].shape
+
+        # (inputs, n) position of each value on the grid, split in the index of its cell and the fraction within it
+        position = (np.stack([value.ravel() for value in values]) - self.low[:, None]) / self._step[:, None]
+        position = np.clip(position, 0, (self.resolution - 1)[:, None])
+        cell = np.minimum(position.astype(np.intp), (self.resolution - 2)[:, None])
+        fraction = position - cell
+
+        # (corners, n) flat index and interpolation weight of each corner of the cells
+        index = self._strides @ cell + (self._corners @ self._strides)[:, None]
+        weight = np.prod(np.where(self._corners[:, :, None], fraction[None], 1 - fraction[None]), axis=1)
+        return {name: (table.ravel()[index] * weight).sum(axis=0).reshape(shape) for name, table in self.tables.items()}
+
+    def __call__(self, **inputs: Any) -> Dict[str, np.ndarray]:
+        return self.evaluate(inputs)
@@ -16,10 +16,15 @@ from typing import cast, Dict, Tuple, List, Any
 from enum import Enum
 from tabulate import tabulate
 
-from .sprites import AsteroidSprite, BulletSprite, ShipSprite
+from .sprites import AsteroidSprite, BulletSprite, ShipSprite, SpritePool
 from .settings import *
 from .util import Score, Scenario
 from .dashboard import Dashboard
+from .engine import ArrayEngine, sprite_bounds, get_geometry, geometry_id
+from .broadphase import SpatialHash
+from .rng import make_rng
+from .colliders import CircleCollider
+from .snapshot import GameSnapshot, copy_value, sprite_tables, restore_sprites, fire_orders, restore_fire_orders
 
 
 # # image for dead ship
@@ -63,6 +68,17 @@ class AsteroidGame(arcade.Window):
         self.prints = _settings.get("prints", True)
         self.allow_key_presses = _settings.get("allow_key_presses", True)
         self.full_dashboard = _settings.get("full_dashboard", False)
+        self.engine_type = _settings.get("engine", "arcade")  # Simulation backend, "arcade" sprites or "numpy" arrays
+        self.collider_type = _settings.get("collider", "hitbox")  # Collision model, "hitbox" polygons or "circle"
+        self.random_buffer_size = _settings.get("random_buffer_size", 0)  # Bulk pre-drawn random values, 0 for off
+
+        if self.engine_type not in ("arcade", "numpy"):
+            raise ValueError(f"Unknown engine \"{self.engine_type}\", the engine setting must be \"arcade\" or \"numpy\"")
+        elif self.engine_type == "numpy" and self.graphics_on:
+            raise ValueError("The numpy engine does not draw sprites, it can only be used with graphics_on=False")
+
+        if self.collider_type not in ("hitbox", "circle"):
+            raise ValueError(f"Unknown collider \"{self.collider_type}\", the collider setting must be \"hitbox\" or \"circle\"")
 
         # Set the timestep to dictate the update rate for the environment
         if self.real_time_multiplier:
@@ -70,8 +86,7 @@ class AsteroidGame(arcade.Window):
         else:
             self.timestep = float(1E-9)
 
-        super().__init__(width=SCREEN_WIDTH, height=SCREEN_HEIGHT, title=SCREEN_TITLE,
-                         update_rate=self.timestep, visible=self.graphics_on)
+        self._create_window()
 
         # Set the working directory (where we expect to find files) to the same
         # directory this .py file is in. You can leave this out of your own
@@ -84,6 +99,24 @@ class AsteroidGame(arcade.Window):
         self.asteroid_list = None
         self.bullet_list = None
 
+        # Recycling pools of the bullets and asteroids of this environment (pools are not shared between environments,
+        # which may run in different threads)
+        self.bullet_pool = SpritePool(BulletSprite)
+        self.asteroid_pool = SpritePool(AsteroidSprite)
+
+        # Random number generator of this environment, seeded by the scenario (if it has a seed) at each new game
+        self.rng = make_rng(buffer_size=self.random_buffer_size)
+
+        # Vectorized simulation backend (only used with the numpy engine)
+        self.engine = ArrayEngine(self.frequency, rng=self.rng) if self.engine_type == "numpy" else None
+
+        # Collision checks are delegated to this object when they are not done with the arcade sprites directly
+        self.collision_handler = CircleCollider() if self.collider_type == "circle" else self.engine
+
+        # Broadphase grids for the collision checks done with the arcade sprites
+        self.asteroid_grid = SpatialHash()
+        self.ship_grid = SpatialHash()
+
         # Other UI elements
         self.dashboard = None
 
@@ -97,15 +130,26 @@ class AsteroidGame(arcade.Window):
         self.available_keys = (arcade.key.SPACE, arcade.key.LEFT, arcade.key.RIGHT, arcade.key.UP, arcade.key.DOWN)
         self.active_key_presses = list()
 
-        # Register sounds within the game
-        self.laser_sound = arcade.load_sound(":resources:sounds/hurt5.wav")
-        self.hit_sound1 = arcade.load_sound(":resources:sounds/explosion1.wav")
-        self.hit_sound2 = arcade.load_sound(":resources:sounds/explosion2.wav")
-        self.hit_sound3 = arcade.load_sound(":resources:sounds/hit1.wav")
-        self.hit_sound4 = arcade.load_sound(":resources:sounds/hit2.wav")
+        # Register sounds within the game (only loaded if they will be played)
+        self.laser_sound = self._load_sound(":resources:sounds/hurt5.wav")
+        self.hit_sound1 = self._load_sound(":resources:sounds/explosion1.wav")
+        self.hit_sound2 = self._load_sound(":resources:sounds/explosion2.wav")
+        self.hit_sound3 = self._load_sound(":resources:sounds/hit1.wav")
+        self.hit_sound4 = self._load_sound(":resources:sounds/hit2.wav")
 
         self.hit_sounds = [self.hit_sound1, self.hit_sound2, self.hit_sound3, self.hit_sound4]
 
+    def _create_window(self) -> None:
+        """
+        Create the window the game is drawn in (hidden when graphics are off), overridden by headless environments
+        """
+        super().__init__(width=SCREEN_WIDTH, height=SCREEN_HEIGHT, title=SCREEN_TITLE,
+                         update_rate=self.timestep, visible=self.graphics_on)
+
+    def _load_sound(self, file_name: str) -> Any:
+        # Loading sounds goes through the audio driver, skip it when sounds are off
+        return arcade.load_sound(file_name) if self.sound_on else None
+
     def _play_sound(self, sound):
         # Private sound playing function (checks stored sound_on) using globally specified volume
         if self.sound_on:
@@ -147,19 +191,36 @@ class AsteroidGame(arcade.Window):
         # Set trackers used for game over checks
         self.game_over = StoppingCondition.none
 
-        # Sprite lists
-        self.player_sprite_list = arcade.SpriteList()
-        self.asteroid_list = arcade.SpriteList()
-        self.bullet_list = arcade.SpriteList()
-
-        # Set up the players
-        self.player_sprite_list.extend(self.scenario.ships(self.frequency))
-
-        # Build the dashboard if it should be drawn
-        self.dashboard = Dashboard(self.player_sprite_list, self.get_size(), full_dashboard=self.full_dashboard)
-
-        # Get the asteroids from the Scenario (which builds them based on the Scenario settings)
-        self.asteroid_list.extend(self.scenario.asteroids(self.frequency))
+        # Set up the players, and get the asteroids from the Scenario (which builds them based on the Scenario settings)
+        ships = self.scenario.ships(self.frequency)
+        asteroids = self.scenario.asteroids(self.frequency, self.rng, self.asteroid_pool)
+        for ship in ships:
+            ship.bullet_pool = self.bullet_pool
+
+        if self.engine:
+            # Copy the starting states into the engine, which provides its own (array backed) sprite lists
+            self.engine.load(ships, asteroids)
+            self.player_sprite_list = self.engine.player_sprite_list
+            self.asteroid_list = self.engine.asteroid_list
+            self.bullet_list = self.engine.bullet_list
+        else:
+            # Sprite lists are created for the first game and emptied for the next ones
+            if self.player_sprite_list is None:
+                self.player_sprite_list = arcade.SpriteList()
+                self.asteroid_list = arcade.SpriteList()
+                self.bullet_list = arcade.SpriteList()
+            else:
+                self.clear_sprites()
+
+            self.player_sprite_list.extend(ships)
+            self.asteroid_list.extend(asteroids)
+
+        # Build the dashboard if it should be drawn (its shapes need the window's graphics context), once per window
+        if self.graphics_on and self.dashboard is None:
+            self.dashboard = Dashboard(self.player_sprite_list, self.get_size(), full_dashboard=self.full_dashboard,
+                                       graphics_on=self.graphics_on)
+        elif self.graphics_on:
+            self.dashboard.reset(self.player_sprite_list, self.get_size())
 
         # This will resize the window if the dimensions are different from global
         # This behavior is not tested well
@@ -167,12 +228,40 @@ class AsteroidGame(arcade.Window):
             self.set_size(self.scenario.game_map.width, self.scenario.game_map.height)
 
         self._print_terminal("**********************************************************")
-        if hasattr(self, 'controller'):
+        if getattr(self, 'controller', None):
             self._print_terminal(f"T1 Controller: {self.controller[1].name if hasattr(self, 'controller') else ''}")
             self._print_terminal(f"T2 Controller: {self.controller[2].name if hasattr(self, 'controller') else ''}")
         self._print_terminal(f"Scenario: {self.scenario.name}")
         self._print_terminal(f"- - - - - - - - - - - - - - - - - - - - - - - - - - - - -")
 
+    def clear_sprites(self) -> None:
+        """
+        Empty the sprite lists of the last game, giving its bullets and asteroids back to the sprite pools
+        """
+        for sprite_list in (self.player_sprite_list, self.asteroid_list, self.bullet_list):
+            for sprite in tuple(sprite_list):
+                sprite.remove_from_sprite_lists()
+
+            # Without a graphics context arcade keeps every sprite ever added to a list (to load its texture once the
+            # list is drawn), clearing the list drops them along with its grown buffers
+            sprite_list.clear()
+
+        # Nothing refers to the sprites of the last game any more
+        self.bullet_pool.recycle()
+        self.asteroid_pool.recycle()
+
+    def clear_game(self) -> None:
+        """
+        Drop the state of the last game (its sprites go back to the sprite pools), so that an idle environment does not
+        keep it alive. The next game is started with ``start_new_game()`` as usual
+        """
+        if self.engine:
+            self.engine.load([], [])
+        elif self.player_sprite_list is not None:
+            self.clear_sprites()
+        self.score = None
+        self.game_over = None
+
     def draw_extra(self) -> None:
         """
         This function is overridden in child classes to extend window UI plotting behaviors
@@ -303,15 +392,17 @@ class AsteroidGame(arcade.Window):
                 elif symbol == arcade.key.DOWN and arcade.key.UP not in self.active_key_presses:
                     player_sprite.thrust = 0
 
-    def split_asteroid(self, asteroid: AsteroidSprite, team: int) -> None:
-        """ Split an asteroid into chunks. """
+    def split_asteroid(self, asteroid: AsteroidSprite, team: int) -> List[Any]:
+        """
+        Split an asteroid into chunks.
+
+        :return: The new asteroids (empty for the smallest asteroids)
+        """
         # Add to score
         self.score.asteroids_hit[team-1] += 1
 
-        if asteroid.size > 1:
-            self.asteroid_list.extend(
-                [AsteroidSprite(frequency=self.frequency, position=asteroid.position, size=asteroid.size - 1) for _ in
-                 range(3)])
+        children = asteroid.split() if asteroid.size > 1 else []
+        self.asteroid_list.extend(children)
 
         # Play sound via index lookup
         self._play_sound(self.hit_sounds[asteroid.size-1])
@@ -319,6 +410,8 @@ class AsteroidGame(arcade.Window):
         # Remove asteroid from sprites
         asteroid.remove_from_sprite_lists()
 
+        return children
+
     def kill_ship(self, ship: ShipSprite) -> None:
         """
         Kill the given ship sprite, and manage respawn if there are lives leftover
@@ -353,31 +446,46 @@ class AsteroidGame(arcade.Window):
             self.bullet_list.on_update(delta_time)
             self.player_sprite_list.on_update(delta_time)
 
-            # Check for collisions between bullets and asteroids
-            self.check_bullet_asteroid_collisions()
+            self.resolve_collisions()
 
-            # Check for ship to asteroid collisions
-            self.check_asteroid_ship_collisions()
+        else:
+            self.final_update()
 
-            # Check for ship to ship collisions
-            self.check_ship_ship_collisions()
+    def resolve_collisions(self) -> None:
+        """
+        Second half of a time step, run once everything has moved: collision checks and the time step score update
+        """
+        # Check for collisions between bullets and asteroids
+        self.check_bullet_asteroid_collisions()
 
-            # Run the timestep score update function after the environment has updated
-            self.score.timestep_update(environment=self)
+        # Check for ship to asteroid collisions
+        self.check_asteroid_ship_collisions()
 
-        else:
-            # Final time step update
-            self.score.max_distance = sum(self.score.frame_count * sprite.max_speed for sprite in self.player_sprite_list)
-            self.score.stopping_condition = self.game_over
-            self.score.final_update(environment=self)
+        # Check for ship to ship collisions
+        self.check_ship_ship_collisions()
 
-            self._print_terminal(f"- - - - - - - - - - - - - - - - - - - - - - - - - - - - -")
-            self._print_terminal(f"Game over at {self.score.time:.3f} seconds | ({self.game_over})")
-            self._print_terminal(f"Score: {self.score.__dict__}")
-            self._print_terminal("**********************************************************\n")
+        # Run the timestep score update function after the environment has updated
+        self.score.timestep_update(environment=self)
 
-            if self.graphics_on:
-                pyglet.app.exit()
+        # Sprites removed during this frame can now be reused
+        self.bullet_pool.recycle()
+        self.asteroid_pool.recycle()
+
+    def final_update(self) -> None:
+        """
+        Final time step update, run once the game is over
+        """
+        self.score.max_distance = sum(self.score.frame_count * sprite.max_speed for sprite in self.player_sprite_list)
+        self.score.stopping_condition = self.game_over
+        self.score.final_update(environment=self)
+
+        self._print_terminal(f"- - - - - - - - - - - - - - - - - - - - - - - - - - - - -")
+        self._print_terminal(f"Game over at {self.score.time:.3f} seconds | ({self.game_over})")
+        self._print_terminal(f"Score: {self.score.__dict__}")
+        self._print_terminal("**********************************************************\n")
+
+        if self.graphics_on:
+            pyglet.app.exit()
 
     def check_stopping_conditions(self):
         # Check to see for termination conditions
@@ -398,26 +506,65 @@ class AsteroidGame(arcade.Window):
             self.score.distance_travelled += sum((sprite.change_x ** 2 + sprite.change_y ** 2) ** 0.5
                                                  for sprite in self.player_sprite_list)  # meters
 
+    @staticmethod
+    def _build_grid(grid: SpatialHash, sprite_list: arcade.SpriteList) -> List[arcade.Sprite]:
+        # Bin the sprites of a list into a broadphase grid, returns the sprites in grid index order
+        sprites = list(sprite_list)
+        grid.build(*sprite_bounds(sprites))
+        return sprites
+
+    @staticmethod
+    def _add_to_grid(grid: SpatialHash, grid_sprites: List[arcade.Sprite], sprites: List[arcade.Sprite]) -> None:
+        # Register sprites created after the grid was built
+        if sprites:
+            grid.add(*sprite_bounds(sprites))
+            grid_sprites.extend(sprites)
+
+    @staticmethod
+    def _check_for_collision_with_grid(sprite: arcade.Sprite, sprite_list: arcade.SpriteList, grid: SpatialHash,
+                                       grid_sprites: List[arcade.Sprite]) -> List[arcade.Sprite]:
+        """
+        Equivalent of ``arcade.check_for_collision_with_list()`` which only runs the hit box checks on the broadphase
+        candidates of ``sprite`` (returned in list order, excluding ``sprite`` itself and sprites no longer in the list)
+        """
+        radius = get_geometry(geometry_id(sprite.texture, sprite.scale)).bounding_radius
+        candidates = (grid_sprites[idx] for idx in grid.query(sprite.center_x, sprite.center_y, radius))
+        return [other for other in candidates if other is not sprite and sprite_list in other.sprite_lists
+                and arcade.check_for_collision(sprite, other)]
+
     def check_bullet_asteroid_collisions(self):
+        if self.collision_handler:
+            return self.collision_handler.check_bullet_asteroid_collisions(self)
+
+        grid_asteroids = self._build_grid(self.asteroid_grid, self.asteroid_list)
+
         # Check for collisions between bullets and asteroids
         for bullet in self.bullet_list:
-            asteroids = arcade.check_for_collision_with_list(bullet, self.asteroid_list)
+            asteroids = self._check_for_collision_with_grid(bullet, self.asteroid_list, self.asteroid_grid,
+                                                            grid_asteroids)
             if asteroids:
                 self.score.bullets_hit_asteroids[bullet.team-1] += 1
             # Break up and remove asteroids if there are bullet-asteroid collisions
             for asteroid in asteroids:
-                self.split_asteroid(cast(AsteroidSprite, asteroid), bullet.team)  # expected AsteroidSprite, got Sprite instead
+                children = self.split_asteroid(cast(AsteroidSprite, asteroid), bullet.team)  # expected AsteroidSprite, got Sprite instead
+                self._add_to_grid(self.asteroid_grid, grid_asteroids, children)
                 # self.score.asteroids_hit_by_bullets[bullet.team-1] += 1
                 bullet.remove_from_sprite_lists()
 
     def check_asteroid_ship_collisions(self):
+        if self.collision_handler:
+            return self.collision_handler.check_asteroid_ship_collisions(self)
+
+        grid_asteroids = self._build_grid(self.asteroid_grid, self.asteroid_list)
+
         # Perform checks on the player sprite if it is not respawning
         for idx, sprite in enumerate(self.player_sprite_list):
             if not sprite.respawn_time_left:
                 self.score.distance_travelled += (sprite.change_x ** 2 + sprite.change_y ** 2) ** 0.5  # meters
 
                 # Check for collisions with the asteroids (returns collisions)
-                asteroids = arcade.check_for_collision_with_list(sprite, self.asteroid_list)
+                asteroids = self._check_for_collision_with_grid(sprite, self.asteroid_list, self.asteroid_grid,
+                                                                grid_asteroids)
 
                 # Check if there are ship-asteroid collisions detected
                 if len(asteroids) > 0:
@@ -425,16 +572,24 @@ class AsteroidGame(arcade.Window):
 
                     self._print_terminal(f"Ship {sprite.id} crashed into asteroid: at {sprite.position_str}, t={self.score.time:.3f} seconds")
 
-                    self.split_asteroid(cast(AsteroidSprite, asteroids[0]), sprite.team)
+                    children = self.split_asteroid(cast(AsteroidSprite, asteroids[0]), sprite.team)
+                    self._add_to_grid(self.asteroid_grid, grid_asteroids, children)
                     self.kill_ship(sprite)
 
     def check_ship_ship_collisions(self):
+        if self.collision_handler:
+            return self.collision_handler.check_ship_ship_collisions(self)
+
+        # Ships only move during this check when they respawn, which makes them invulnerable
+        grid_ships = self._build_grid(self.ship_grid, self.player_sprite_list)
+
         # Perform checks on the player sprite if it is not respawning
         for idx, sprite in enumerate(self.player_sprite_list):
             if not sprite.respawn_time_left:
 
                 # Check for collisions with other ships (returns list of sprites that collided with `sprite`)
-                collided_ships = arcade.check_for_collision_with_list(sprite, self.player_sprite_list)
+                collided_ships = self._check_for_collision_with_grid(sprite, self.player_sprite_list, self.ship_grid,
+                                                                     grid_ships)
 
                 # Filter out collisions if the target ship is still respawning
                 valid_collided_ships = [ship for ship in collided_ships if not cast(ShipSprite, ship).respawn_time_left]
@@ -456,12 +611,42 @@ class AsteroidGame(arcade.Window):
         """
         Call this before environment evaluation to seed the random number generator to provide consistent results
 
+        The seed is used for the generator of this environment (``rng``), the global ``random`` module is not touched.
         See [Python ``random`` docs] (https://docs.python.org/3/library/random.html) to learn more
 
         :param seed: Integer seed value
         """
         self.scenario.seed = seed
 
+    def snapshot(self) -> GameSnapshot:
+        """
+        Capture the full state of the game between two frames (entities, timers, score counters and random number
+        generator), see ``snapshot.GameSnapshot``
+        """
+        tables = self.engine.snapshot() if self.engine else sprite_tables(self)
+        return GameSnapshot(*tables, fire_orders=fire_orders(self), score=copy_value(self.score.__dict__),
+                            rng_state=self.rng.getstate(), game_over=self.game_over, scenario=self.scenario,
+                            stop_if_no_ammo=self.stop_if_no_ammo)
+
+    def restore(self, snapshot: GameSnapshot) -> None:
+        """
+        Go back to the state of a snapshot taken in this environment (or one with the same settings), the game then
+        continues exactly as it did after the snapshot was taken. The score object is kept, with its attributes reset
+        to those of the snapshot
+        """
+        if self.engine:
+            self.engine.restore(snapshot.asteroids, snapshot.bullets, snapshot.ships, snapshot.ship_ranges)
+        else:
+            restore_sprites(self, snapshot)
+        restore_fire_orders(self, snapshot.fire_orders)
+
+        self.score.__dict__.clear()
+        self.score.__dict__.update(copy_value(snapshot.score))
+        self.rng.setstate(snapshot.rng_state)
+        self.game_over = snapshot.game_over
+        self.scenario = snapshot.scenario
+        self.stop_if_no_ammo = snapshot.stop_if_no_ammo
+
     def run(self, **kwargs) -> Score:
         """
         Run a full game, based on the settings passed in as keyword arguments (**kwargs)
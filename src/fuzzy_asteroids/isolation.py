@@ -0,0 +1,260 @@
+"""
+Controllers isolated in their own processes, selected with ``{"controller_isolation": "process"}`` in the settings of
+``FuzzyAsteroidGame`` (or any of its children)
+
+Each team's controller runs in a worker process. Every frame the ships and the controller data are written to a
+shared memory block of the team, the worker is signalled through a pipe, and the actions it writes back to the block
+are applied to the ships. The deadline is hard: a worker which misses it (or crashes) is killed and restarted from the
+controller object it was started with, so a controller which loops forever or holds the GIL cannot slow down the game.
+Optional ``{"controller_limits": {"cpu": seconds, "memory": bytes}}`` settings apply resource limits to the workers
+(where the ``resource`` module is available).
+"""
+import math
+import pickle
+import time
+import traceback
+import multiprocessing
+from multiprocessing import shared_memory
+from types import MappingProxyType
+
+import numpy as np
+
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+
+from .fuzzy_controller import ControllerBase, SpaceShip, call_controller
+
+try:
+    import resource
+except ImportError:
+    # Resource limits are only supported on Unix
+    resource = None
+
+# Resource limit applied for each "controller_limits" key
+LIMITS = {"cpu": "RLIMIT_CPU", "memory": "RLIMIT_AS"}
+
+
+class ControllerCrashed(RuntimeError):
+    """
+    Raised when the process running a controller died during a call
+    """
+    pass
+
+
+def plain(value: Any) -> Any:
+    """
+    Copy of the controller data with the read-only mappings turned back into dictionaries, so that it can be pickled
+    """
+    if isinstance(value, MappingProxyType):
+        return {key: plain(item) for key, item in value.items()}
+    elif isinstance(value, tuple):
+        return tuple(plain(item) for item in value)
+    return value
+
+
+def _picklable(error: BaseException) -> BaseException:
+    try:
+        pickle.dumps(error)
+        return error
+    except Exception:
+        return RuntimeError("".join(traceback.format_exception(type(error), error, error.__traceback__)))
+
+
+def _serve(conn: Any, controller: ControllerBase, name: str, limits: Optional[Dict[str, int]]) -> None:
+    """
+    Main loop of a controller worker process
+    """
+    if limits and resource:
+        for key, value in limits.items():
+            limit = getattr(resource, LIMITS[key])
+            resource.setrlimit(limit, (int(value), int(value)))
+
+    block = shared_memory.SharedMemory(name=name)
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+
+        ticket, name, length = message
+        if name != block.name:
+            block.close()
+            block = shared_memory.SharedMemory(name=name)
+
+        ships, data = pickle.loads(block.buf[:length])
+        t0 = time.perf_counter()
+        try:
+            call_controller(controller, ships, data)
+        except Exception as e:
+            conn.send((ticket, _picklable(e), time.perf_counter() - t0))
+            continue
+        elapsed = time.perf_counter() - t0
+
+        # Unset outputs are written as NaN
+        actions = np.ndarray((len(ships), 3), dtype=np.float64, buffer=block.buf)
+        for row, ship in zip(actions, ships):
+            fire_bullet = None if ship.fire_bullet is None else bool(ship.fire_bullet)
+            row[:] = [math.nan if value is None else float(value)
+                      for value in (ship.turn_rate, ship.thrust, fire_bullet)]
+        del actions
+
+        conn.send((ticket, None, elapsed))
+
+    block.close()
+
+
+class _ProcessWorker:
+    """
+    Process running one controller, with its shared memory block and control pipe
+    """
+    def __init__(self, controller: ControllerBase, limits: Optional[Dict[str, int]], size: int, context: Any):
+        self.controller = controller
+        self.block = shared_memory.SharedMemory(create=True, size=size)
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child, controller, self.block.name, limits), daemon=True)
+        self.process.start()
+        child.close()
+        self._ticket = 0
+        self._sent_at = 0.0
+        self._error = None
+
+    def _reserve(self, size: int) -> None:
+        if size > self.block.size:
+            # The new block is handed to the worker with the next call
+            self.block.close()
+            self.block.unlink()
+            self.block = shared_memory.SharedMemory(create=True, size=2 * size)
+
+    def send(self, ships: Sequence[SpaceShip], data: Any) -> None:
+        payload = pickle.dumps((tuple(ships), plain(data)), protocol=pickle.HIGHEST_PROTOCOL)
+        self._reserve(max(len(payload), 24 * len(ships)))
+        self.block.buf[:len(payload)] = payload
+
+        self._ticket += 1
+        self._sent_at = time.perf_counter()
+        try:
+            self.conn.send((self._ticket, self.block.name, len(payload)))
+            self._error = None
+        except OSError as e:
+            self._error = e
+
+    def receive(self, num_ships: int, timeout: Optional[float]) -> Tuple[np.ndarray, float]:
+        try:
+            if self._error is not None:
+                raise self._error
+            finished = self.conn.poll(timeout)
+            if finished:
+                ticket, error, elapsed = self.conn.recv()
+        except (EOFError, OSError) as e:
+            raise ControllerCrashed(f"The controller process exited with code {self.process.exitcode}") from e
+
+        if not finished:
+            raise TimeoutError(f"The controller did not finish within {timeout:.4f} seconds")
+
+        if ticket != self._ticket:
+            raise RuntimeError("Controller worker returned the result of another call")
+        if error is not None:
+            raise error
+        actions = np.ndarray((num_ships, 3), dtype=np.float64, buffer=self.block.buf).copy()
+        return actions, self._sent_at + elapsed
+
+    def close(self, kill: bool = False) -> None:
+        if kill:
+            self.process.kill()
+        else:
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+        self.process.join()
+        self.conn.close()
+        self.block.close()
+        self.block.unlink()
+
+
+class ProcessIsolation:
+    """
+    Runs the controller of each key (team) in its own worker process
+
+    ``run()`` raises ``TimeoutError`` when the worker misses its deadline and ``ControllerCrashed`` when it dies, and
+    re-raises the exceptions raised by the controller. The worker is restarted after a timeout or a crash.
+    """
+    def __init__(self, limits: Dict[str, int] = None, buffer_size: int = 1 << 20, context: Any = None):
+        """
+        :param limits: Optional resource limits of the workers, "cpu" time in seconds and "memory" in bytes
+        :param buffer_size: Initial size of the shared memory block of each worker, in bytes (it grows when needed)
+        :param context: ``multiprocessing`` context used to start the workers, the default one if not given
+        """
+        if limits:
+            unknown = set(limits) - set(LIMITS)
+            if unknown:
+                raise ValueError(f"Unknown controller limits {sorted(unknown)}, the limits are {list(LIMITS)}")
+
+        self.limits = dict(limits) if limits else None
+        self.buffer_size = buffer_size
+        self.context = context if context else multiprocessing.get_context()
+
+        # Number of times the worker of each key was restarted after a timeout or a crash
+        self.restarts: Dict[Hashable, int] = dict()
+        self._workers: Dict[Hashable, _ProcessWorker] = dict()
+
+    def _start(self, key: Hashable, controller: ControllerBase) -> _ProcessWorker:
+        worker = self._workers.pop(key, None)
+        if worker is not None:
+            worker.close(kill=True)
+        worker = self._workers[key] = _ProcessWorker(controller, self.limits, self.buffer_size, self.context)
+        return worker
+
+    def run(self, key: Hashable, controller: ControllerBase, ships: Sequence[SpaceShip], data: Any,
+            timeout: Optional[float]) -> float:
+        """
+        Run a controller on its ships in the worker of ``key``, and set the actions it chose on ``ships``
+
+        :param key: Worker to use, (re)started when it does not run ``controller`` yet
+        :param controller: Controller to run
+        :param ships: Ships given to the controller
+        :param data: Controller data of the frame
+        :param timeout: Deadline of the call in seconds, ``None`` to wait for as long as it takes
+        :return: Time (``time.perf_counter()``) the controller finished at
+        """
+        self.submit(key, controller, ships, data)
+        return self.wait(key, ships, timeout)
+
+    def submit(self, key: Hashable, controller: ControllerBase, ships: Sequence[SpaceShip], data: Any) -> None:
+        """
+        Start a call in the worker of ``key`` without waiting for it, to run the calls of several keys at once
+        """
+        worker = self._workers.get(key)
+        if worker is None or worker.controller is not controller:
+            worker = self._start(key, controller)
+        worker.send(ships, data)
+
+    def wait(self, key: Hashable, ships: Sequence[SpaceShip], timeout: Optional[float]) -> float:
+        """
+        Wait for the call submitted to the worker of ``key`` and set its actions on ``ships``, see ``run()``
+        """
+        worker = self._workers[key]
+        try:
+            actions, finished_at = worker.receive(len(ships), timeout)
+        except (TimeoutError, ControllerCrashed):
+            self._start(key, worker.controller)
+            self.restarts[key] = self.restarts.get(key, 0) + 1
+            raise
+
+        for ship, (turn_rate, thrust, fire_bullet) in zip(ships, actions.tolist()):
+            if not math.isnan(turn_rate):
+                ship.turn_rate = turn_rate
+            if not math.isnan(thrust):
+                ship.thrust = thrust
+            if not math.isnan(fire_bullet):
+                ship.fire_bullet = bool(fire_bullet)
+        return finished_at
+
+    def close(self) -> None:
+        """
+        Stop the worker processes and free their shared memory
+        """
+        for worker in self._workers.values():
+            worker.close()
+        self._workers.clear()
@@ -0,0 +1,123 @@
+"""
+Array observations for controllers, selected with ``{"observation": "arrays"}`` in the settings of
+``FuzzyAsteroidGame`` (or any of its children)
+
+Instead of tuples of per sprite state dictionaries, the ``asteroids``, ``bullets`` and ``ships`` entries of the
+controller ``input_data`` are ``Columns``: read-only 1-D NumPy arrays of one value per entity, so controllers can
+vectorize their math directly. With the numpy engine the asteroid and bullet columns are views of the engine arrays
+(no copy is made), which keep changing as the game advances, so they are only valid for the frame they were given in.
+"""
+import numpy as np
+
+from typing import Any, Dict, ItemsView, KeysView, Sequence, Tuple
+
+# Columns of each entity type with their data type, and the sprite attribute each one is read from
+ASTEROID_COLUMNS = {"x": np.float64, "y": np.float64, "vx": np.float64, "vy": np.float64, "angle": np.float64,
+                    "size": np.int64}
+BULLET_COLUMNS = {"x": np.float64, "y": np.float64, "vx": np.float64, "vy": np.float64, "angle": np.float64,
+                  "team": np.int64}
+SHIP_COLUMNS = {"x": np.float64, "y": np.float64, "vx": np.float64, "vy": np.float64, "angle": np.float64,
+                "speed": np.float64, "max_speed": np.float64, "respawn_time_left": np.float64, "id": np.int64,
+                "team": np.int64, "lives": np.int64}
+
+SPRITE_ATTRIBUTES = {"x": "center_x", "y": "center_y", "vx": "change_x", "vy": "change_y"}
+
+# Engine fields which have a different name than their column
+ENGINE_FIELDS = {"respawn_time_left": "respawning"}
+
+
+def read_only(array: np.ndarray) -> np.ndarray:
+    """
+    Read-only view of an array (the owner of the data can still write to it)
+    """
+    view = array.view()
+    view.flags.writeable = False
+    return view
+
+
+class Columns:
+    """
+    Read-only columns of entities, ``columns[name]`` is a 1-D NumPy array with one value per entity (in list order)
+
+    Like the tuple of state dictionaries it replaces, ``len()`` is the number of entities. Columns are not iterable
+    (neither the entities nor the column names would be what every caller expects), use ``keys()`` and ``items()``.
+    """
+    __slots__ = ("_columns", "count")
+
+    # Iterating would be ambiguous between the entities and the column names
+    __iter__ = None
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self._columns = {name: read_only(array) if array.flags.writeable else array for name, array in columns.items()}
+        self.count = len(next(iter(columns.values()))) if columns else 0
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self._columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._columns
+
+    def __len__(self) -> int:
+        return self.count
+
+    def keys(self) -> KeysView:
+        """
+        Names of the columns
+        """
+        return self._columns.keys()
+
+    def items(self) -> ItemsView:
+        """
+        (name, array) pairs of the columns
+        """
+        return self._columns.items()
+
+    def __repr__(self) -> str:
+        return f"Columns({self.count} entities: {', '.join(self._columns)})"
+
+    @property
+    def position(self) -> np.ndarray:
+        """
+        (count, 2) array of the x, y positions
+        """
+        return np.column_stack((self._columns["x"], self._columns["y"]))
+
+    @property
+    def velocity(self) -> np.ndarray:
+        """
+        (count, 2) array of the x, y velocities
+        """
+        return np.column_stack((self._columns["vx"], self._columns["vy"]))
+
+    @classmethod
+    def from_sprites(cls, sprites: Sequence[Any], columns: Dict[str, Any]) -> "Columns":
+        """
+        Columns built from sprites (or engine views) by reading their attributes
+        """
+        return cls({name: np.fromiter((getattr(sprite, SPRITE_ATTRIBUTES.get(name, name)) for sprite in sprites),
+                                      dtype=dtype, count=len(sprites))
+                    for name, dtype in columns.items()})
+
+    @classmethod
+    def from_arrays(cls, arrays: Any, columns: Dict[str, Any], rows: np.ndarray = None) -> "Columns":
+        """
+        Columns taken from the arrays of an ``ArrayEngine``, as views unless ``rows`` selects a subset
+        """
+        fields = {name: arrays[ENGINE_FIELDS.get(name, name)] for name in columns}
+        return cls(fields if rows is None else {name: values[rows] for name, values in fields.items()})
+
+
+def observe(game: Any) -> Tuple[Columns, Columns, Columns]:
+    """
+    Columns of the asteroids, bullets and ships of a game environment
+    """
+    if game.engine:
+        engine = game.engine
+        alive = [view._idx for view in engine.player_sprite_list]
+        return (Columns.from_arrays(engine.asteroids, ASTEROID_COLUMNS),
+                Columns.from_arrays(engine.bullets, BULLET_COLUMNS),
+                Columns.from_arrays(engine.ships, SHIP_COLUMNS, np.array(alive, dtype=np.int64)))
+
+    return (Columns.from_sprites(list(game.asteroid_list), ASTEROID_COLUMNS),
+            Columns.from_sprites(list(game.bullet_list), BULLET_COLUMNS),
+            Columns.from_sprites(list(game.player_sprite_list), SHIP_COLUMNS))
@@ -0,0 +1,230 @@
+"""
+Evaluation of a population of controller parameter vectors over a portfolio of scenarios, for parameter searches
+(such as the generations of a genetic algorithm tuning a fuzzy controller)
+
+Every (candidate, scenario, seed) game is a job for a pool of worker processes, which stays up between calls to
+``PopulationEvaluator.evaluate()``. Each worker receives the controller factory, the portfolio and the fitness
+function once, and plays all of its games in the same headless environment (see ``env_pool``). A job only carries the
+parameters of its candidate and sends back a single fitness value.
+"""
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from .env_pool import EnvironmentPool
+from .fuzzy_controller import ControllerBase
+from .result_cache import ResultCache, controller_fingerprint, scenario_fingerprint, simulation_settings, game_key
+from .util import Scenario, Score
+
+ControllerFactory = Callable[[np.ndarray], Union[ControllerBase, Dict[int, ControllerBase]]]
+
+
+class _Evaluation:
+    """
+    Plays the games of the jobs, in one process
+    """
+    def __init__(self, controller_factory: ControllerFactory, portfolio: List[Scenario], fitness: Callable[[Score], float],
+                 score_class: type, settings: Dict[str, Any], env_kwargs: Dict[str, Any], keep_scores: bool):
+        self.controller_factory = controller_factory
+        self.portfolio = portfolio
+        self.fitness = fitness
+        self.score_class = score_class
+        self.keep_scores = keep_scores
+        self.pool = EnvironmentPool(settings=settings, max_size=1, **env_kwargs)
+
+    def __call__(self, parameters: np.ndarray, scenario_idx: int, seed: Optional[int]) -> tuple:
+        controller = self.controller_factory(parameters)
+        # A single controller plays both teams
+        controllers = controller if isinstance(controller, dict) else {1: controller, 2: controller}
+
+        # The portfolio can hold the scenarios of the caller (frozen scenarios are not copied), the seed is only
+        # changed for this game
+        scenario = self.portfolio[scenario_idx]
+        scenario_seed = scenario.seed
+        if seed is not None:
+            scenario.seed = seed
+        try:
+            score = self.pool.run(controller=controllers, scenario=scenario, score=self.score_class())
+        finally:
+            scenario.seed = scenario_seed
+        # The score itself is only sent back to be cached
+        return float(self.fitness(score)), score.__dict__ if self.keep_scores else None
+
+
+# Evaluation of the worker process, set up once by ``_init_worker()``
+_worker: Dict[str, _Evaluation] = {}
+
+
+def _init_worker(*args) -> None:
+    _worker["evaluation"] = _Evaluation(*args)
+
+
+def _run_jobs(jobs: List[tuple]) -> List[tuple]:
+    evaluation = _worker["evaluation"]
+    return [evaluation(*job) for job in jobs]
+
+
+class PopulationEvaluator:
+    """
+    Fitness of controller parameter vectors over a portfolio of scenarios and seeds
+
+    The controller factory, the fitness function and the score class are sent to the worker processes, so they must
+    be picklable (defined at the top level of a module). Controllers are not timed out by default, so the fitness of
+    a candidate does not depend on the load of the machine.
+    """
+    def __init__(self, controller_factory: ControllerFactory, portfolio: List[Scenario],
+                 fitness: Callable[[Score], float], seeds: Sequence[Optional[int]] = (None,),
+                 processes: Optional[int] = None, settings: Dict[str, Any] = None, score_class: type = Score,
+                 controller_timeout: bool = False, ignore_exceptions: bool = True, cache: ResultCache = None):
+        """
+        :param controller_factory: Function building the controller of a candidate from its parameter vector, it
+                                   returns one controller (which plays both teams) or a dictionary of team controllers
+        :param portfolio: Scenarios each candidate plays
+        :param fitness: Function reducing the ``Score`` of a game to a number
+        :param seeds: Seeds each scenario is played with, ``None`` keeps the seed of the scenario
+        :param processes: Number of worker processes, None for one per CPU and 1 to play the games in this process
+        :param settings: Optional settings of the environments
+        :param score_class: Class of the ``Score`` of each game (constructed without arguments)
+        :param controller_timeout: Whether controllers are timed out
+        :param ignore_exceptions: Whether exceptions raised by controllers are counted in the score instead of
+                                  stopping the evaluation
+        :param cache: Optional cache of the scores of the games, consulted before playing them (candidates which come
+                      back, such as elites, are not played again). The fitness is computed from the cached score, so
+                      the fitness function can change without invalidating the cache
+        """
+        if not portfolio:
+            raise ValueError("The portfolio of a population evaluation must hold at least one scenario")
+        if not seeds:
+            raise ValueError("The seeds of a population evaluation must hold at least one seed (or None)")
+        if processes is not None and processes < 1:
+            raise ValueError(f"The number of processes must be 1 or more (or None for one per CPU), not {processes}")
+
+        # Frozen so that each (scenario, seed) starting state is only generated once per process
+        self.portfolio = [scenario.freeze() for scenario in portfolio]
+        self.scenario_seeds = [scenario.seed for scenario in self.portfolio]
+        self.seeds = tuple(seeds)
+        self.processes = processes
+        self.workers = processes if processes else os.cpu_count()
+
+        _settings = {"prints": False}
+        _settings.update(settings if settings else {})
+        env_kwargs = {"controller_timeout": controller_timeout, "ignore_exceptions": ignore_exceptions}
+        self._args = (controller_factory, self.portfolio, fitness, score_class, _settings, env_kwargs,
+                      cache is not None)
+
+        self.cache = cache
+        self.controller_factory = controller_factory
+        self.fitness = fitness
+        self.score_class = score_class
+        self._settings = simulation_settings(_settings, **env_kwargs)
+
+        self._executor = None
+        self._evaluation = None
+
+    @property
+    def shape(self) -> tuple:
+        """
+        Shape of the fitness array of a candidate, (scenarios, seeds)
+        """
+        return len(self.portfolio), len(self.seeds)
+
+    def _start(self) -> None:
+        if self.processes == 1:
+            self._evaluation = _Evaluation(*self._args)
+        else:
+            # The workers are stopped by ``close()`` or when the evaluator is garbage collected
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                                 initargs=self._args)
+            weakref.finalize(self, self._executor.shutdown)
+
+    def evaluate(self, parameters: Any) -> np.ndarray:
+        """
+        Play every (candidate, scenario, seed) game and compute its fitness
+
+        :param parameters: (candidates, parameters) array, one parameter vector per candidate
+        :return: (candidates, scenarios, seeds) array of fitness values, in portfolio and seed order
+        """
+        parameters = np.asarray(parameters, dtype=np.float64)
+        if parameters.ndim != 2:
+            raise ValueError(f"The parameters must be a (candidates, parameters) array, not of shape {parameters.shape}")
+
+        if self._executor is None and self._evaluation is None:
+            self._start()
+
+        jobs = [(candidate, scenario_idx, seed) for candidate in parameters
+                for scenario_idx in range(len(self.portfolio)) for seed in self.seeds]
+        fitness = np.full(len(jobs), np.nan)
+
+        # Games found in the cache are not played
+        cache_keys = None
+        missing = list(range(len(jobs)))
+        if self.cache is not None:
+            # Each candidate is fingerprinted once (this builds its controller)
+            controllers = [self._controller_fingerprint(candidate) for candidate in parameters]
+            games = len(self.portfolio) * len(self.seeds)
+            cache_keys = [self._game_key(controllers[job_idx // games], scenario_idx, seed)
+                          for job_idx, (_, scenario_idx, seed) in enumerate(jobs)]
+            for job_idx, cache_key in enumerate(cache_keys):
+                data = self.cache.get(cache_key) if cache_key is not None else None
+                if data is not None:
+                    score = self.score_class()
+                    score.__dict__.update(data)
+                    fitness[job_idx] = self.fitness(score)
+            missing = np.flatnonzero(np.isnan(fitness)).tolist()
+
+        if missing:
+            remaining = [jobs[job_idx] for job_idx in missing]
+            if self._evaluation is not None:
+                results = [self._evaluation(*job) for job in remaining]
+            else:
+                # Chunks of several games per message, a few per worker to balance games of different lengths
+                size = max(1, len(remaining) // (4 * self.workers))
+                chunks = [remaining[start:start + size] for start in range(0, len(remaining), size)]
+                results = [value for chunk in self._executor.map(_run_jobs, chunks) for value in chunk]
+
+            for job_idx, (value, data) in zip(missing, results):
+                fitness[job_idx] = value
+                if self.cache is not None and cache_keys[job_idx] is not None:
+                    self.cache.put(cache_keys[job_idx], data)
+
+        return fitness.reshape((len(parameters),) + self.shape)
+
+    def cache_key(self, parameters: np.ndarray, scenario_idx: int, seed: Optional[int]) -> Optional[str]:
+        """
+        Key of the score of a candidate in a scenario (with a seed) in the result cache, ``None`` when the game is
+        not cached: unseeded (random) games and controllers which cannot be fingerprinted
+        """
+        return self._game_key(self._controller_fingerprint(parameters), scenario_idx, seed)
+
+    def _controller_fingerprint(self, parameters: np.ndarray) -> Optional[Dict[str, Any]]:
+        try:
+            return controller_fingerprint(self.controller_factory, parameters)
+        except ValueError:
+            return None
+
+    def _game_key(self, controller: Optional[Dict[str, Any]], scenario_idx: int, seed: Optional[int]) -> Optional[str]:
+        seed = seed if seed is not None else self.scenario_seeds[scenario_idx]
+        if controller is None or seed is None:
+            return None
+        return game_key(controller, scenario_fingerprint(self.portfolio[scenario_idx], seed), self._settings,
+                        self.score_class)
+
+    def close(self) -> None:
+        """
+        Stop the worker processes (or the environment of this process)
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        if self._evaluation is not None:
+            self._evaluation.pool.close()
+            self._evaluation = None
+
+    def __enter__(self) -> "PopulationEvaluator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
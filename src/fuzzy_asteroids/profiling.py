@@ -0,0 +1,267 @@
+"""
+Profiling of the controller calls, selected with the ``"controller_profile"`` setting of ``FuzzyAsteroidGame`` (or any
+of its children)
+
+The setting is a mode, ``"sampling"`` or ``"deterministic"``, or a dictionary of ``ControllerProfiler`` arguments
+(``{"mode": "sampling", "every": 10, "top": 20, "interval": 0.001}``). Only the controller calls are profiled (the
+stacks start at ``call_controller()``, which calls ``actions()`` or ``actions_batch()``), and only on every
+``every``-th frame; other frames cost a single check.
+
+The time spent in each call stack is aggregated per team over the game. At game over, ``Score.controller_profiles``
+gets a ``ProfileReport`` per team (``None`` for teams which were never profiled). Each report has a top-N table of
+functions by self time and the collapsed stacks (``"outer;inner;leaf microseconds"`` lines), which flame graph tools
+such as ``flamegraph.pl`` or speedscope read directly.
+
+- "sampling" records the stack of each running controller call every ``interval`` seconds from a background thread,
+  which keeps the overhead low but only sees calls long enough to be sampled
+- "deterministic" traces every function call and return (with ``sys.setprofile``), which is exact but slows the
+  profiled calls down
+"""
+import os
+import sys
+import time
+import threading
+
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, Union
+
+# Stack of function names, from the controller entry point to the innermost function
+Stack = Tuple[str, ...]
+
+
+def frame_name(code: Any) -> str:
+    """
+    Name of a Python function in the stacks, with its file and line
+    """
+    name = getattr(code, "co_qualname", code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def builtin_name(function: Any) -> str:
+    """
+    Name of a built-in function in the stacks
+    """
+    module = getattr(function, "__module__", None) or "builtins"
+    return f"{module}.{getattr(function, '__qualname__', repr(function))}"
+
+
+def _stack_of(frame: Any, root: Any) -> Optional[Stack]:
+    # Stack of the frames below the root frame (which made the controller call)
+    names = []
+    while frame is not None and frame is not root:
+        names.append(frame_name(frame.f_code))
+        frame = frame.f_back
+    return tuple(reversed(names)) if frame is root and names else None
+
+
+class ProfileReport(dict):
+    """
+    Profile of one team's controller over a game, a dictionary (so that it is stored with the score) of:
+
+    - "mode", the profiling mode
+    - "calls", the number of controller calls profiled
+    - "time", the time of the profiled calls in seconds
+    - "top", rows of the functions with the most self time, each with the "function", its "self" time, its "total"
+      time (itself and the functions it called) and the "fraction" of the profiled time spent in it
+    - "collapsed", collapsed stack lines with the time of each stack in microseconds
+    """
+    def write_collapsed(self, path: str) -> None:
+        """
+        Write the collapsed stacks to a file, for flame graph tools
+        """
+        with open(path, "w") as file:
+            file.write("\n".join(self["collapsed"]) + "\n")
+
+
+class ControllerProfiler:
+    """
+    Profiles controller calls, aggregating the self time of every call stack per key (team)
+    """
+    modes = ("sampling", "deterministic")
+
+    def __init__(self, mode: str = "sampling", every: int = 1, top: int = 20, interval: float = 0.001):
+        """
+        :param mode: "sampling" or "deterministic"
+        :param every: Profile the controller calls of one frame out of ``every``
+        :param top: Number of functions in the top table of the reports
+        :param interval: Time between two samples in seconds, for the sampling mode
+        """
+        if mode not in self.modes:
+            raise ValueError(f"Unknown profiling mode \"{mode}\", the mode must be one of {self.modes}")
+        if every < 1:
+            raise ValueError("Controllers can be profiled every 1 or more frames")
+
+        self.mode = mode
+        self.every = int(every)
+        self.top = int(top)
+        self.interval = interval
+
+        # Whether the calls of the current frame are profiled
+        self.active = False
+
+        self._stacks: Dict[Hashable, Dict[Stack, float]] = dict()
+        self._calls: Dict[Hashable, int] = dict()
+        self._time: Dict[Hashable, float] = dict()
+
+        # Calls in progress for the sampler, by thread id: (key, root frame, start time)
+        self._running: Dict[int, Tuple[Hashable, Any, float]] = dict()
+        self._running_lock = threading.Lock()
+        self._sampler: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+        # Switch interval of the interpreter to restore once no sampled call runs
+        self._switch: Optional[float] = None
+
+    @classmethod
+    def from_setting(cls, setting: Union[str, Dict[str, Any], None]) -> Optional["ControllerProfiler"]:
+        """
+        Profiler for a "controller_profile" setting, ``None`` when profiling is off
+        """
+        if not setting:
+            return None
+        return cls(mode=setting) if isinstance(setting, str) else cls(**setting)
+
+    def start_frame(self, frame: int) -> None:
+        """
+        Select whether the controller calls of a frame are profiled
+        """
+        self.active = frame % self.every == 0
+
+    def call(self, key: Hashable, function: Callable, *args) -> Any:
+        """
+        Call ``function(*args)`` and profile it for ``key``, on the thread the call is made from
+        """
+        self._calls[key] = self._calls.get(key, 0) + 1
+        stacks = self._stacks.setdefault(key, dict())
+        t0 = time.perf_counter()
+        try:
+            if self.mode == "deterministic":
+                return self._trace(stacks, function, args)
+            else:
+                return self._sample(key, function, args)
+        finally:
+            self._time[key] = self._time.get(key, 0.0) + time.perf_counter() - t0
+
+    def _trace(self, stacks: Dict[Stack, float], function: Callable, args: Tuple[Any, ...]) -> Any:
+        # Each entry of the stack is [name, start time, time spent in the functions it called]
+        stack: List[List[Any]] = []
+        clock = time.perf_counter
+
+        def profile(frame, event, arg):
+            now = clock()
+            if event == "call" or event == "c_call":
+                stack.append([frame_name(frame.f_code) if event == "call" else builtin_name(arg), now, 0.0])
+            elif stack:
+                # "return", "c_return" and "c_exception"
+                elapsed = now - stack[-1][1]
+                key = tuple(entry[0] for entry in stack)
+                stacks[key] = stacks.get(key, 0.0) + elapsed - stack[-1][2]
+                stack.pop()
+                if stack:
+                    stack[-1][2] += elapsed
+
+        sys.setprofile(profile)
+        try:
+            return function(*args)
+        finally:
+            sys.setprofile(None)
+
+            # The last entry is the call to sys.setprofile() itself
+            stack.clear()
+
+    def _sample(self, key: Hashable, function: Callable, args: Tuple[Any, ...]) -> Any:
+        if self._sampler is None:
+            self._stop.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, name="controller-profiler", daemon=True)
+            self._sampler.start()
+
+        thread_id = threading.get_ident()
+        with self._running_lock:
+            if not self._running:
+                self._switch_interval(True)
+            self._running[thread_id] = (key, sys._getframe(), time.perf_counter())
+        self._wake.set()
+        try:
+            return function(*args)
+        finally:
+            with self._running_lock:
+                del self._running[thread_id]
+                if not self._running:
+                    self._switch_interval(False)
+
+    def _sample_loop(self) -> None:
+        # The sampler sleeps while no profiled call runs
+        while not self._stop.is_set():
+            self._wake.wait()
+            self._wake.clear()
+
+            last = time.perf_counter()
+            while self._running and not self._stop.is_set():
+                time.sleep(self.interval)
+                now = time.perf_counter()
+
+                frames = sys._current_frames()
+                for thread_id, (key, root, started) in list(self._running.items()):
+                    stack = _stack_of(frames.get(thread_id), root)
+                    if stack:
+                        # The sample stands for the time since the last sample, or since the call started
+                        stacks = self._stacks[key]
+                        stacks[stack] = stacks.get(stack, 0.0) + now - max(last, started)
+                del frames
+                last = now
+
+    def _switch_interval(self, active: bool) -> None:
+        # A controller thread only hands the GIL over to the sampler every switch interval (5 ms by default), which
+        # is shortened to the sampling interval while sampled calls run (the setting is process wide, so it is
+        # restored as soon as the last one returns)
+        if active and self._switch is None:
+            self._switch = sys.getswitchinterval()
+            sys.setswitchinterval(min(self._switch, self.interval))
+        elif not active and self._switch is not None:
+            sys.setswitchinterval(self._switch)
+            self._switch = None
+
+    def report(self, key: Hashable) -> Optional[ProfileReport]:
+        """
+        Profile of the calls made for ``key`` so far, ``None`` if none were profiled
+        """
+        if key not in self._calls:
+            return None
+
+        stacks = dict(self._stacks.get(key, {}))
+        self_time: Dict[str, float] = dict()
+        total_time: Dict[str, float] = dict()
+        for stack, seconds in stacks.items():
+            self_time[stack[-1]] = self_time.get(stack[-1], 0.0) + seconds
+            # Recursive functions only count once per stack
+            for name in set(stack):
+                total_time[name] = total_time.get(name, 0.0) + seconds
+
+        profiled = sum(stacks.values())
+        names = sorted(self_time, key=lambda name: (-self_time[name], name))[:self.top]
+        return ProfileReport(
+            mode=self.mode,
+            calls=self._calls[key],
+            time=self._time.get(key, 0.0),
+            top=[{"function": name, "self": self_time[name], "total": total_time[name],
+                  "fraction": self_time[name] / profiled if profiled else 0.0} for name in names],
+            collapsed=[f"{';'.join(stack)} {round(seconds * 1E6)}" for stack, seconds in sorted(stacks.items())
+                       if round(seconds * 1E6) > 0],
+        )
+
+    def reset(self) -> None:
+        """
+        Drop the profiles gathered so far
+        """
+        self._stacks.clear()
+        self._calls.clear()
+        self._time.clear()
+
+    def close(self) -> None:
+        """
+        Stop the sampling thread (and restore the switch interval of the interpreter)
+        """
+        self._switch_interval(False)
+        self._stop.set()
+        self._wake.set()
+        self._sampler = None
@@ -0,0 +1,338 @@
+"""
+On-disk cache of evaluation results, so that tournaments and parameter searches do not play the same game twice
+
+A game is identified by a content fingerprint (``game_key()``) of everything that decides its outcome: the source of
+the controller (the modules defining its class, or the factory building it) and its parameters, the ``Scenario``
+definition, the seed, the simulation settings, the score class and the version of this package. Changing any of them
+gives a new key, so stale results are never returned; results which will not be asked for again are evicted, least
+recently used first, once the cache grows past its size limit. Unseeded games are random, they are never cached.
+
+Each result is one file named by its key, written atomically, so several processes can share a cache directory.
+Results are pickled to give back exactly what was stored (enums, tuples, numpy values), only open caches you trust.
+"""
+import enum
+import functools
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import random
+import tempfile
+from typing import Any, Dict, List, Optional, Set
+
+import numpy as np
+
+from . import __version__
+from .util import Scenario
+
+# Settings which change the outcome of a game, with the defaults the environments use when they are not given
+SIMULATION_SETTINGS = {
+    "frequency": 60,
+    "engine": "arcade",
+    "collider": "hitbox",
+    "random_buffer_size": 0,
+    "observation": "states",
+    "controller_isolation": "thread",
+    "controller_limits": None,
+    "concurrent_teams": False,
+    "action_repeat": 1,
+}
+
+# Attributes of a scenario which do not change its games (or are derived from the others)
+_SCENARIO_IGNORED = ("_name", "name", "_max_asteroids", "_bullet_limit", "_starting_states")
+
+
+class _Plain:
+    pass
+
+
+# Instances larger than those of a plain class keep part of their state outside their ``__dict__`` (slots, C fields)
+_PLAIN_SIZE = _Plain.__basicsize__
+
+
+def _canonical(value: Any, _path: Set[int] = None) -> Any:
+    """
+    JSON compatible form of a value, the same for equal values (in any process)
+
+    Containers, numpy values and the attributes of objects are converted recursively, functions and classes by their
+    name and source. Raises ``ValueError`` for reference cycles and values which cannot be converted faithfully.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    elif isinstance(value, np.generic):
+        return value.item()
+    elif isinstance(value, bytes):
+        return {"__bytes__": value.hex()}
+    elif isinstance(value, enum.Enum):
+        return {"__enum__": f"{type(value).__qualname__}.{value.name}"}
+
+    # Objects on the path from the root, anything met again is a cycle (shared references are fine)
+    _path = _path if _path is not None else set()
+    if id(value) in _path:
+        raise ValueError(f"Cannot fingerprint a reference cycle (through a {type(value).__qualname__})")
+    _path.add(id(value))
+    try:
+        if isinstance(value, dict):
+            return {str(key): _canonical(item, _path)
+                    for key, item in sorted(value.items(), key=lambda item: str(item[0]))}
+        elif isinstance(value, (list, tuple)):
+            return [_canonical(item, _path) for item in value]
+        elif isinstance(value, (set, frozenset)):
+            # Sorted by content, set order changes with hash randomization
+            return {"__set__": sorted((_canonical(item, _path) for item in value),
+                                      key=lambda item: json.dumps(item, sort_keys=True))}
+        elif isinstance(value, np.ndarray):
+            return _canonical(value.tolist(), _path)
+        elif inspect.ismethod(value):
+            return {"__method__": _canonical(value.__func__, _path), "self": _canonical(value.__self__, _path)}
+        elif inspect.isfunction(value):
+            # Closures and defaults change what a function computes as much as its code
+            closure = [cell.cell_contents for cell in value.__closure__ or ()]
+            return {"__function__": f"{value.__module__}.{value.__qualname__}", "source": _source_hash(value),
+                    "closure": _canonical(closure, _path), "defaults": _canonical(value.__defaults__, _path),
+                    "kwdefaults": _canonical(value.__kwdefaults__, _path)}
+        elif isinstance(value, functools.partial):
+            return {"__partial__": _canonical(value.func, _path), "args": _canonical(value.args, _path),
+                    "keywords": _canonical(value.keywords, _path)}
+        elif inspect.isclass(value) or inspect.isbuiltin(value):
+            return {"__class__" if inspect.isclass(value) else "__builtin__":
+                    f"{value.__module__}.{value.__qualname__}", "source": _source_hash(value)}
+        elif isinstance(value, random.Random):
+            # The state of the generator is not in its attributes (those of subclasses are)
+            return {"__random__": type(value).__qualname__, "state": _canonical(value.getstate(), _path),
+                    **_canonical(getattr(value, "__dict__", {}), _path)}
+        elif isinstance(value, np.random.Generator):
+            return {"__generator__": _canonical(value.bit_generator.state, _path)}
+        elif isinstance(value, np.random.RandomState):
+            return {"__random_state__": _canonical(value.get_state(legacy=False), _path)}
+        elif hasattr(value, "__dict__") and type(value).__basicsize__ <= _PLAIN_SIZE:
+            return {"__class__": type(value).__qualname__, **_canonical(vars(value), _path)}
+        raise ValueError(f"Cannot fingerprint a {type(value).__qualname__}, give the parameters of the controller "
+                         f"explicitly")
+    finally:
+        _path.discard(id(value))
+
+
+def _source(obj: Any) -> str:
+    # Source of the module defining an object, its qualified name when the source is not available
+    module = inspect.getmodule(obj)
+    try:
+        return inspect.getsource(module)
+    except (OSError, TypeError):
+        return f"{getattr(obj, '__module__', '')}.{getattr(obj, '__qualname__', repr(obj))}"
+
+
+def _code(code: Any) -> Any:
+    # Byte code of a function with its constants and names, nested functions included (their repr holds an address)
+    return [code.co_code.hex(), [_code(const) if inspect.iscode(const) else repr(const) for const in code.co_consts],
+            list(code.co_names)]
+
+
+def _source_hash(obj: Any) -> str:
+    # Hash of the source of a function or class and of the byte code of a function (several functions, such as
+    # lambdas, can be defined on the same source line)
+    try:
+        source = inspect.getsource(obj)
+    except (OSError, TypeError):
+        source = _source(obj)
+    code = getattr(obj, "__code__", None)
+    content = [source, _code(code)] if code is not None else [source]
+    return hashlib.sha256(json.dumps(content).encode()).hexdigest()
+
+
+def _class_sources(cls: type) -> List[str]:
+    # Sources of the modules defining a class and its bases, the modules of this package are covered by the version
+    return sorted({_source(base) for base in cls.__mro__
+                   if base is not object and not base.__module__.startswith(__package__)})
+
+
+def controller_fingerprint(controller: Any, parameters: Any = None) -> Dict[str, Any]:
+    """
+    Fingerprint of a controller: the source of the modules defining its classes and its parameters
+
+    A function building controllers (or ``functools.partial`` of one) is fingerprinted with the values it captures,
+    and the classes of the controllers it builds from ``parameters``. Raises ``ValueError`` for controllers which
+    cannot be fingerprinted (see ``_canonical()``), their results should not be cached.
+
+    :param controller: Controller instance, dictionary of team controllers, or function building controllers
+    :param parameters: Parameters the controller is built with, the attributes of the controller if not given
+    """
+    if isinstance(controller, dict):
+        return {"teams": {team: controller_fingerprint(item) for team, item in controller.items()}}
+    elif inspect.isroutine(controller) or inspect.isclass(controller) or isinstance(controller, functools.partial):
+        sources = [_source(controller.func if isinstance(controller, functools.partial) else controller)]
+        if parameters is not None:
+            built = controller(parameters)
+            for item in built.values() if isinstance(built, dict) else (built,):
+                sources.extend(_class_sources(type(item)))
+        factory = _canonical(controller)
+    else:
+        sources = _class_sources(type(controller))
+        factory = None
+        parameters = parameters if parameters is not None else controller
+
+    return {"name": getattr(controller, "__qualname__", type(controller).__qualname__),
+            "source": hashlib.sha256("\n".join(sources).encode()).hexdigest(),
+            "factory": factory,
+            "parameters": _canonical(parameters)}
+
+
+def scenario_fingerprint(scenario: Scenario, seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Fingerprint of a scenario definition (not its name), with the seed it is played with
+
+    Raises ``ValueError`` for unseeded games, which are random and cannot be cached.
+    """
+    state = {key: value for key, value in vars(scenario).items() if key not in _SCENARIO_IGNORED}
+    if seed is not None:
+        state["seed"] = seed
+    if state.get("seed") is None:
+        raise ValueError("Unseeded games are random, their results cannot be cached")
+    return _canonical(state)
+
+
+def simulation_settings(settings: Dict[str, Any] = None, **kwargs) -> Dict[str, Any]:
+    """
+    Settings of an environment which change the outcome of its games, see ``SIMULATION_SETTINGS``
+
+    :param settings: Settings dictionary of the environment
+    :param kwargs: Other constructor arguments of the environment which change the outcome (``controller_timeout``...)
+    """
+    _settings = settings if settings else dict()
+    return _canonical({**{key: _settings.get(key, default) for key, default in SIMULATION_SETTINGS.items()}, **kwargs})
+
+
+def game_key(controller: Dict[str, Any], scenario: Dict[str, Any], settings: Dict[str, Any],
+             score_class: type) -> str:
+    """
+    Key of a game in a ``ResultCache``
+
+    :param controller: ``controller_fingerprint()`` of the controller
+    :param scenario: ``scenario_fingerprint()`` of the scenario and seed
+    :param settings: ``simulation_settings()`` of the environment
+    :param score_class: Class of the score of the game
+    """
+    content = {"version": __version__, "controller": controller, "scenario": scenario, "settings": settings,
+               "score": f"{score_class.__module__}.{score_class.__qualname__}"}
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    Directory of evaluation results (such as ``Score`` dictionaries or fitness values) by game key
+
+    ``get()`` returns ``None`` for results which are not in the cache.
+    """
+    def __init__(self, directory: str, max_bytes: int = 256 * 2 ** 20):
+        """
+        :param directory: Directory of the cache, created if needed
+        :param max_bytes: Size of the results above which the least recently used ones are evicted
+        """
+        if max_bytes <= 0:
+            raise ValueError(f"The maximum size of a result cache must be positive, not {max_bytes}")
+
+        self.directory = os.path.abspath(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+        # Size of the results, counted from the directory when it is opened and kept up to date by this object
+        self.size = sum(entry.stat().st_size for entry in self._entries())
+
+        # Counters to measure how effective the cache is
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".pkl")
+
+    def _entries(self):
+        return (entry for entry in os.scandir(self.directory) if entry.is_file() and entry.name.endswith(".pkl"))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._entries())
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def get(self, key: str) -> Any:
+        """
+        Stored result of a key (marking it as recently used), ``None`` if there is none
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                result = pickle.load(file)
+            os.utime(path)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            # Missing, or evicted or invalidated by another process while being read
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key: str, result: Any) -> None:
+        """
+        Store the result of a key, replacing any previous one, then evict results past the size limit
+        """
+        path = self._path(key)
+        previous = os.path.getsize(path) if os.path.exists(path) else 0
+
+        # Written under a temporary name and renamed, so readers never see a partial file
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+        except BaseException:
+            # Such as an unpicklable result, the temporary file would never be evicted
+            os.remove(temporary)
+            raise
+
+        self.size += os.path.getsize(path) - previous
+        if self.size > self.max_bytes:
+            self.evict()
+
+    def evict(self, max_bytes: int = None) -> int:
+        """
+        Remove the least recently used results until the cache holds at most ``max_bytes`` (its size limit by
+        default), other processes may have added results so the size is counted again from the directory
+
+        :return: Number of results removed
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        entries = sorted((entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in self._entries())
+        self.size = sum(size for _, size, _ in entries)
+
+        removed = 0
+        for _, size, path in entries:
+            if self.size <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except OSError:
+                pass
+            self.size -= size
+        return removed
+
+    def invalidate(self, key: str) -> bool:
+        """
+        Remove the result of a key
+
+        :return: Whether there was a result to remove
+        """
+        path = self._path(key)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return False
+        self.size -= size
+        return True
+
+    def clear(self) -> None:
+        """
+        Remove every result
+        """
+        self.evict(max_bytes=0)
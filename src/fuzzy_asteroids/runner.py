@@ -1,12 +1,15 @@
 import os
+import copy
 import json
-from typing import List, Tuple, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple, Dict, Any, Optional
 
 import arcade
 
-from .fuzzy_asteroids import AsteroidGame, FuzzyAsteroidGame
+from .fuzzy_asteroids import AsteroidGame, FuzzyAsteroidGame, HeadlessMixin
 from .util import Scenario, Score
 from .fuzzy_controller import ControllerBase
+from .result_cache import ResultCache, controller_fingerprint, scenario_fingerprint, simulation_settings, game_key
 
 from enum import Enum
 
@@ -49,14 +52,44 @@ class CompetitionScore(Score):
         return list(self.__dict__[key] for key in self.header())
 
 
+class HeadlessFuzzyAsteroidGame(HeadlessMixin, FuzzyAsteroidGame):
+    """
+    FuzzyAsteroidGame without a window, used by the worker processes of parallel runs
+    """
+    pass
+
+
+# Per process state of the parallel run workers, set up once by ``_init_worker()``
+_worker: Dict[str, Any] = {}
+
+
+def _init_worker(settings: Dict[str, Any], controller_timeout: bool, controllers: Dict[str, ControllerBase],
+                 portfolio: List[Scenario], score: Score) -> None:
+    _worker.update(game=ScenarioRunner.create_environment(settings, headless=True,
+                                                          controller_timeout=controller_timeout),
+                   controllers=controllers, portfolio=portfolio, score=score)
+
+
+def _run_job(job: Tuple[str, int]) -> Dict[str, Any]:
+    # Run one controller (by key) over one scenario (by portfolio index) in the environment of this worker
+    key, scenario_idx = job
+    score = copy.deepcopy(_worker["score"]) if _worker["score"] else None
+    return ScenarioRunner._run_one_scenario(_worker["game"], controller=_worker["controllers"][key],
+                                            scenario=_worker["portfolio"][scenario_idx], score=score).__dict__
+
+
 class ScenarioRunner:
     """
     `ScenarioRunner` is meant to be used to run all controllers through a specified portfolio
     against a common scoring function, and save the results
     """
-    def __init__(self, controller_build_fcns: Dict[str, Any] = None, portfolio: List[Scenario] = None):
-        # Portfolio to loop through
-        self.portfolio = portfolio
+    def __init__(self, controller_build_fcns: Dict[str, Any] = None, portfolio: List[Scenario] = None,
+                 cache: ResultCache = None):
+        # Portfolio to loop through, frozen so that each scenario's starting state is only generated once
+        self.portfolio = [scenario.freeze() for scenario in portfolio] if portfolio else portfolio
+
+        # Optional cache of the scores of headless games, consulted before playing them (see ``result_cache``)
+        self.cache = cache
 
         self.game = None
 
@@ -88,7 +121,21 @@ class ScenarioRunner:
         return {name: scores}
 
     def run_all_controllers(self, score: Score = None, graphics_on: bool = True,
-                            opt_settings: Dict = None) -> Dict[str, Dict]:
+                            opt_settings: Dict = None, processes: int = 1) -> Dict[str, Dict]:
+        """
+        Run every controller over the whole portfolio
+
+        :param score: Optional Score object (a fresh copy is used for each game in parallel runs)
+        :param graphics_on: Whether to show the games, must be False for parallel runs
+        :param opt_settings: Optional settings for the environment
+        :param processes: Number of worker processes, None for one per CPU. With more than one process the
+                          (controller, scenario) games are spread over a pool of headless environments
+        :return: Dictionary of controller name, to a dictionary of scenario name to score dictionary
+        """
+        if processes != 1:
+            return self.run_parallel(score=score, graphics_on=graphics_on, opt_settings=opt_settings,
+                                     processes=processes)
+
         all_data = {}
 
         # Run each controller over the whole portfolio
@@ -101,6 +148,50 @@ class ScenarioRunner:
             all_data.update(**data)
         return all_data
 
+    def run_parallel(self, score: Score = None, graphics_on: bool = False, opt_settings: Dict[str, Any] = None,
+                     processes: int = None, controller_timeout: bool = True) -> Dict[str, Dict]:
+        """
+        Run every controller over the whole portfolio, one game per job in a pool of worker processes
+
+        Each worker builds a headless environment once and reuses it for all of its jobs. The results are merged
+        in controller and then portfolio order, whichever job finishes first.
+
+        :param score: Optional Score object, each game gets a fresh copy
+        :param graphics_on: Must be False, the workers have no window
+        :param opt_settings: Optional settings for the environments
+        :param processes: Number of worker processes, None for one per CPU
+        :param controller_timeout: Whether controllers are timed out, turn off for results which do not depend on the
+                                   load of the machine
+        :return: Dictionary of controller name, to a dictionary of scenario name to score dictionary
+        """
+        if graphics_on:
+            raise ValueError("Parallel runs are headless, call them with graphics_on=False")
+
+        settings = dict(self.hidden_settings)
+        settings.update(opt_settings if opt_settings else {})
+
+        jobs = [(key, idx) for key in self.builder_fcns for idx in range(len(self.portfolio))]
+        cache_keys = [self.cache_key(self.builder_fcns[key], self.portfolio[idx], settings, controller_timeout, score)
+                      for key, idx in jobs] if self.cache is not None else [None] * len(jobs)
+        results = [self.cache.get(cache_key) if cache_key is not None else None for cache_key in cache_keys]
+
+        # Only the games which are not cached are played
+        missing = [job_idx for job_idx, data in enumerate(results) if data is None]
+        if missing:
+            with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker,
+                                     initargs=(settings, controller_timeout, self.builder_fcns, self.portfolio,
+                                               score)) as executor:
+                # map() hands back the results in job order
+                for job_idx, data in zip(missing, executor.map(_run_job, [jobs[job_idx] for job_idx in missing])):
+                    results[job_idx] = data
+                    if cache_keys[job_idx] is not None:
+                        self.cache.put(cache_keys[job_idx], data)
+
+        all_data = {}
+        for (key, idx), data in zip(jobs, results):
+            all_data.setdefault(self.builder_fcns[key].name, {})[self.portfolio[idx].name] = data
+        return all_data
+
     def run_one_controller(self, controller: ControllerBase, score: Score=None, graphics_on: bool = True,
                            opt_settings: Dict[str, Any] = None) -> Dict[str, Any]:
         settings = self.visible_settings if graphics_on else self.hidden_settings
@@ -109,41 +200,76 @@ class ScenarioRunner:
         # Create environment only if one has not been created already
         self.game = self.create_environment(settings) if not self.game else self.game
 
-        scores = self._run_all_scenarios(self.game, controller, self.portfolio, score)
+        # Games which are shown are always played
+        cache_keys = [self.cache_key(controller, scenario, settings, True, score) for scenario in self.portfolio] \
+            if self.cache is not None and not graphics_on else None
+
+        scores = self._run_all_scenarios(self.game, controller, self.portfolio, score, cache=self.cache,
+                                         cache_keys=cache_keys)
         return {controller.name: scores}
 
     @staticmethod
-    def create_environment(settings: Dict[str, Any], human_test: bool = False) -> AsteroidGame:
+    def cache_key(controller: ControllerBase, scenario: Scenario, settings: Dict[str, Any],
+                  controller_timeout: bool, score: Score = None) -> Optional[str]:
+        """
+        Key of the score of a controller in a scenario in the result cache, for an environment made by
+        ``create_environment()`` with the given settings. ``None`` for games which are not cached: unseeded
+        scenarios (their games are random) and controllers which cannot be fingerprinted
+        """
+        if scenario.seed is None:
+            return None
+        try:
+            controller = controller_fingerprint(controller)
+        except ValueError:
+            return None
+        return game_key(controller, scenario_fingerprint(scenario),
+                        simulation_settings(settings, controller_timeout=controller_timeout, ignore_exceptions=True),
+                        type(score) if score else CompetitionScore)
+
+    @staticmethod
+    def create_environment(settings: Dict[str, Any], human_test: bool = False, headless: bool = False,
+                           controller_timeout: bool = True) -> AsteroidGame:
         """
         Static function for creating an Environment, based on user input
         :param settings: Settings dictionary that is given directly to the environment
         :param human_test: Whether this environment is used for human performance evaluation
-        :return: game environment (one of `AsteroidGame`, `FuzzyAsteroidGame`)
+        :param headless: Whether to build the environment without a window (graphics must be off)
+        :param controller_timeout: Whether to timeout the controller if evaluation takes too long
+        :return: game environment (one of `AsteroidGame`, `FuzzyAsteroidGame`, `HeadlessFuzzyAsteroidGame`)
         """
         if human_test:
             return AsteroidGame(settings=settings)
         else:
-            return FuzzyAsteroidGame(settings=settings,
-                                     track_compute_cost=True,
-                                     ignore_exceptions=True,
-                                     controller_timeout=True)
+            game_class = HeadlessFuzzyAsteroidGame if headless else FuzzyAsteroidGame
+            return game_class(settings=settings,
+                              track_compute_cost=True,
+                              ignore_exceptions=True,
+                              controller_timeout=controller_timeout)
 
     @classmethod
     def _run_all_scenarios(cls, game: AsteroidGame, controller: ControllerBase,
-                           portfolio: List[Scenario], score: Score = None) -> Any:
+                           portfolio: List[Scenario], score: Score = None, cache: ResultCache = None,
+                           cache_keys: List[str] = None) -> Any:
         data = {}
 
         if not game.graphics_on:
             print(f"{controller.name} ", end="")
 
-        for scenario in portfolio:
-            score = cls._run_one_scenario(game, controller=controller, scenario=scenario, score=score)
+        for idx, scenario in enumerate(portfolio):
+            cache_key = cache_keys[idx] if cache_keys else None
+            cached = cache.get(cache_key) if cache_key is not None else None
+            if cached is None:
+                # Each game gets a fresh copy of the score, like in parallel runs
+                result = cls._run_one_scenario(game, controller=controller, scenario=scenario,
+                                               score=copy.deepcopy(score) if score else None)
+                if cache_key is not None:
+                    cache.put(cache_key, result.__dict__)
 
             # Print dots for monitoring evaluation in headless more
             if not game.graphics_on:
                 print(".", end="" if scenario is not portfolio[-1] else "\n")
 
-            data[scenario.name] = score.__dict__
+            data[scenario.name] = cached if cached is not None else result.__dict__
 
         return data
 
@@ -157,6 +283,8 @@ class ScenarioRunner:
         :param score: Score object
         :return: Score object result
         """
-        return game.run(controller=controller, scenario=scenario, score=score if score else CompetitionScore())
+        # A single controller plays both teams
+        controllers = controller if isinstance(controller, dict) or controller is None else {1: controller, 2: controller}
+        return game.run(controller=controllers, scenario=scenario, score=score if score else CompetitionScore())
 
 
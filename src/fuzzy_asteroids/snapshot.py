@@ -0,0 +1,186 @@
+"""
+Snapshots of the full state of a game, made with ``AsteroidGame.snapshot()`` and put back with
+``AsteroidGame.restore()``, to branch the simulation (lookahead, tree search) or to analyse a game from a given point
+
+A ``GameSnapshot`` is flat: the asteroids, bullets and ships are (entities, fields) float64 tables with the columns of
+the numpy engine (``ASTEROID_FIELDS``, ``BULLET_FIELDS`` and ``SHIP_FIELDS``), next to copies of the score counters
+and the state of the random number generator of the environment. With the numpy engine taking and restoring a
+snapshot copies a few arrays; the arcade engine builds the tables from its sprites and rebuilds its sprite lists from
+them (reusing the sprites of its pools). A restored game continues exactly as the original did from the snapshot.
+"""
+import numpy as np
+
+from typing import Any, Dict, Tuple
+
+from .engine import ASTEROID_FIELDS, BULLET_FIELDS, SHIP_FIELDS, geometry_id, get_geometry
+from .fuzzy_controller import SpaceShip
+from .settings import SCALE
+from .sprites import ShipSprite, ASTEROID_IMAGES, get_texture
+
+
+def copy_value(value: Any) -> Any:
+    """
+    Copy of a score attribute, with its lists and dictionaries copied at every level
+    """
+    if isinstance(value, list):
+        return [copy_value(item) for item in value]
+    elif isinstance(value, dict):
+        return type(value)((key, copy_value(item)) for key, item in value.items())
+    return value
+
+
+class GameSnapshot:
+    """
+    Full state of a game at the start of a frame
+    """
+    __slots__ = ("asteroids", "bullets", "ships", "ship_ranges", "fire_orders", "score", "rng_state", "game_over",
+                 "scenario", "stop_if_no_ammo")
+
+    def __init__(self, asteroids: np.ndarray, bullets: np.ndarray, ships: np.ndarray, ship_ranges: Tuple[Any, ...],
+                 fire_orders: Tuple[int, ...], score: Dict[str, Any], rng_state: Any, game_over: Any, scenario: Any,
+                 stop_if_no_ammo: bool):
+        """
+        :param asteroids: Table of the asteroids, with the ``ASTEROID_FIELDS`` columns
+        :param bullets: Table of the bullets, with the ``BULLET_FIELDS`` columns
+        :param ships: Table of the ships, with the ``SHIP_FIELDS`` columns
+        :param ship_ranges: (thrust range, turn rate range) of each ship of the table
+        :param fire_orders: Ids of the ships still ordered to fire by the last controller decision (see the
+            "action_repeat" setting)
+        :param score: Copy of the attributes of the score
+        :param rng_state: State of the random number generator of the environment
+        :param game_over: Stopping condition of the game
+        :param scenario: Scenario of the game
+        :param stop_if_no_ammo: Whether the game stops when the ships are out of bullets
+        """
+        self.asteroids = asteroids
+        self.bullets = bullets
+        self.ships = ships
+        self.ship_ranges = ship_ranges
+        self.fire_orders = fire_orders
+        self.score = score
+        self.rng_state = rng_state
+        self.game_over = game_over
+        self.scenario = scenario
+        self.stop_if_no_ammo = stop_if_no_ammo
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+
+    @property
+    def frame(self) -> int:
+        return self.score["frame_count"]
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Size of the entity tables in bytes
+        """
+        return self.asteroids.nbytes + self.bullets.nbytes + self.ships.nbytes
+
+
+def sprite_tables(game: Any) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Tuple[Any, ...]]:
+    """
+    Tables of the asteroids, bullets and ships of a game with the arcade engine, like ``ArrayEngine.snapshot()``
+    """
+    asteroids = np.empty((len(game.asteroid_list), len(ASTEROID_FIELDS)))
+    for idx, sprite in enumerate(game.asteroid_list):
+        geometry = geometry_id(sprite.texture, sprite.scale)
+        shape = get_geometry(geometry)
+        asteroids[idx] = (sprite.center_x, sprite.center_y, sprite.change_x, sprite.change_y, sprite.angle,
+                          sprite.change_angle, sprite.size, geometry, shape.width / 2.0, shape.height / 2.0,
+                          shape.bounding_radius, True)
+
+    bullets = np.empty((len(game.bullet_list), len(BULLET_FIELDS)))
+    for idx, sprite in enumerate(game.bullet_list):
+        bullets[idx] = (sprite.center_x, sprite.center_y, sprite.change_x, sprite.change_y, sprite.angle, sprite.team,
+                        True)
+
+    ships = np.empty((len(game.player_sprite_list), len(SHIP_FIELDS)))
+    for idx, sprite in enumerate(game.player_sprite_list):
+        ships[idx] = (sprite.center_x, sprite.center_y, sprite.change_x, sprite.change_y, sprite.angle, sprite.speed,
+                      sprite.thrust, sprite.turn_rate, sprite.max_speed, sprite.drag, sprite._respawning,
+                      sprite._respawn_time, sprite._fire_limiter, sprite._fire_time, sprite.lives,
+                      sprite.bullets_remaining, sprite.team, sprite.id, geometry_id(sprite.texture, sprite.scale),
+                      True)
+    ranges = tuple((sprite.thrust_range, sprite.turn_rate_range) for sprite in game.player_sprite_list)
+    return asteroids, bullets, ships, ranges
+
+
+# Image of each asteroid geometry, to give restored asteroid sprites their texture
+_asteroid_images: Dict[int, str] = dict()
+
+
+def _asteroid_image(geometry: int) -> str:
+    if not _asteroid_images:
+        for images in ASTEROID_IMAGES.values():
+            for image in images:
+                _asteroid_images[geometry_id(get_texture(image), SCALE * 1.5)] = image
+    return _asteroid_images[geometry]
+
+
+def restore_sprites(game: Any, snapshot: GameSnapshot) -> None:
+    """
+    Rebuild the sprite lists of a game with the arcade engine from the tables of a snapshot
+
+    Ship sprites which are still in the game are kept, the others are created again.
+    """
+    ship_sprites = {sprite.id: sprite for sprite in game.player_sprite_list}
+    game.clear_sprites()
+    frequency = game.frequency
+
+    for x, y, vx, vy, angle, spin, size, geometry, _, _, _, _ in snapshot.asteroids.tolist():
+        sprite = game.asteroid_pool.acquire(frequency, position=(x, y), speed=0.0, angle=0.0, size=int(size),
+                                            image=_asteroid_image(int(geometry)), spin=spin, rng=game.rng)
+        sprite.change_x, sprite.change_y, sprite.angle = vx, vy, angle
+        game.asteroid_list.append(sprite)
+
+    for x, y, vx, vy, angle, team, _ in snapshot.bullets.tolist():
+        sprite = game.bullet_pool.acquire(frequency=frequency, starting_angle=0.0, starting_position=(x, y),
+                                          team=int(team))
+        sprite.center_x, sprite.center_y = x, y
+        sprite.change_x, sprite.change_y, sprite.angle = vx, vy, angle
+        game.bullet_list.append(sprite)
+
+    for row, (thrust_range, turn_rate_range) in zip(snapshot.ships.tolist(), snapshot.ship_ranges):
+        (x, y, vx, vy, angle, speed, thrust, turn_rate, max_speed, drag, respawning, respawn_time, fire_limiter,
+         fire_time, lives, bullets_remaining, team, ship_id, _, alive) = row
+        if not alive:
+            continue
+
+        sprite = ship_sprites.get(int(ship_id))
+        if sprite is None:
+            sprite = ShipSprite(int(ship_id), frequency, int(bullets_remaining), (x, y), angle, int(lives), int(team))
+            sprite.bullet_pool = game.bullet_pool
+        sprite.center_x, sprite.center_y = x, y
+        sprite.change_x, sprite.change_y, sprite.angle = vx, vy, angle
+        sprite.speed, sprite.thrust, sprite.turn_rate = speed, thrust, turn_rate
+        sprite.max_speed, sprite.drag = max_speed, drag
+        sprite._respawning, sprite._respawn_time = respawning, respawn_time
+        sprite._fire_limiter, sprite._fire_time = fire_limiter, fire_time
+        sprite.lives, sprite.bullets_remaining = int(lives), int(bullets_remaining)
+        sprite.thrust_range, sprite.turn_rate_range = thrust_range, turn_rate_range
+        sprite.alpha = 255 * (1 - respawning / respawn_time) if respawning > 0 else 255
+        game.player_sprite_list.append(sprite)
+
+
+def fire_orders(game: Any) -> Tuple[int, ...]:
+    """
+    Ids of the ships whose last controller decision was to fire
+    """
+    return tuple(sprite.id for sprite in game.player_sprite_list
+                 if sprite.space_ship is not None and sprite.space_ship.fire_bullet)
+
+
+def restore_fire_orders(game: Any, ship_ids: Tuple[int, ...]) -> None:
+    """
+    Give the ships the fire orders of a snapshot (they keep firing on the frames the controllers are not called)
+    """
+    for sprite in game.player_sprite_list:
+        if sprite.space_ship is not None or sprite.id in ship_ids:
+            ship = SpaceShip.of(sprite)
+            if sprite.id in ship_ids:
+                ship.shoot()
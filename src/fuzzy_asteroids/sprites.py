@@ -8,14 +8,130 @@ from os.path import exists
 from .settings import *
 
 
+# Image lookup tables, shared with any other simulation backend which needs to pick the same textures
+BULLET_IMAGE = ":resources:images/space_shooter/laserBlue01.png"
+
+SHIP_IMAGES = {
+    1: ":resources:images/space_shooter/playerShip1_orange.png",
+    2: ":resources:images/space_shooter/playerShip1_green.png",
+    3: ":resources:images/space_shooter/playerShip2_orange.png"
+}
+
+ASTEROID_IMAGES = {
+    4: (":resources:images/space_shooter/meteorGrey_big1.png",
+        ":resources:images/space_shooter/meteorGrey_big2.png",
+        ":resources:images/space_shooter/meteorGrey_big3.png",
+        ":resources:images/space_shooter/meteorGrey_big4.png"),
+    3: (":resources:images/space_shooter/meteorGrey_med1.png",
+        ":resources:images/space_shooter/meteorGrey_med2.png"),
+    2: (":resources:images/space_shooter/meteorGrey_small1.png",
+        ":resources:images/space_shooter/meteorGrey_small2.png"),
+    1: (":resources:images/space_shooter/meteorGrey_tiny1.png",
+        ":resources:images/space_shooter/meteorGrey_tiny2.png")
+}
+
+
+# Process wide cache of the loaded textures, by image file
+_textures: Dict[str, arcade.Texture] = {}
+
+
+def get_texture(image: str) -> arcade.Texture:
+    """
+    Get the texture of an image file, loading it (and computing its hit box) the first time it is asked for
+
+    :param image: Image file (can be an arcade ``:resources:`` path)
+    :return: Shared arcade Texture
+    """
+    texture = _textures.get(image)
+    if texture is None:
+        texture = arcade.load_texture(image)
+
+        # The hit box points are computed lazily by arcade, do it once here for every sprite using the texture
+        texture.hit_box_points
+        _textures[image] = texture
+    return texture
+
+
+class SpritePool:
+    """
+    Recycling pool of dead sprites of one class, so that firing bullets and splitting asteroids reuse instances
+    instead of constructing new sprites
+
+    Sprites are released to the pool they were acquired from when they are removed from their sprite lists, but they
+    are only handed out again after ``recycle()`` is called (done by the game at the end of each frame). This way a
+    sprite removed during a frame can still be referenced safely until the frame is over.
+
+    Pools are not thread safe, each environment owns its own pools (see ``AsteroidGame``) so that environments can be
+    stepped from different threads.
+    """
+    def __init__(self, sprite_class: type, max_size: int = 1024):
+        """
+        :param sprite_class: Sprite class, which must have a ``reset()`` method taking its constructor arguments
+        :param max_size: Maximum number of dead sprites kept for reuse
+        """
+        self.sprite_class = sprite_class
+        self.max_size = max_size
+
+        self._free = []
+        self._released = []
+
+        # Counters to measure how effective the pool is
+        self.created = 0
+        self.reused = 0
+
+    def __len__(self) -> int:
+        return len(self._free)
+
+    def acquire(self, *args, **kwargs) -> arcade.Sprite:
+        """
+        Get a sprite, reusing a dead one if possible
+
+        :param args: Arguments of the sprite constructor
+        :param kwargs: Keyword arguments of the sprite constructor
+        """
+        if self._free:
+            sprite = self._free.pop()
+            sprite.reset(*args, **kwargs)
+            self.reused += 1
+        else:
+            sprite = self.sprite_class(*args, **kwargs)
+            self.created += 1
+
+        # The sprite goes back to this pool once it is removed from the game
+        sprite.pool = self
+        return sprite
+
+    def release(self, sprite: arcade.Sprite) -> None:
+        """
+        Give back a sprite which is no longer in use (it becomes available after the next ``recycle()``)
+        """
+        if len(self._free) + len(self._released) < self.max_size:
+            self._released.append(sprite)
+
+    def recycle(self) -> None:
+        """
+        Make the released sprites available for reuse
+        """
+        self._free.extend(self._released)
+        self._released.clear()
+
+    def clear(self) -> None:
+        self._free.clear()
+        self._released.clear()
+
+
 class BulletSprite(arcade.Sprite):
     """ Sprite that sets its angle to the direction it is traveling in. """
+    # Pool the bullet was acquired from (None for bullets constructed directly)
+    pool = None
+
     def __init__(self, frequency: float, starting_angle: float, starting_position: Tuple[float, float], team: int = 1):
         """ Set up a bullet sprite. """
 
-        self.team = team
         # Call the parent Sprite constructor
-        super().__init__(":resources:images/space_shooter/laserBlue01.png", SCALE)
+        texture = get_texture(BULLET_IMAGE)
+        super().__init__(texture=texture, scale=SCALE)
+        self.textures = [texture]
         # images = {
         #     1: ":resources:images/space_shooter/laserBlue01.png",
         #     2: ":resources:images/space_shooter/laserRed01.png"
@@ -30,6 +146,15 @@ class BulletSprite(arcade.Sprite):
         # Set GUID
         self.guid = "Bullet"
 
+        self.reset(frequency, starting_angle, starting_position, team)
+
+    def reset(self, frequency: float, starting_angle: float, starting_position: Tuple[float, float],
+              team: int = 1) -> None:
+        """
+        Set the bullet up from scratch, this takes the same arguments as the constructor (used by ``SpritePool``)
+        """
+        self.team = team
+
         # Bullet model
         self.frequency = frequency
         self.bullet_speed = 800
@@ -69,6 +194,13 @@ class BulletSprite(arcade.Sprite):
         elif self.center_y > SCREEN_HEIGHT + self.height:
             self.remove_from_sprite_lists()
 
+    def remove_from_sprite_lists(self) -> None:
+        # Once removed from the game, the bullet can be reused for the next one fired
+        if self.sprite_lists:
+            super().remove_from_sprite_lists()
+            if self.pool is not None:
+                self.pool.release(self)
+
 
 class ShipSprite(arcade.Sprite):
     """
@@ -90,20 +222,13 @@ class ShipSprite(arcade.Sprite):
 
         # print(exists(":resources:images/space_shooter/playerShip1_orange.png"))
 
-        images = {
-            1: ":resources:images/space_shooter/playerShip1_orange.png",
-            2: ":resources:images/space_shooter/playerShip1_green.png",
-            3: ":resources:images/space_shooter/playerShip2_orange.png"
-        }
-
         # Call Sprite constructor
         # super().__init__(random.choice(images[self.size]), scale=SCALE*1.5)
 
         # Call the parent Sprite constructor
-        if team and team in [1, 2]:
-            super().__init__(images[team+1], SCALE)
-        else:
-            super().__init__(images[1], SCALE)
+        texture = get_texture(SHIP_IMAGES[team+1] if team and team in [1, 2] else SHIP_IMAGES[1])
+        super().__init__(texture=texture, scale=SCALE)
+        self.textures = [texture]
 
         # super().__init__(":resources:images/space_shooter/playerShip1_orange.png", SCALE)
 
@@ -134,9 +259,15 @@ class ShipSprite(arcade.Sprite):
         self._fire_limiter = 0
         self._fire_time = 1 / 10    # seconds
 
+        # Pool the fired bullets are taken from, set by the environment the ship is in
+        self.bullet_pool = None
+
         # Track number of bullets remaining
         self.bullets_remaining = bullets_remaining
 
+        # SpaceShip handed to the controllers for this ship, reused every frame (see ``SpaceShip.of()``)
+        self.space_ship = None
+
         # Mark that we are respawning.
         self.respawn(position, angle)
 
@@ -217,9 +348,10 @@ class ShipSprite(arcade.Sprite):
         if self.bullets_remaining > 0:
             self.bullets_remaining -= 1
 
-        return BulletSprite(frequency=self.frequency,
-                            starting_angle=self.angle,
-                            starting_position=(self.center_x, self.center_y), team=self.team)
+        # Bullets come from the pool of the environment the ship is in, if it has one
+        new_bullet = self.bullet_pool.acquire if self.bullet_pool is not None else BulletSprite
+        return new_bullet(frequency=self.frequency, starting_angle=self.angle,
+                          starting_position=(self.center_x, self.center_y), team=self.team)
 
     def on_update(self, delta_time: float = 1/60):
         """
@@ -296,8 +428,12 @@ class ShipSprite(arcade.Sprite):
 
 class AsteroidSprite(arcade.Sprite):
     """ Sprite that represents an asteroid. """
+    # Pool the asteroid was acquired from (None for asteroids constructed directly)
+    pool = None
+
     def __init__(self, frequency: float, position: Tuple[float, float] = None,
-                 speed: float = None, angle: float = None, size: float = None):
+                 speed: float = None, angle: float = None, size: float = None,
+                 image: str = None, spin: float = None, rng: Any = None):
         """
         Constructor for Asteroid Sprite
 
@@ -306,6 +442,26 @@ class AsteroidSprite(arcade.Sprite):
         :param speed: Optional Starting Speed
         :param angle: Optional Starting heading angle (degrees)
         :param size: Optional Starting size (1 to 4 inclusive)
+        :param image: Optional image file (one of those for the size), picked at random by default
+        :param spin: Optional spin rate (degrees per frame), picked at random by default
+        :param rng: Random number generator to draw from (shared with the children), the ``random`` module by default
+        """
+        # Call Sprite constructor, the texture is picked in reset()
+        super().__init__(scale=SCALE*1.5)
+
+        # Set GUID
+        self.guid = "Asteroid"
+
+        self.reset(frequency, position, speed, angle, size, image, spin, rng)
+
+    def reset(self, frequency: float, position: Tuple[float, float] = None,
+              speed: float = None, angle: float = None, size: float = None,
+              image: str = None, spin: float = None, rng: Any = None) -> None:
+        """
+        Set the asteroid up from scratch, this takes the same arguments as the constructor (used by ``SpritePool``)
+
+        The image and spin rate are normally drawn at random, they can be given to rebuild an asteroid recorded by
+        ``starting_state`` without drawing any random numbers.
         """
         if size:
             if 1 <= size <= 4:
@@ -315,37 +471,30 @@ class AsteroidSprite(arcade.Sprite):
         else:
             self.size = 4
 
-        # Images dict for lookup/selection of sprite images
-        images = {
-            4: (":resources:images/space_shooter/meteorGrey_big1.png",
-                ":resources:images/space_shooter/meteorGrey_big2.png",
-                ":resources:images/space_shooter/meteorGrey_big3.png",
-                ":resources:images/space_shooter/meteorGrey_big4.png"),
-            3: (":resources:images/space_shooter/meteorGrey_med1.png",
-                ":resources:images/space_shooter/meteorGrey_med2.png"),
-            2: (":resources:images/space_shooter/meteorGrey_small1.png",
-                ":resources:images/space_shooter/meteorGrey_small2.png"),
-            1: (":resources:images/space_shooter/meteorGrey_tiny1.png",
-                ":resources:images/space_shooter/meteorGrey_tiny2.png")
-        }
+        # Pick one of the images for this size (the hit box and collision radius go with the texture)
+        # Random draws come from the generator of the environment this asteroid belongs to
+        self.rng = rng if rng is not None else random
 
-        # Call Sprite constructor
-        super().__init__(random.choice(images[self.size]), scale=SCALE*1.5)
-
-        # Set GUID
-        self.guid = "Asteroid"
+        image = image if image is not None else self.rng.choice(ASTEROID_IMAGES[self.size])
+        texture = get_texture(image)
+        if texture is not self.texture:
+            self.texture = texture
+            self.textures = [texture]
+            self.hit_box = texture.hit_box_points
+            self.collision_radius = None
+        self.angle = 0.0
 
         # Set random rotation angle for spinning
         self.frequency = frequency
-        self.change_angle = (random.random() - 0.5) * 120 / self.frequency
+        self.change_angle = spin if spin is not None else (self.rng.random() - 0.5) * 120 / self.frequency
 
         # Set initial speed based off of scaling factor
         speed_scaler = 2.0 + (4.0 - self.size) / 4.0
         self.max_speed = 60.0 * speed_scaler
 
         # Use options angle and speed arguments
-        starting_angle = angle if angle is not None else random.random()*360.0 - 180.0
-        starting_speed = speed if speed is not None else random.random()*self.max_speed - self.max_speed/2.0
+        starting_angle = angle if angle is not None else self.rng.random()*360.0 - 180.0
+        starting_speed = speed if speed is not None else self.rng.random()*self.max_speed - self.max_speed/2.0
 
         # Set constant starting velocity based on starting angle and speed
         self.change_x = -starting_speed * math.sin(math.radians(starting_angle)) / self.frequency
@@ -355,6 +504,8 @@ class AsteroidSprite(arcade.Sprite):
         # Otherwise use the position given
         self.center_x, self.center_y = position
 
+        self._start = (position, starting_speed, starting_angle, self.size, image, self.change_angle)
+
     @property
     def state(self) -> Dict[str, Tuple[float, float]]:
         return {
@@ -365,6 +516,13 @@ class AsteroidSprite(arcade.Sprite):
             "angle": float(self.angle)
         }
 
+    @property
+    def starting_state(self) -> Dict[str, Any]:
+        """
+        Keyword arguments which rebuild this asteroid as it was created, without drawing any random numbers
+        """
+        return dict(zip(("position", "speed", "angle", "size", "image", "spin"), self._start))
+
     @property
     def half_width(self) -> float:
         return self.width / 2.0
@@ -373,6 +531,24 @@ class AsteroidSprite(arcade.Sprite):
     def half_height(self) -> float:
         return self.height / 2.0
 
+    def split(self) -> List["AsteroidSprite"]:
+        """
+        Build the three child asteroids (one size smaller) which start from this asteroid's position, taken from the
+        pool this asteroid was acquired from
+
+        :return: List of child AsteroidSprites
+        """
+        new_asteroid = self.pool.acquire if self.pool is not None else AsteroidSprite
+        return [new_asteroid(frequency=self.frequency, position=self.position, size=self.size - 1, rng=self.rng)
+                for _ in range(3)]
+
+    def remove_from_sprite_lists(self) -> None:
+        # Once removed from the game, the asteroid can be reused for a split
+        if self.sprite_lists:
+            super().remove_from_sprite_lists()
+            if self.pool is not None:
+                self.pool.release(self)
+
     def on_update(self, delta_time: float = 1/60):
         """ Move the asteroid around. """
         # Call position update via parent
@@ -395,3 +571,4 @@ class AsteroidSprite(arcade.Sprite):
             self.center_y = BOTTOM_LIMIT - self.half_height
         elif self.center_y < BOTTOM_LIMIT - self.half_height:
             self.center_y = TOP_LIMIT + self.half_height
+
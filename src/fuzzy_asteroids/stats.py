@@ -0,0 +1,174 @@
+"""
+Bounded memory statistics of the controller evaluation times
+
+``FuzzyAsteroidGame`` feeds every controller call into an ``EvaluationStats`` per team, instead of keeping every
+sample, so the memory used (and the size of the ``Score``) does not grow with the length of the game. Quantiles come
+from a histogram with logarithmic bins, which puts them within about 6% of the exact value.
+"""
+import math
+
+from typing import Any, Dict, List
+
+
+class StreamingStats:
+    """
+    Count, mean, variance (Welford's algorithm), min, max and approximate quantiles of a stream of positive values
+
+    Values are also counted in a histogram of ``bins_per_decade`` logarithmic bins per decade between ``lowest`` and
+    ``highest``, values outside of this range go to the first or last bin.
+    """
+    def __init__(self, lowest: float = 1E-6, highest: float = 10.0, bins_per_decade: int = 20):
+        """
+        :param lowest: Lower edge of the first histogram bin
+        :param highest: Upper edge of the last histogram bin
+        :param bins_per_decade: Number of histogram bins per factor of 10
+        """
+        self.lowest = lowest
+        self.bins_per_decade = bins_per_decade
+        self.histogram = [0] * max(1, math.ceil(math.log10(highest / lowest) * bins_per_decade))
+
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def bin(self, value: float) -> int:
+        """
+        Index of the histogram bin of a value
+        """
+        if value <= self.lowest:
+            return 0
+        return min(int(math.log10(value / self.lowest) * self.bins_per_decade), len(self.histogram) - 1)
+
+    def edge(self, idx: int) -> float:
+        """
+        Lower edge of a histogram bin
+        """
+        return self.lowest * 10 ** (idx / self.bins_per_decade)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.histogram[self.bin(value)] += 1
+
+    def merge(self, other: "StreamingStats") -> None:
+        """
+        Add the values counted by another ``StreamingStats`` with the same bins
+        """
+        if len(other.histogram) != len(self.histogram) or other.lowest != self.lowest:
+            raise ValueError("Only statistics with the same histogram bins can be merged")
+        if not other.count:
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.mean += delta * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.histogram = [mine + theirs for mine, theirs in zip(self.histogram, other.histogram)]
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+
+    def quantile(self, q: float) -> float:
+        """
+        Approximate quantile, interpolated geometrically inside its histogram bin
+        """
+        if not self.count:
+            return 0.0
+
+        rank = q * self.count
+        seen = 0
+        for idx, count in enumerate(self.histogram):
+            if count and seen + count >= rank:
+                low, high = self.edge(idx), self.edge(idx + 1)
+                value = low * (high / low) ** ((rank - seen) / count)
+                return min(max(value, self.min), self.max)
+            seen += count
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Dictionary of the statistics, with 0.0 for the ones of an empty stream
+        """
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "variance": self.variance,
+            "std": self.std,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class EvaluationStats(StreamingStats):
+    """
+    Statistics of the evaluation times of a controller, with a compact histogram of the evaluation time against the
+    number of asteroids in the game
+    """
+    def __init__(self, asteroid_bin_width: int = 10, time_bins_per_decade: int = 4, **kwargs):
+        """
+        :param asteroid_bin_width: Number of asteroid counts per row of the asteroids histogram
+        :param time_bins_per_decade: Number of evaluation time bins per factor of 10 in the asteroids histogram
+        :param kwargs: Arguments of ``StreamingStats``
+        """
+        super().__init__(**kwargs)
+        self.asteroid_bin_width = asteroid_bin_width
+        # Only used for its (coarser) bins
+        self._time_bins = StreamingStats(lowest=self.lowest, highest=self.edge(len(self.histogram)),
+                                           bins_per_decade=time_bins_per_decade)
+
+        # Row of time bin counts per asteroid bin, only for the asteroid counts seen
+        self.asteroid_histogram: Dict[int, List[int]] = dict()
+
+    def add(self, value: float, num_asteroids: int = 0) -> None:
+        super().add(value)
+        asteroid_bin = num_asteroids // self.asteroid_bin_width
+        row = self.asteroid_histogram.get(asteroid_bin)
+        if row is None:
+            row = self.asteroid_histogram[asteroid_bin] = [0] * len(self._time_bins.histogram)
+        row[self._time_bins.bin(value)] += 1
+
+    def merge(self, other: "EvaluationStats") -> None:
+        super().merge(other)
+        for asteroid_bin, counts in other.asteroid_histogram.items():
+            row = self.asteroid_histogram.setdefault(asteroid_bin, [0] * len(counts))
+            self.asteroid_histogram[asteroid_bin] = [mine + theirs for mine, theirs in zip(row, counts)]
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Dictionary of the statistics, plus the evaluation time histogram per number of asteroids: the lower edges
+        of the "time_bins" (seconds), and the counts per time bin of each "asteroids" bin (keyed by its lowest count)
+        """
+        summary = super().summary()
+        summary["asteroids_histogram"] = {
+            "time_bins": [self._time_bins.edge(idx) for idx in range(len(self._time_bins.histogram))],
+            "asteroids": {str(asteroid_bin * self.asteroid_bin_width): list(counts)
+                          for asteroid_bin, counts in sorted(self.asteroid_histogram.items())},
+        }
+        return summary
+
+
+def combined(stats: List[EvaluationStats]) -> EvaluationStats:
+    """
+    Statistics of several streams (with the default bins) together
+    """
+    total = EvaluationStats()
+    for team_stats in stats:
+        total.merge(team_stats)
+    return total
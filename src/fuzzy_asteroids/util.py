@@ -12,7 +12,7 @@ python -m arcade.examples.asteroids
 import random
 from typing import Any, Dict, List, Tuple
 
-from .sprites import AsteroidSprite, ShipSprite
+from .sprites import AsteroidSprite, ShipSprite, SpritePool
 from .settings import SCREEN_WIDTH, SCREEN_HEIGHT
 
 
@@ -73,6 +73,7 @@ class Score:
         self.min_eval_time = [0, 0]
         self.max_eval_time = [0, 0]
         self.evaluation_times = [[], []]
+        self.team_evaluation_times = [[], []]
         self.num_asteroids = []
 
     def __repr__(self):
@@ -173,7 +174,7 @@ class Scenario:
         :param asteroid_states: Optional, Asteroid Starting states
         :param ship_states: Optional, Ship Starting states (list of dictionaries)
         :param game_map: Game Map using ``Map`` object
-        :param seed: Optional seeding value to pass to random.seed() which is called before asteroid creation
+        :param seed: Optional seeding value for the environment's random number generator, used before asteroid creation
         :param time_limit: Optional seeding value to pass to random.seed() which is called before asteroid creation
         :param ammo_limit_multiplier: Optional value for limiting the number of bullets each ship will have
         :param stop_if_no_ammo: Optional flag for stopping the scenario if all ships run out of ammo
@@ -248,7 +249,8 @@ class Scenario:
 
     @property
     def max_asteroids(self) -> int:
-        return sum([Scenario.count_asteroids(asteroid.size) for asteroid in self.asteroids(60)])
+        # Counted from the declared sizes, which does not need the asteroid sprites to be built
+        return sum([Scenario.count_asteroids(Scenario.starting_size(state)) for state in self.asteroid_states])
 
     @property
     def bullet_limit(self) -> int:
@@ -267,29 +269,57 @@ class Scenario:
         # Counting based off of each asteroid making 3 children when destroyed
         return sum([3 ** (size - 1) for size in range(1, asteroid_size + 1)])
 
-    def asteroids(self, frequency: float) -> List[AsteroidSprite]:
+    @staticmethod
+    def starting_size(asteroid_state: Dict[str, Any]) -> int:
+        """
+        Size of the asteroid built from a starting state, following the defaults of ``AsteroidSprite``
+
+        :param asteroid_state: Asteroid starting state (keyword arguments of ``AsteroidSprite``)
+        """
+        size = asteroid_state.get("size") if asteroid_state else None
+        if not size:
+            return 4
+        elif 1 <= size <= 4:
+            return size
+        else:
+            raise ValueError("AsteroidSize can only be between 1 and 4")
+
+    def freeze(self) -> "FrozenScenario":
+        """
+        Compiled, read-only copy of this scenario which caches its derived values and starting states
+
+        Use this when the same scenario is started many times (such as a portfolio run over several controllers)
+        """
+        return FrozenScenario(self)
+
+    def asteroids(self, frequency: float, rng: Any = None, pool: SpritePool = None) -> List[AsteroidSprite]:
         """
         Create asteroid sprites
         :param frequency: Operating frequency of the game
+        :param rng: Random number generator of the environment (seeded here if the scenario has a seed), defaults to
+                    the global ``random`` module
+        :param pool: Asteroid pool of the environment, the asteroids are constructed directly if not given
         :return: List of ShipSprites
         """
         asteroids = list()
+        rng = rng if rng is not None else random
+        new_asteroid = pool.acquire if pool is not None else AsteroidSprite
 
         # Seed the random number generator via an optionally defined user seed
         if self.seed is not None:
-            random.seed(self.seed)
+            rng.seed(self.seed)
 
-        # Loop through and create AsteroidSprites based on starting state
+        # Loop through and create AsteroidSprites based on starting state (reusing the asteroids of past games)
         for asteroid_state in self.asteroid_states:
             if asteroid_state:
-                asteroids.append(AsteroidSprite(frequency, **asteroid_state))
+                asteroids.append(new_asteroid(frequency, rng=rng, **asteroid_state))
             else:
                 asteroids.append(
-                    AsteroidSprite(frequency,
-                                   position=(
-                                       random.randrange(self.game_map.LEFT_LIMIT, self.game_map.RIGHT_LIMIT),
-                                       random.randrange(self.game_map.BOTTOM_LIMIT, self.game_map.TOP_LIMIT)),
-                                   ))
+                    new_asteroid(frequency,
+                                 position=(
+                                     rng.randrange(self.game_map.LEFT_LIMIT, self.game_map.RIGHT_LIMIT),
+                                     rng.randrange(self.game_map.BOTTOM_LIMIT, self.game_map.TOP_LIMIT)),
+                                 rng=rng))
 
         return asteroids
 
@@ -300,7 +330,71 @@ class Scenario:
         :return: List of ShipSprites
         """
         # Loop through and create ShipSprites based on starting state
-        return [ShipSprite(idx+1, frequency, self.bullet_limit, **ship_state) for idx, ship_state in enumerate(self.ship_states)]
+        bullet_limit = self.bullet_limit
+        return [ShipSprite(idx+1, frequency, bullet_limit, **ship_state) for idx, ship_state in enumerate(self.ship_states)]
+
+
+class FrozenScenario(Scenario):
+    """
+    Read-only form of a ``Scenario``, made with ``Scenario.freeze()``
+
+    The maximum asteroid count and bullet limit are computed once. The asteroids generated for each
+    (seed, frequency) pair are recorded along with the state of the random number generator after creating them,
+    so starting the scenario again rebuilds the same asteroids without drawing any random numbers and leaves the
+    generator where a fresh start would have. Only the seed can still be changed (see
+    ``AsteroidGame.enable_consistent_randomness()``), unseeded scenarios are generated anew every time.
+    """
+    _mutable = ("seed", "name", "_name")
+
+    def __init__(self, scenario: Scenario):
+        """
+        :param scenario: Scenario to freeze, its starting states are copied
+        """
+        state = dict(scenario.__dict__)
+        state["ship_states"] = tuple(dict(ship_state) for ship_state in scenario.ship_states)
+        state["asteroid_states"] = tuple(dict(asteroid_state) if asteroid_state else dict()
+                                         for asteroid_state in scenario.asteroid_states)
+        self.__dict__.update(state)
+
+        # Derived values, they only depend on frozen attributes
+        self.__dict__["_max_asteroids"] = super().max_asteroids
+        self.__dict__["_bullet_limit"] = super().bullet_limit
+
+        # Cache of generated asteroids, from (seed, frequency, generator) to (starting states, random state after creation)
+        self.__dict__["_starting_states"] = dict()
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        if key not in self._mutable:
+            raise AttributeError(f"Cannot set `{key}` of a FrozenScenario, change the original Scenario and freeze it again")
+        super().__setattr__(key, value)
+
+    def freeze(self) -> "FrozenScenario":
+        return self
+
+    @property
+    def max_asteroids(self) -> int:
+        return self._max_asteroids
+
+    @property
+    def bullet_limit(self) -> int:
+        return self._bullet_limit
+
+    def asteroids(self, frequency: float, rng: Any = None, pool: SpritePool = None) -> List[AsteroidSprite]:
+        if self.seed is None:
+            return super().asteroids(frequency, rng, pool)
+
+        # Generators of different types (or buffer sizes) draw different asteroids from the same seed
+        rng = rng if rng is not None else random
+        key = (self.seed, frequency, type(rng), getattr(rng, "buffer_size", None))
+        if key not in self._starting_states:
+            asteroids = super().asteroids(frequency, rng, pool)
+            self._starting_states[key] = (tuple(asteroid.starting_state for asteroid in asteroids), rng.getstate())
+            return asteroids
+
+        starting_states, random_state = self._starting_states[key]
+        rng.setstate(random_state)
+        new_asteroid = pool.acquire if pool is not None else AsteroidSprite
+        return [new_asteroid(frequency, rng=rng, **starting_state) for starting_state in starting_states]
 
 # def copy_sprites_to_asteroids_game():
 #
@@ -0,0 +1,199 @@
+"""
+Vectorized environment which advances several independent games in lockstep
+
+Every game is a ``HeadlessEnvironment`` running the numpy engine, whose asteroids, bullets and ships are stored in the
+rows of shared ``EntityBatch`` arrays, shaped (number of games, entities) and padded past the entity count of each
+game. The motion updates of all the games run as one vectorized pass over these arrays, while the collision checks
+and scoring (which resolve entities one by one, in list order) still run per game. Each game evolves exactly as it
+would in its own environment.
+"""
+import numpy as np
+
+from typing import Any, Dict, List, Tuple, Union
+
+from .fuzzy_asteroids import HeadlessEnvironment
+from .game import AsteroidGame, StoppingCondition
+from .engine import EntityBatch, ASTEROID_FIELDS, BULLET_FIELDS, SHIP_FIELDS, move_asteroids, move_bullets, move_ships
+from .util import Scenario, Score
+
+
+class VecEnv:
+    """
+    Batch of games controlled through arrays, one row per game
+
+    Actions and observations are dictionaries of (number of games, ships) or (number of games, entities) arrays,
+    observations come with a ``mask`` of the entries which hold an entity. When a game ends its ``Score`` is stored in
+    ``results`` and, with ``auto_reset``, the game restarts from its scenario on the same step.
+    """
+    # Fields of each entity type included in the observations
+    asteroid_fields = ("x", "y", "vx", "vy", "angle", "size")
+    bullet_fields = ("x", "y", "vx", "vy", "angle", "team")
+    ship_fields = ("x", "y", "vx", "vy", "angle", "speed", "respawning", "fire_limiter", "lives", "bullets_remaining",
+                   "team")
+
+    def __init__(self, scenarios: Union[Scenario, List[Scenario]], num_envs: int = None,
+                 settings: Dict[str, Any] = None, score_class: type = Score, auto_reset: bool = True):
+        """
+        :param scenarios: Scenario of each game, or one scenario which every game plays
+        :param num_envs: Number of games, required when a single scenario is given
+        :param settings: Settings of the game environments (the numpy engine is always used)
+        :param score_class: Class of the ``Score`` built for each game (constructed without arguments)
+        :param auto_reset: Whether games restart as soon as they are over
+        """
+        if isinstance(scenarios, Scenario):
+            scenarios = [scenarios] * (num_envs if num_envs else 1)
+        elif num_envs is not None and num_envs != len(scenarios):
+            raise ValueError(f"{len(scenarios)} scenarios were given for {num_envs} environments")
+
+        self.scenarios = list(scenarios)
+        self.num_envs = len(self.scenarios)
+        self.score_class = score_class
+        self.auto_reset = auto_reset
+
+        _settings = dict(settings) if settings else dict()
+        _settings.update({"engine": "numpy"})
+        self.envs = [HeadlessEnvironment(settings=_settings) for _ in range(self.num_envs)]
+        self.frequency = self.envs[0].frequency
+
+        # Entity storage shared by the engines of every game, one row per game
+        self.asteroids = EntityBatch(ASTEROID_FIELDS, self.num_envs)
+        self.bullets = EntityBatch(BULLET_FIELDS, self.num_envs)
+        self.ships = EntityBatch(SHIP_FIELDS, self.num_envs, capacity=8)
+        for idx, env in enumerate(self.envs):
+            env.engine.use_arrays(self.asteroids.rows[idx], self.bullets.rows[idx], self.ships.rows[idx])
+
+        # Scores of the games which ended, per game, and whether a game is over (without auto reset)
+        self.results: List[List[Score]] = [[] for _ in range(self.num_envs)]
+        self.finished = np.zeros(self.num_envs, dtype=bool)
+
+        # Control limits of each ship slot, filled in when a game starts
+        self._limits = {name: np.zeros((self.num_envs, self.ships.capacity, 2)) for name in ("thrust", "turn_rate")}
+
+        for idx in range(self.num_envs):
+            self.reset(idx)
+
+    @property
+    def scores(self) -> List[Score]:
+        """
+        Scores of the games in progress
+        """
+        return [env.score for env in self.envs]
+
+    def reset(self, idx: int, scenario: Scenario = None) -> None:
+        """
+        Start a new game in one of the environments
+
+        :param idx: Index of the game
+        :param scenario: Optional new scenario for this game
+        """
+        if scenario is not None:
+            self.scenarios[idx] = scenario
+
+        env = self.envs[idx]
+        AsteroidGame.start_new_game(env, scenario=self.scenarios[idx], score=self.score_class())
+        self.finished[idx] = False
+
+        # Ship slots can grow past the initial capacity with large scenarios
+        for name, limits in self._limits.items():
+            if limits.shape[1] < self.ships.capacity:
+                grown = np.zeros((self.num_envs, self.ships.capacity, 2))
+                grown[:, :limits.shape[1]] = limits
+                self._limits[name] = grown
+
+        for view in env.player_sprite_list.views:
+            self._limits["thrust"][idx, view._idx] = view.thrust_range
+            self._limits["turn_rate"][idx, view._idx] = view.turn_rate_range
+
+    def step(self, actions: Dict[str, np.ndarray] = None) -> Tuple[Dict[str, Dict[str, np.ndarray]], np.ndarray]:
+        """
+        Advance every game which is not over by one frame
+
+        :param actions: Optional dictionary of (number of games, ships) arrays, indexed by ship in scenario order.
+                        ``thrust`` and ``turn_rate`` are clipped to the ship limits and NaN leaves the previous value,
+                        ``fire_bullet`` is boolean. Ships which are out of the game are ignored.
+        :return: Tuple of the observation after the step, and the mask of the games which ended on this step
+        """
+        active = ~self.finished
+        if actions:
+            self._apply_actions(actions, active)
+
+        done = np.zeros(self.num_envs, dtype=bool)
+        for idx in np.flatnonzero(active).tolist():
+            env = self.envs[idx]
+            env.check_stopping_conditions()
+            done[idx] = env.game_over != StoppingCondition.none
+
+        running = active & ~done
+        if running.any():
+            self._move(running)
+
+        for idx in np.flatnonzero(active).tolist():
+            env = self.envs[idx]
+            if running[idx]:
+                env.resolve_collisions()
+            else:
+                env.final_update()
+                self.results[idx].append(env.score)
+                if self.auto_reset:
+                    self.reset(idx)
+                else:
+                    self.finished[idx] = True
+
+        return self.observe(), done
+
+    def _apply_actions(self, actions: Dict[str, np.ndarray], active: np.ndarray) -> None:
+        s = self.ships
+        controllable = s["alive"] & s.valid() & active[:, None]
+
+        for name, limits in self._limits.items():
+            if name in actions:
+                values = np.asarray(actions[name], dtype=np.float64)
+                width = values.shape[1]
+                given = controllable[:, :width] & ~np.isnan(values)
+                clipped = np.clip(values, limits[:, :width, 0], limits[:, :width, 1])
+                s[name][:, :width][given] = clipped[given]
+
+        # Bullets are appended to each game in ship order, like the controller of a single environment does
+        if "fire_bullet" in actions:
+            fire = np.asarray(actions["fire_bullet"], dtype=bool)
+            for idx, slot in np.argwhere(fire & controllable[:, :fire.shape[1]]).tolist():
+                env = self.envs[idx]
+                env.fire_bullet(env.player_sprite_list.views[slot])
+
+    def _move(self, running: np.ndarray) -> None:
+        # Asteroids move elementwise over the whole batch, the games which are not running are put back
+        stopped = np.flatnonzero(~running)
+        saved = {name: self.asteroids[name][stopped] for name in ASTEROID_FIELDS} if len(stopped) else None
+        move_asteroids(self.asteroids)
+        if saved:
+            for name, values in saved.items():
+                self.asteroids[name][stopped] = values
+
+        valid = self.bullets.valid() & running[:, None]
+        move_bullets(self.bullets, self.envs[0].engine._bullet_geometry, valid)
+        for idx in np.flatnonzero((valid & ~self.bullets["alive"]).any(axis=1)).tolist():
+            self.envs[idx].engine._compact(self.bullets.rows[idx])
+
+        moving = self.ships["alive"] & self.ships.valid() & running[:, None]
+        move_ships(self.ships, self.frequency, moving)
+        for idx, slot in np.argwhere(moving).tolist():
+            self.envs[idx].engine._wrap_ship(slot)
+
+    def observe(self) -> Dict[str, Dict[str, np.ndarray]]:
+        """
+        Padded arrays of the asteroids, bullets and ships of every game, with the ``mask`` of the filled entries
+
+        Arrays are copies trimmed to the largest entity count among the games
+        """
+        return {
+            "asteroids": self._observe(self.asteroids, self.asteroid_fields, self.asteroids.valid()),
+            "bullets": self._observe(self.bullets, self.bullet_fields, self.bullets.valid()),
+            "ships": self._observe(self.ships, self.ship_fields, self.ships.valid() & self.ships["alive"]),
+        }
+
+    @staticmethod
+    def _observe(batch: EntityBatch, fields: Tuple[str, ...], mask: np.ndarray) -> Dict[str, np.ndarray]:
+        width = int(batch.counts().max(initial=0))
+        observation = {name: batch[name][:, :width].copy() for name in fields}
+        observation["mask"] = mask[:, :width]
+        return observation
@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.fuzzy_asteroids.broadphase import SpatialHash
+
+
+class TestSpatialHash(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+
+        # Entities may sit past the map edges before they wrap around
+        self.x = rng.uniform(-60, 1060, 500)
+        self.y = rng.uniform(-60, 860, 500)
+        self.radius = rng.uniform(5, 50, 500)
+
+    def brute_force(self, x, y, radius, others_x, others_y, others_radius):
+        dist2 = (x[:, None] - others_x[None, :]) ** 2 + (y[:, None] - others_y[None, :]) ** 2
+        return np.nonzero(dist2 <= (radius[:, None] + others_radius[None, :]) ** 2)
+
+    def assertPairsEqual(self, pairs, expected):
+        self.assertEqual(pairs[0].tolist(), expected[0].tolist())
+        self.assertEqual(pairs[1].tolist(), expected[1].tolist())
+
+    def test_pairs_match_brute_force(self):
+        grid = SpatialHash()
+        grid.build(self.x, self.y, self.radius)
+
+        query_x, query_y, query_radius = self.x[:100] + 7, self.y[:100] - 3, np.full(100, 13.0)
+        self.assertPairsEqual(grid.pairs(query_x, query_y, query_radius),
+                              self.brute_force(query_x, query_y, query_radius, self.x, self.y, self.radius))
+
+    def test_large_query_radius(self):
+        grid = SpatialHash(cell_size=40)
+        grid.build(self.x, self.y, self.radius)
+        self.assertEqual(grid.query(500, 400, 300),
+                         self.brute_force(np.array([500.0]), np.array([400.0]), np.array([300.0]),
+                                          self.x, self.y, self.radius)[1].tolist())
+
+    def test_added_entities_are_indexed_after_built_ones(self):
+        grid = SpatialHash()
+        grid.build(self.x[:400], self.y[:400], self.radius[:400])
+        grid.add(self.x[400:], self.y[400:], self.radius[400:])
+
+        self.assertEqual(len(grid), 500)
+        self.assertPairsEqual(grid.pairs(self.x, self.y, 1.0),
+                              self.brute_force(self.x, self.y, np.ones(500), self.x, self.y, self.radius))
+
+    def test_empty(self):
+        grid = SpatialHash()
+        self.assertEqual(grid.query(10, 10, 5), [])
@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.fuzzy_asteroids.colliders import CircleCollider
+from src.fuzzy_asteroids.fuzzy_asteroids import HeadlessEnvironment, Scenario, StoppingCondition
+from .test_fuzzy_game import Shooter
+
+
+class TestCircleCollider(TestCase):
+    def test_overlaps(self):
+        hits = CircleCollider()._overlaps(np.array([0.0, 100.0]), np.array([0.0, 0.0]), 5.0,
+                                          np.array([8.0, 50.0, 104.0, 109.0]), np.array([0.0, 0.0, 3.0, 0.0]),
+                                          np.array([4.0, 1.0, 1.0, 4.0]))
+        # Touching circles (the last one) do not overlap
+        self.assertEqual(hits, {0: [0], 1: [2]})
+
+    def test_radii_grow_with_asteroid_size(self):
+        radii = CircleCollider().asteroid_radii[1:]
+        self.assertTrue(np.all(np.diff(radii) > 0))
+
+
+class TestCircleColliderGame(TestCase):
+    engines = ("arcade", "numpy")
+
+    def test_one_hit_per_bullet(self):
+        # A single bullet flies into two overlapping asteroids
+        scenario = Scenario(time_limit=3, ship_states=[{"position": (500, 100), "angle": 0}], asteroid_states=[
+            {"position": (495, 400), "speed": 0, "size": 2}, {"position": (505, 400), "speed": 0, "size": 2},
+            {"position": (100, 700), "speed": 0, "size": 1}])
+
+        for engine in self.engines:
+            env = HeadlessEnvironment(settings={"engine": engine, "collider": "circle", "prints": False})
+            env.reset(scenario=scenario)
+            _, counters, _ = env.step({1: {"fire_bullet": True}})
+            while not sum(counters["bullets_hit_asteroids"]):
+                _, counters, stopping_condition = env.step()
+                self.assertEqual(stopping_condition, StoppingCondition.none)
+
+            # Both asteroids are split by the bullet, which scores once
+            self.assertEqual((sum(env.score.bullets_fired), sum(env.score.bullets_hit_asteroids),
+                              sum(env.score.asteroids_hit)), (1, 1, 2))
+            self.assertEqual(len(env.asteroid_list), 1 + 2 * 3)
+            self.assertEqual(len(env.bullet_list), 0)
+
+    def test_engines_agree(self):
+        scenario = Scenario(num_asteroids=5, seed=1, time_limit=5, ship_states=[
+            {"position": (300, 400), "team": 1}, {"position": (700, 400), "team": 2}])
+
+        scores = [HeadlessEnvironment(settings={"engine": engine, "collider": "circle"}).run(
+            controller={1: Shooter(), 2: Shooter()}, scenario=scenario).__dict__ for engine in self.engines]
+        self.assertEqual(scores[0], scores[1])
+        self.assertGreater(sum(scores[0]["bullets_hit_asteroids"]), 0)
+        self.assertGreaterEqual(sum(scores[0]["asteroids_hit"]), sum(scores[0]["bullets_hit_asteroids"]))
@@ -0,0 +1,111 @@
+import threading
+import time
+from unittest import TestCase
+
+from src.fuzzy_asteroids.dispatch import DeadlineDispatcher
+from src.fuzzy_asteroids.fuzzy_controller import *
+from src.fuzzy_asteroids.fuzzy_asteroids import HeadlessEnvironment, Scenario
+
+from .test_fuzzy_game import Shooter
+
+
+class TestDeadlineDispatcher(TestCase):
+    def setUp(self):
+        self.dispatcher = DeadlineDispatcher()
+
+    def tearDown(self):
+        self.dispatcher.close()
+
+    def test_runs_on_one_thread_per_key(self):
+        threads = []
+        for key in (1, 2, 1, 2):
+            self.dispatcher.run(key, lambda: threads.append(threading.current_thread()), (), timeout=1.0)
+
+        self.assertIs(threads[0], threads[2])
+        self.assertIs(threads[1], threads[3])
+        self.assertIsNot(threads[0], threads[1])
+        self.assertIsNot(threads[0], threading.current_thread())
+
+    def test_exceptions_are_raised(self):
+        def fail():
+            raise KeyError("controller")
+
+        self.assertRaises(KeyError, self.dispatcher.run, 1, fail, (), 1.0)
+        self.dispatcher.run(1, lambda: None, (), timeout=1.0)
+
+    def test_late_call_keeps_worker_busy(self):
+        release = threading.Event()
+        calls = []
+
+        self.assertRaises(TimeoutError, self.dispatcher.run, 1, release.wait, (), 0.01)
+        self.assertTrue(self.dispatcher.busy(1))
+
+        # Later calls are dropped while the late one runs, other keys are not affected
+        self.assertRaises(TimeoutError, self.dispatcher.run, 1, calls.append, ("dropped",), 0.01)
+        self.dispatcher.run(2, calls.append, ("other",), timeout=1.0)
+
+        release.set()
+        while self.dispatcher.busy(1):
+            time.sleep(0.001)
+        self.dispatcher.run(1, calls.append, ("next",), timeout=1.0)
+        self.assertEqual(calls, ["other", "next"])
+
+
+class SlowShooter(Shooter):
+    def __init__(self):
+        self.calls = 0
+
+    def actions(self, ship: SpaceShip, input_data: Dict[str, Any]) -> None:
+        self.calls += 1
+        if self.calls == 5:
+            time.sleep(0.2)
+        super().actions(ship, input_data)
+
+
+class TestControllerTimeouts(TestCase):
+    scenario = Scenario(num_asteroids=5, seed=1, time_limit=1, ship_states=[
+        {"position": (300, 400), "team": 1}, {"position": (700, 400), "team": 2}])
+
+    def test_slow_frame_is_dropped(self):
+        slow = SlowShooter()
+        score = HeadlessEnvironment(track_compute_cost=True, controller_timeout=True).run(
+            controller={1: slow, 2: Shooter()}, scenario=self.scenario)
+
+        # The late call times out, and so do the frames which come while it is still running
+        self.assertGreaterEqual(score.timeouts[0], 1)
+        self.assertEqual(score.timeouts[1], 0)
+        self.assertEqual(slow.calls, score.frame_count + 1 - (score.timeouts[0] - 1))
+
+
+class MeetingShooter(Shooter):
+    """
+    Shooter which waits for the controller of the other team to be running at the same time
+    """
+    def __init__(self, barrier: threading.Barrier):
+        self.barrier = barrier
+
+    def actions(self, ship: SpaceShip, input_data: Dict[str, Any]) -> None:
+        self.barrier.wait(timeout=5)
+        super().actions(ship, input_data)
+
+
+class TestConcurrentTeams(TestCase):
+    scenario = Scenario(num_asteroids=5, seed=1, time_limit=1, ship_states=[
+        {"position": (300, 400), "team": 1}, {"position": (700, 400), "team": 2}])
+
+    def test_teams_run_at_once(self):
+        barrier = threading.Barrier(2)
+        game = HeadlessEnvironment(settings={"concurrent_teams": True}, track_compute_cost=True)
+        score = game.run(controller={1: MeetingShooter(barrier), 2: MeetingShooter(barrier)}, scenario=self.scenario)
+
+        self.assertEqual(score.exceptions, [0, 0])
+        self.assertEqual([stats["count"] for stats in score.evaluation_stats], [score.frame_count + 1] * 2)
+
+    def test_same_game_as_serial(self):
+        expected = HeadlessEnvironment().run(controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario).__dict__
+        for settings in ({"concurrent_teams": True}, {"concurrent_teams": True, "controller_isolation": "process"}):
+            game = HeadlessEnvironment(settings=settings)
+            score = game.run(controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario).__dict__
+            if game.isolation:
+                game.isolation.close()
+            self.assertEqual(score, expected)
@@ -0,0 +1,75 @@
+import random
+from unittest import TestCase
+
+import arcade
+
+from src.fuzzy_asteroids.engine import ArrayEngine, EntityArrays
+from src.fuzzy_asteroids.sprites import ShipSprite
+from src.fuzzy_asteroids.util import Scenario
+
+
+class TestEntityArrays(TestCase):
+    def test_append_grows_capacity(self):
+        arrays = EntityArrays({"x": float, "alive": bool}, capacity=2)
+        for idx in range(5):
+            arrays.append(x=idx, alive=True)
+        self.assertEqual(len(arrays), 5)
+        self.assertEqual(arrays["x"].tolist(), [0, 1, 2, 3, 4])
+
+    def test_keep_preserves_order(self):
+        arrays = EntityArrays({"x": float, "alive": bool})
+        for idx in range(5):
+            arrays.append(x=idx, alive=idx % 2 == 0)
+        arrays.keep(arrays["alive"])
+        self.assertEqual(arrays["x"].tolist(), [0, 2, 4])
+
+
+class TestArrayEngine(TestCase):
+    """
+    The engine must evolve identically to the arcade sprites it replaces
+    """
+    frequency = 30
+
+    def setUp(self):
+        scenario = Scenario(num_asteroids=10, seed=3, ship_states=[{"position": (400, 400), "team": 1}])
+        self.ships = scenario.ships(self.frequency)
+        self.asteroids = scenario.asteroids(self.frequency)
+
+        self.engine = ArrayEngine(self.frequency)
+        self.engine.load(self.ships, self.asteroids)
+
+    def test_asteroid_motion(self):
+        sprites = arcade.SpriteList()
+        sprites.extend(self.asteroids)
+
+        for _ in range(300):
+            sprites.on_update(1 / self.frequency)
+            self.engine.asteroid_list.on_update(1 / self.frequency)
+
+        self.assertEqual([sprite.state for sprite in sprites], [view.state for view in self.engine.asteroid_list])
+
+    def test_ship_motion(self):
+        sprite, view = self.ships[0], self.engine.player_sprite_list[0]
+
+        for frame in range(300):
+            sprite.thrust = view.thrust = 480.0 if frame < 150 else -200.0
+            sprite.turn_rate = view.turn_rate = 90.0
+            sprite.on_update(1 / self.frequency)
+            self.engine.player_sprite_list.on_update(1 / self.frequency)
+
+        self.assertEqual(sprite.state, view.state)
+
+    def test_fire_bullet(self):
+        sprite, view = self.ships[0], self.engine.player_sprite_list[0]
+        self.engine.bullet_list.append(view.fire_bullet())
+
+        self.assertEqual(sprite.fire_bullet().state, self.engine.bullet_list[0].state)
+        self.assertEqual(sprite.fire_wait_time, view.fire_wait_time)
+
+    def test_split_random_draws(self):
+        random.seed(0)
+        children = [sprite.state for sprite in self.asteroids[0].split()]
+
+        random.seed(0)
+        self.engine.asteroid_list.extend(self.engine.asteroid_list[0].split())
+        self.assertEqual(children, [view.state for view in self.engine.asteroid_list][-3:])
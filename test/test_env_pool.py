@@ -0,0 +1,81 @@
+import gc
+from collections import Counter
+from unittest import TestCase
+
+from src.fuzzy_asteroids.env_pool import EnvironmentPool
+from src.fuzzy_asteroids.fuzzy_asteroids import HeadlessEnvironment, FuzzyAsteroidGame, Scenario, StoppingCondition
+from .test_fuzzy_game import Shooter
+
+# Same actions as the Shooter controller
+ACTIONS = {1: {"turn_rate": 90.0, "fire_bullet": True}, 2: {"turn_rate": 90.0, "fire_bullet": True}}
+
+
+def object_counts():
+    gc.collect()
+    return Counter(type(obj).__name__ for obj in gc.get_objects())
+
+
+class TestEnvironmentPool(TestCase):
+    scenario = Scenario(num_asteroids=5, seed=1, time_limit=2, ship_states=[
+        {"position": (300, 400), "team": 1}, {"position": (700, 400), "team": 2}])
+
+    def test_matches_fresh_environment(self):
+        for engine in ("arcade", "numpy"):
+            expected = HeadlessEnvironment(settings={"engine": engine}).run(
+                controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario).__dict__
+
+            with EnvironmentPool(settings={"engine": engine, "prints": False}) as pool:
+                for _ in range(3):
+                    score = pool.run(controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario)
+                    self.assertEqual(score.__dict__, expected)
+                self.assertEqual((pool.created, pool.reused, len(pool), pool.in_use), (1, 2, 1, 0))
+
+    def test_acquire_release(self):
+        pool = EnvironmentPool(settings={"prints": False}, max_size=1)
+        first = pool.acquire(scenario=self.scenario)
+        second = pool.acquire(scenario=self.scenario)
+        self.assertIsNot(first, second)
+        self.assertEqual(pool.in_use, 2)
+        self.assertEqual(first.data["frame"], 0)
+
+        while first.step(ACTIONS)[2] == StoppingCondition.none:
+            pass
+        score = first.score
+        pool.release(first)
+        self.assertGreater(score.frame_count, 0)
+        self.assertIsNone(first.score)
+        self.assertEqual(len(first.asteroid_list), 0)
+
+        # Past the maximum size the released environments are closed
+        pool.release(second)
+        self.assertEqual(len(pool), 1)
+        self.assertFalse(second._finalizers[0].alive)
+        self.assertRaises(ValueError, pool.release, second)
+
+        with pool.environment(controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario) as env:
+            self.assertIs(env, first)
+            self.assertIsNotNone(env.controller)
+        self.assertIsNone(first.controller)
+
+        pool.close()
+        self.assertFalse(first._finalizers[0].alive)
+        self.assertRaises(RuntimeError, pool.acquire)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, EnvironmentPool, env_class=FuzzyAsteroidGame)
+        self.assertRaises(ValueError, EnvironmentPool, max_size=0)
+
+    def test_bounded_objects(self):
+        # Short version of benchmarks/bench_soak.py
+        for engine in ("arcade", "numpy"):
+            with EnvironmentPool(settings={"engine": engine, "prints": False}) as pool:
+                for _ in range(20):
+                    pool.run(controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario)
+                before = object_counts()
+                for _ in range(100):
+                    pool.run(controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario)
+                growth = object_counts() - before
+                asteroid_pool = pool._free[0].asteroid_pool
+
+            self.assertLess(sum(growth.values()), 100, growth.most_common(5))
+            self.assertLessEqual(len(asteroid_pool), asteroid_pool.max_size)
@@ -1,8 +1,277 @@
+import random
 from unittest import TestCase
 
+import arcade
+
 from src.fuzzy_asteroids.fuzzy_controller import *
-from src.fuzzy_asteroids.fuzzy_asteroids import FuzzyAsteroidGame, Scenario
+from src.fuzzy_asteroids.fuzzy_asteroids import FuzzyAsteroidGame, HeadlessEnvironment, Scenario, StoppingCondition
+
+
+class Shooter(ControllerBase):
+    @property
+    def name(self) -> str:
+        return "Shooter"
+
+    def actions(self, ship: SpaceShip, input_data: Dict[str, Any]) -> None:
+        ship.turn_rate = 90.0
+        ship.fire_bullet = True
 
 
 class TestFuzzyGame(TestCase):
     pass
+
+
+class TestHeadlessEnvironment(TestCase):
+    scenario = Scenario(num_asteroids=5, seed=1, time_limit=5, ship_states=[
+        {"position": (300, 400), "team": 1}, {"position": (700, 400), "team": 2}])
+
+    def test_no_window(self):
+        game = HeadlessEnvironment()
+        score = game.run(controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario)
+
+        self.assertEqual(score.stopping_condition, StoppingCondition.no_time)
+        self.assertEqual(game.data["map_dimensions"], (1000, 800))
+        self.assertIsNone(game.laser_sound)
+        self.assertRaises(RuntimeError, arcade.get_window)
+
+    def test_engines_agree(self):
+        scores = [HeadlessEnvironment(settings={"engine": engine}).run(
+            controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario).__dict__ for engine in ("arcade", "numpy")]
+        self.assertEqual(scores[0], scores[1])
+
+
+class GlobalRandomShooter(Shooter):
+    def actions(self, ship: SpaceShip, input_data: Dict[str, Any]) -> None:
+        # Draws from the global generator must not change the game
+        random.random()
+        super().actions(ship, input_data)
+
+
+class TestEnvironmentRandomness(TestCase):
+    scenario = Scenario(num_asteroids=5, seed=2, time_limit=5, ship_states=[
+        {"position": (300, 400), "team": 1}, {"position": (700, 400), "team": 2}])
+
+    def test_interleaved_matches_serial(self):
+        serial = HeadlessEnvironment().run(controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario).__dict__
+
+        games = [HeadlessEnvironment(settings={"engine": engine}) for engine in ("arcade", "numpy")]
+        for game in games:
+            game.start_new_game(controller={1: GlobalRandomShooter(), 2: GlobalRandomShooter()}, scenario=self.scenario)
+
+        # Step the games in lockstep, each one drawing from its own generator
+        while any(game.game_over == StoppingCondition.none for game in games):
+            for game in games:
+                if game.game_over == StoppingCondition.none:
+                    game.on_update(1 / game.frequency)
+
+        for game in games:
+            self.assertEqual(game.score.__dict__, serial)
+
+    def test_buffered_engines_agree(self):
+        scores = [HeadlessEnvironment(settings={"engine": engine, "random_buffer_size": 64}).run(
+            controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario).__dict__ for engine in ("arcade", "numpy")]
+        self.assertEqual(scores[0], scores[1])
+
+
+class Recorder(Shooter):
+    def __init__(self):
+        self.inputs = []
+
+    def actions(self, ship: SpaceShip, input_data: Dict[str, Any]) -> None:
+        self.inputs.append((input_data["frame"], input_data))
+        super().actions(ship, input_data)
+
+
+class TestDataSnapshot(TestCase):
+    scenario = Scenario(num_asteroids=5, seed=1, time_limit=1, ship_states=[
+        {"position": (300, 400), "team": 1}, {"position": (500, 400), "team": 1}, {"position": (700, 400), "team": 2}])
+
+    def test_shared_per_frame(self):
+        controller = Recorder()
+        HeadlessEnvironment().run(controller={1: controller, 2: controller}, scenario=self.scenario)
+
+        # Every ship gets the same snapshot within a frame, and a new one on the next frame
+        snapshots = {}
+        for frame, snapshot in controller.inputs:
+            self.assertIs(snapshots.setdefault(frame, snapshot), snapshot)
+        self.assertGreater(len(controller.inputs), len(snapshots))
+        self.assertEqual(len(set(map(id, snapshots.values()))), len(snapshots))
+
+    def test_read_only(self):
+        game = HeadlessEnvironment()
+        game.start_new_game(controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario)
+        with self.assertRaises(TypeError):
+            game.data["asteroids"][0]["size"] = 1
+
+        before = game.data
+        self.assertIs(game.data, before)
+        game.on_update(1 / game.frequency)
+        self.assertIsNot(game.data, before)
+        self.assertEqual(game.data["frame"], before["frame"] + 1)
+
+
+class BatchShooter(Shooter):
+    def __init__(self):
+        self.calls = []
+
+    def actions(self, ship: SpaceShip, input_data: Dict[str, Any]) -> None:
+        raise AssertionError("actions() must not be called when actions_batch() is defined")
+
+    def actions_batch(self, ships: List[SpaceShip], input_data: Dict[str, Any]) -> None:
+        self.calls.append([ship.id for ship in ships])
+        for ship in ships:
+            Shooter.actions(self, ship, input_data)
+
+
+class TestActionsBatch(TestCase):
+    scenario = Scenario(num_asteroids=5, seed=1, time_limit=1, ship_states=[
+        {"position": (300, 400), "team": 1}, {"position": (500, 400), "team": 2}, {"position": (700, 400), "team": 1}])
+
+    def test_one_call_per_team(self):
+        for timeout in (False, True):
+            batched, per_ship = BatchShooter(), Recorder()
+            game = HeadlessEnvironment(track_compute_cost=True, controller_timeout=timeout)
+            score = game.run(controller={1: batched, 2: per_ship}, scenario=self.scenario)
+
+            # Team 1 ships share one call (and one evaluation time) per frame, team 2 is called per ship
+            self.assertEqual(batched.calls[0], [1, 3])
+            self.assertEqual(len(batched.calls), len(per_ship.inputs))
+            self.assertEqual([stats["count"] for stats in score.evaluation_stats],
+                             [len(batched.calls), len(per_ship.inputs)])
+
+    def test_same_game_as_per_ship(self):
+        scores = [HeadlessEnvironment(controller_timeout=False).run(
+            controller={1: controller, 2: Shooter()}, scenario=self.scenario).__dict__
+            for controller in (BatchShooter(), Shooter())]
+        scores[0].pop("evaluation_times")
+        scores[1].pop("evaluation_times")
+        self.assertEqual(scores[0], scores[1])
+
+
+class ShipCollector(Shooter):
+    def __init__(self):
+        self.ships = []
+
+    def actions(self, ship: SpaceShip, input_data: Dict[str, Any]) -> None:
+        self.ships.append((ship, ship.turn_rate, ship.angle))
+        super().actions(ship, input_data)
+
+
+class TestSpaceShip(TestCase):
+    scenario = Scenario(num_asteroids=5, seed=1, time_limit=1, ship_states=[
+        {"position": (300, 400), "team": 1}, {"position": (700, 400), "team": 2}])
+
+    def test_reused_and_refreshed(self):
+        for engine in ("arcade", "numpy"):
+            collector = ShipCollector()
+            HeadlessEnvironment(settings={"engine": engine}).run(controller={1: collector, 2: Shooter()},
+                                                                 scenario=self.scenario)
+
+            # One object per ship, with its outputs cleared and its state updated every frame
+            self.assertEqual(len({id(ship) for ship, _, _ in collector.ships}), 1)
+            self.assertTrue(all(turn_rate is None for _, turn_rate, _ in collector.ships))
+            self.assertNotEqual(collector.ships[0][2], collector.ships[-1][2])
+
+    def test_clamping(self):
+        game = HeadlessEnvironment()
+        game.start_new_game(controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario)
+        ship = SpaceShip.of(game.player_sprite_list[0])
+
+        ship.thrust = 1E6
+        ship.turn_rate = -1E6
+        self.assertEqual((ship.thrust, ship.turn_rate), (ship.output_space["thrust"][1],
+                                                         ship.output_space["turn_rate"][0]))
+        with self.assertRaises(ValueError):
+            ship.thrust = float("nan")
+        with self.assertRaises(AttributeError):
+            ship.extra = 1
+
+
+class TestActionRepeat(TestCase):
+    scenario = Scenario(num_asteroids=5, seed=1, time_limit=2, ship_states=[
+        {"position": (300, 400), "team": 1}, {"position": (700, 400), "team": 2}])
+
+    def test_decisions_are_held(self):
+        expected = HeadlessEnvironment().run(controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario).__dict__
+
+        # Shooter makes the same decision every frame, so holding it gives the same game
+        recorder = Recorder()
+        score = HeadlessEnvironment(settings={"action_repeat": 4}).run(controller={1: recorder, 2: Shooter()},
+                                                                       scenario=self.scenario)
+        self.assertEqual(score.__dict__, expected)
+        self.assertEqual([frame for frame, _ in recorder.inputs], list(range(0, score.frame_count + 1, 4)))
+
+    def test_invalid(self):
+        for repeat in (0, 1.5):
+            self.assertRaises(ValueError, HeadlessEnvironment, settings={"action_repeat": repeat})
+
+
+class TestStepReset(TestCase):
+    scenario = Scenario(num_asteroids=5, seed=1, time_limit=3, ship_states=[
+        {"position": (300, 400), "team": 1}, {"position": (700, 400), "team": 2}])
+
+    # Same actions as the Shooter controller
+    actions = {1: {"turn_rate": 90.0, "fire_bullet": True}, 2: {"turn_rate": 90.0, "fire_bullet": True}}
+
+    def play(self, game, **kwargs):
+        observation = game.reset(**kwargs)
+        self.assertEqual(observation["frame"], 0)
+
+        totals, steps, stopping_condition = None, 0, StoppingCondition.none
+        while stopping_condition == StoppingCondition.none:
+            observation, deltas, stopping_condition = game.step(None if "controller" in kwargs else self.actions)
+            totals = deltas if totals is None else {
+                name: [a + b for a, b in zip(total, deltas[name])] if isinstance(total, list) else total + deltas[name]
+                for name, total in totals.items()}
+            steps += 1
+        return totals, steps
+
+    def test_matches_run(self):
+        for engine in ("arcade", "numpy"):
+            expected = HeadlessEnvironment(settings={"engine": engine}).run(
+                controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario).__dict__
+
+            game = HeadlessEnvironment(settings={"engine": engine})
+            for kwargs in ({}, {"controller": {1: Shooter(), 2: Shooter()}}):
+                totals, steps = self.play(game, scenario=self.scenario, **kwargs)
+                self.assertEqual(game.score.__dict__, expected)
+                self.assertEqual(steps, game.score.frame_count + 1)
+
+                # The deltas of the steps add up to the final score
+                for name, total in totals.items():
+                    self.assertEqual(total, getattr(game.score, name))
+
+    def test_reset_in_place(self):
+        game = HeadlessEnvironment()
+        self.play(game, scenario=self.scenario)
+        first = game.score.__dict__
+        lists = (game.player_sprite_list, game.asteroid_list, game.bullet_list)
+
+        # The next game (with the scenario and seed of the last one) reuses the sprite lists
+        self.play(game, seed=1)
+        self.assertEqual(game.score.__dict__, first)
+        for old, new in zip(lists, (game.player_sprite_list, game.asteroid_list, game.bullet_list)):
+            self.assertIs(old, new)
+
+    def test_action_repeat(self):
+        game = HeadlessEnvironment(settings={"action_repeat": 4})
+        totals, steps = self.play(game, scenario=self.scenario)
+
+        # Shooter makes the same decision every frame, so holding it gives the same game
+        expected = HeadlessEnvironment().run(controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario)
+        self.assertEqual(game.score.__dict__, expected.__dict__)
+        self.assertEqual(steps, game.score.frame_count // 4 + 1)
+
+    def test_invalid(self):
+        game = HeadlessEnvironment()
+        self.assertRaises(RuntimeError, game.step, self.actions)
+
+        game.reset(scenario=self.scenario)
+        self.assertRaises(ValueError, game.step, {1: {"speed": 10}})
+
+        game.reset(scenario=self.scenario, controller={1: Shooter(), 2: Shooter()})
+        self.assertRaises(ValueError, game.step, self.actions)
+
+        while game.step()[2] == StoppingCondition.none:
+            pass
+        self.assertRaises(RuntimeError, game.step)
@@ -0,0 +1,176 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.fuzzy_asteroids.fuzzy_inference import (FuzzyVariable, Rule, MamdaniSystem, SugenoSystem, LookupTable,
+                                                 TriangularMF, TrapezoidalMF, GaussianMF)
+
+
+def variables():
+    distance = FuzzyVariable("distance", 0, 1000, {"near": TrapezoidalMF(0, 0, 100, 400),
+                                                   "mid": TriangularMF(100, 400, 700),
+                                                   "far": TrapezoidalMF(400, 700, 1000, 1000)})
+    angle = FuzzyVariable("angle", -180, 180, {"left": TriangularMF(-180, -180, 0),
+                                               "ahead": GaussianMF(0, 30),
+                                               "right": TriangularMF(0, 180, 180)})
+    turn = FuzzyVariable("turn", -180, 180, {"left": TriangularMF(-180, -90, 0),
+                                             "none": TriangularMF(-45, 0, 45),
+                                             "right": TriangularMF(0, 90, 180)})
+    thrust = FuzzyVariable("thrust", -480, 480, {"back": TriangularMF(-480, -480, 0),
+                                                 "forward": TriangularMF(0, 480, 480)})
+    return distance, angle, turn, thrust
+
+
+RULES = [
+    Rule({"angle": "left"}, {"turn": "left"}),
+    Rule({"angle": "right"}, {"turn": "right"}),
+    Rule({"angle": "ahead", "distance": "not near"}, {"turn": "none", "thrust": "forward"}),
+    Rule({"distance": "near", "angle": "ahead"}, {"thrust": "back"}, connective="or", weight=0.5),
+]
+
+
+def reference_mamdani(distance, angle, turn, thrust, x_distance, x_angle):
+    # Plain Python inference of one pair of inputs
+    inputs = {"distance": distance.memberships(x_distance), "angle": angle.memberships(x_angle)}
+    outputs = dict()
+    for variable in (turn, thrust):
+        universe = variable.universe
+        aggregated = np.zeros(len(universe))
+        for rule in RULES:
+            if variable.name not in rule.consequents:
+                continue
+            memberships = []
+            for name, term in rule.antecedents.items():
+                if term.startswith("not "):
+                    memberships.append(1 - float(inputs[name][term[4:]]))
+                else:
+                    memberships.append(float(inputs[name][term]))
+            strength = (min(memberships) if rule.connective == "and" else max(memberships)) * rule.weight
+            term = variable.terms[rule.consequents[variable.name]](universe)
+            aggregated = np.maximum(aggregated, np.minimum(strength, term))
+        outputs[variable.name] = (aggregated @ universe / aggregated.sum() if aggregated.sum() > 0
+                                  else variable.default)
+    return outputs
+
+
+class TestMembershipFunctions(TestCase):
+    def test_shapes(self):
+        x = np.array([-1.0, 0.0, 0.5, 1.0, 1.5, 2.0, 3.0])
+        self.assertEqual(TriangularMF(0, 1, 2)(x).tolist(), [0, 0, 0.5, 1, 0.5, 0, 0])
+        self.assertEqual(TrapezoidalMF(0, 0.5, 1.5, 2)(x).tolist(), [0, 0, 1, 1, 1, 0, 0])
+
+        # Shoulders stay at 1 past the edge
+        self.assertEqual(TriangularMF(0, 0, 2)(x).tolist(), [1, 1, 0.75, 0.5, 0.25, 0, 0])
+        self.assertEqual(TrapezoidalMF(1, 2, 3, 3)(x).tolist(), [0, 0, 0, 0, 0.5, 1, 1])
+        self.assertAlmostEqual(float(GaussianMF(1, 0.5)(np.array(1.5))), np.exp(-0.5))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            TriangularMF(1, 0, 2)
+        with self.assertRaises(ValueError):
+            GaussianMF(0, 0)
+
+
+class TestMamdaniSystem(TestCase):
+    def setUp(self):
+        self.distance, self.angle, self.turn, self.thrust = variables()
+        self.system = MamdaniSystem([self.distance, self.angle], [self.turn, self.thrust], RULES)
+
+        rng = np.random.default_rng(1)
+        self.x_distance = rng.uniform(-100, 1100, 200)
+        self.x_angle = rng.uniform(-180, 180, 200)
+
+    def test_matches_reference(self):
+        outputs = self.system.evaluate({"distance": self.x_distance, "angle": self.x_angle})
+        for idx in range(len(self.x_distance)):
+            expected = reference_mamdani(self.distance, self.angle, self.turn, self.thrust,
+                                         self.x_distance[idx], self.x_angle[idx])
+            self.assertAlmostEqual(outputs["turn"][idx], expected["turn"])
+            self.assertAlmostEqual(outputs["thrust"][idx], expected["thrust"])
+
+    def test_broadcasting(self):
+        outputs = self.system(distance=self.x_distance, angle=0.0)
+        self.assertEqual(outputs["turn"].shape, self.x_distance.shape)
+
+        scalar = self.system(distance=self.x_distance[3], angle=0.0)
+        self.assertEqual(scalar["thrust"].shape, ())
+        self.assertAlmostEqual(float(scalar["thrust"]), outputs["thrust"][3])
+
+    def test_no_rule_fires(self):
+        rules = [Rule({"distance": "near"}, {"thrust": "back"})]
+        system = MamdaniSystem([self.distance], [self.thrust], rules)
+        self.assertEqual(float(system(distance=900)["thrust"]), self.thrust.default)
+
+    def test_weighted_average(self):
+        system = MamdaniSystem([self.distance, self.angle], [self.turn, self.thrust], RULES,
+                               defuzzification="weighted_average")
+        outputs = system(distance=self.x_distance, angle=self.x_angle)
+
+        # Symmetric terms, so the output is between the centroids of the terms
+        self.assertTrue(np.all(np.abs(outputs["turn"]) <= 90 + 1E-9))
+        self.assertTrue(np.all(np.sign(outputs["turn"]) == np.sign(self.x_angle)))
+
+    def test_unknown_terms(self):
+        with self.assertRaises(ValueError):
+            MamdaniSystem([self.distance], [self.thrust], [Rule({"distance": "close"}, {"thrust": "back"})])
+        with self.assertRaises(ValueError):
+            MamdaniSystem([self.distance], [self.thrust], [Rule({"distance": "near"}, {"thrust": "reverse"})])
+        with self.assertRaises(ValueError):
+            MamdaniSystem([self.distance], [self.thrust], [Rule({"distance": "near"}, {"turn": "left"})])
+        with self.assertRaises(ValueError):
+            self.system.evaluate({"distance": 10})
+
+
+class TestSugenoSystem(TestCase):
+    def test_weighted_average(self):
+        distance, angle, _, _ = variables()
+        rules = [Rule({"angle": "left"}, {"turn": -90}),
+                 Rule({"angle": "right"}, {"turn": 90}),
+                 # Linear consequent: 0 * distance + 0.5 * angle + 0
+                 Rule({"angle": "ahead"}, {"turn": (0, 0.5, 0)}),
+                 Rule({"distance": "near", "angle": "ahead"}, {"thrust": -100})]
+        system = SugenoSystem([distance, angle], ["turn", "thrust"], rules, and_operator="product")
+
+        x_distance, x_angle = np.array([50.0, 500.0, 900.0]), np.array([-10.0, 20.0, 170.0])
+        outputs = system(distance=x_distance, angle=x_angle)
+
+        left, ahead, right = (angle.terms[term](x_angle) for term in ("left", "ahead", "right"))
+        expected = (-90 * left + 90 * right + 0.5 * x_angle * ahead) / (left + right + ahead)
+        np.testing.assert_allclose(outputs["turn"], expected)
+
+        # Only the near asteroid fires the thrust rule, the others get the default
+        np.testing.assert_allclose(outputs["thrust"], [-100, 0, 0])
+
+    def test_coefficients(self):
+        distance, angle, _, _ = variables()
+        with self.assertRaises(ValueError):
+            SugenoSystem([distance, angle], ["turn"], [Rule({"angle": "left"}, {"turn": (1, 2)})])
+
+
+class TestLookupTable(TestCase):
+    def test_interpolates_system(self):
+        distance, angle, turn, thrust = variables()
+        system = MamdaniSystem([distance, angle], [turn, thrust], RULES)
+        table = system.lookup(resolution=(201, 361))
+        self.assertIsInstance(table, LookupTable)
+
+        # Exact on the grid points
+        grid = {"distance": np.array([0.0, 500.0, 1000.0]), "angle": np.array([-180.0, 0.0, 45.0])}
+        for name, values in table(**grid).items():
+            np.testing.assert_allclose(values, system.evaluate(grid)[name], atol=1E-9)
+
+        rng = np.random.default_rng(2)
+        inputs = {"distance": rng.uniform(0, 1000, 500), "angle": rng.uniform(-180, 180, 500)}
+        exact, interpolated = system.evaluate(inputs), table.evaluate(inputs)
+        # Except for the few inputs where the output jumps between two grid points (the rules barely fire there)
+        for name in ("turn", "thrust"):
+            error = np.abs(interpolated[name] - exact[name])
+            self.assertLess(np.percentile(error, 99), 2.0)
+            self.assertLess(error.mean(), 1.0)
+
+    def test_clamps_inputs(self):
+        distance, _, _, thrust = variables()
+        system = MamdaniSystem([distance], [thrust], [Rule({"distance": "near"}, {"thrust": "back"}),
+                                                      Rule({"distance": "far"}, {"thrust": "forward"})])
+        table = system.lookup(11)
+        np.testing.assert_allclose(table(distance=[-50, 5000])["thrust"], table(distance=[0, 1000])["thrust"])
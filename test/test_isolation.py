@@ -0,0 +1,64 @@
+import os
+from unittest import TestCase
+
+from src.fuzzy_asteroids.fuzzy_controller import *
+from src.fuzzy_asteroids.fuzzy_asteroids import HeadlessEnvironment, Scenario, StoppingCondition
+
+from .test_fuzzy_game import Shooter, BatchShooter
+
+
+class FailingShooter(Shooter):
+    def __init__(self, frame: int, failure: str):
+        self.frame = frame
+        self.failure = failure
+
+    def actions(self, ship: SpaceShip, input_data: Dict[str, Any]) -> None:
+        if input_data["frame"] == self.frame:
+            if self.failure == "loop":
+                while True:
+                    pass
+            elif self.failure == "crash":
+                os._exit(1)
+            else:
+                raise ValueError("controller error")
+        super().actions(ship, input_data)
+
+
+class TestProcessIsolation(TestCase):
+    scenario = Scenario(num_asteroids=5, seed=1, time_limit=2, ship_states=[
+        {"position": (300, 400), "team": 1}, {"position": (700, 400), "team": 2}])
+
+    def run_game(self, controller: Dict[int, ControllerBase], **kwargs) -> Tuple[HeadlessEnvironment, Dict[str, Any]]:
+        game = HeadlessEnvironment(settings={"controller_isolation": "process"}, **kwargs)
+        score = game.run(controller=controller, scenario=self.scenario)
+        self.addCleanup(game.isolation.close)
+        return game, score.__dict__
+
+    def test_same_game_as_in_process(self):
+        expected = HeadlessEnvironment().run(controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario).__dict__
+        _, score = self.run_game({1: BatchShooter(), 2: Shooter()})
+        self.assertEqual(score, expected)
+
+    def test_exceptions_are_counted(self):
+        game, score = self.run_game({1: FailingShooter(10, "error"), 2: Shooter()}, track_compute_cost=True,
+                                    ignore_exceptions=True)
+        self.assertEqual(score["exceptions"], [1, 0])
+        self.assertEqual(game.isolation.restarts, {})
+
+    def test_hard_timeout_restarts(self):
+        game, score = self.run_game({1: FailingShooter(10, "loop"), 2: Shooter()}, track_compute_cost=True,
+                                    controller_timeout=True)
+        self.assertEqual(score["stopping_condition"], StoppingCondition.no_time)
+        self.assertEqual(score["timeouts"], [1, 0])
+        self.assertEqual(game.isolation.restarts, {1: 1})
+
+    def test_crash_restarts(self):
+        game, score = self.run_game({1: Shooter(), 2: FailingShooter(10, "crash")}, track_compute_cost=True,
+                                    ignore_exceptions=True)
+        self.assertEqual(score["exceptions"], [0, 1])
+        self.assertEqual(game.isolation.restarts, {2: 1})
+
+    def test_unknown_settings(self):
+        self.assertRaises(ValueError, HeadlessEnvironment, settings={"controller_isolation": "container"})
+        self.assertRaises(ValueError, HeadlessEnvironment, settings={"controller_isolation": "process",
+                                                                     "controller_limits": {"disk": 1}})
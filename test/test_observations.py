@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.fuzzy_asteroids.fuzzy_asteroids import HeadlessEnvironment, Scenario
+from src.fuzzy_asteroids.observations import Columns
+
+from .test_fuzzy_game import Shooter
+
+
+class TestArrayObservations(TestCase):
+    scenario = Scenario(num_asteroids=5, seed=1, ship_states=[
+        {"position": (300, 400), "team": 1}, {"position": (700, 400), "team": 2}])
+
+    def games(self):
+        for engine in ("arcade", "numpy"):
+            games = [HeadlessEnvironment(settings={"engine": engine, "observation": observation})
+                     for observation in ("states", "arrays")]
+            for game in games:
+                game.start_new_game(controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario)
+                for _ in range(20):
+                    game.on_update(1 / game.frequency)
+            yield games
+
+    def test_matches_states(self):
+        for states_game, arrays_game in self.games():
+            states, arrays = states_game.data, arrays_game.data
+            self.assertIsInstance(arrays["asteroids"], Columns)
+
+            for key in ("asteroids", "bullets", "ships"):
+                self.assertEqual(arrays[key].count, len(states[key]))
+                self.assertEqual(len(arrays[key]), len(states[key]))
+                self.assertEqual(arrays[key].position.tolist(), [list(state["position"]) for state in states[key]])
+                self.assertEqual(arrays[key].velocity.tolist(), [list(state["velocity"]) for state in states[key]])
+                self.assertEqual(arrays[key]["angle"].tolist(), [state["angle"] for state in states[key]])
+
+            self.assertIn("size", arrays["asteroids"])
+            self.assertEqual(list(arrays["asteroids"].keys()), ["x", "y", "vx", "vy", "angle", "size"])
+            self.assertRaises(TypeError, iter, arrays["asteroids"])
+            self.assertEqual(arrays["asteroids"]["size"].tolist(), [state["size"] for state in states["asteroids"]])
+            self.assertEqual(arrays["ships"]["lives"].tolist(),
+                             [state["lives_remaining"] for state in states["ships"]])
+
+    def test_engine_views(self):
+        game = HeadlessEnvironment(settings={"engine": "numpy", "observation": "arrays"})
+        game.start_new_game(controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario)
+        asteroids = game.data["asteroids"]
+
+        self.assertTrue(np.shares_memory(asteroids["x"], game.engine.asteroids["x"]))
+        with self.assertRaises(ValueError):
+            asteroids["x"][0] = 0.0
@@ -0,0 +1,84 @@
+import copy
+from unittest import TestCase
+
+import numpy as np
+
+from src.fuzzy_asteroids.fuzzy_controller import *
+from src.fuzzy_asteroids.fuzzy_asteroids import HeadlessEnvironment, Scenario
+from src.fuzzy_asteroids.population import PopulationEvaluator
+from src.fuzzy_asteroids.util import Score
+
+
+class Tunable(ControllerBase):
+    def __init__(self, turn_rate: float, fire: float):
+        self.turn_rate = turn_rate
+        self.fire = fire
+
+    @property
+    def name(self) -> str:
+        return "Tunable"
+
+    def actions(self, ship: SpaceShip, input_data: Dict[str, Any]) -> None:
+        ship.turn_rate = self.turn_rate
+        ship.fire_bullet = self.fire > 0.5
+
+
+def build(parameters: np.ndarray) -> ControllerBase:
+    return Tunable(*parameters)
+
+
+def hits(score: Score) -> float:
+    return sum(score.asteroids_hit)
+
+
+class TestPopulationEvaluator(TestCase):
+    portfolio = [
+        Scenario(name="one", num_asteroids=4, seed=1, time_limit=2, ship_states=[{"position": (400, 400)}]),
+        Scenario(name="two", num_asteroids=6, seed=2, time_limit=2, ship_states=[
+            {"position": (300, 400), "team": 1}, {"position": (700, 400), "team": 2}]),
+    ]
+    parameters = np.array([[90.0, 1.0], [-120.0, 1.0], [45.0, 0.0]])
+
+    def test_matches_run(self):
+        with PopulationEvaluator(build, self.portfolio, hits, seeds=(None, 7), processes=1) as evaluator:
+            fitness = evaluator.evaluate(self.parameters)
+        self.assertEqual(fitness.shape, (3, 2, 2))
+
+        game = HeadlessEnvironment(settings={"prints": False})
+        for idx, parameters in enumerate(self.parameters):
+            for scenario_idx, scenario in enumerate(self.portfolio):
+                for seed_idx, seed in enumerate((1 + scenario_idx, 7)):
+                    seeded = copy.copy(scenario)
+                    seeded.seed = seed
+                    controller = build(parameters)
+                    score = game.run(controller={1: controller, 2: controller}, scenario=seeded)
+                    self.assertEqual(fitness[idx, scenario_idx, seed_idx], hits(score))
+
+        # The candidate which does not fire cannot hit anything
+        self.assertTrue((fitness[2] == 0).all())
+        self.assertTrue((fitness[:2] > 0).all())
+
+    def test_portfolio_unchanged(self):
+        # Frozen scenarios are evaluated as they are, without a copy
+        portfolio = [scenario.freeze() for scenario in self.portfolio]
+        with PopulationEvaluator(build, portfolio, hits, seeds=(None, 7), processes=1) as evaluator:
+            self.assertIs(evaluator.portfolio[0], portfolio[0])
+            first = evaluator.evaluate(self.parameters)
+            self.assertEqual([scenario.seed for scenario in portfolio], [1, 2])
+            np.testing.assert_array_equal(evaluator.evaluate(self.parameters), first)
+
+    def test_processes_agree(self):
+        with PopulationEvaluator(build, self.portfolio, hits, seeds=(3, None), processes=1) as evaluator:
+            expected = evaluator.evaluate(self.parameters)
+
+        with PopulationEvaluator(build, self.portfolio, hits, seeds=(3, None), processes=2) as evaluator:
+            # The workers stay up between generations
+            for _ in range(2):
+                np.testing.assert_array_equal(evaluator.evaluate(self.parameters), expected)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, PopulationEvaluator, build, [], hits)
+        self.assertRaises(ValueError, PopulationEvaluator, build, self.portfolio, hits, seeds=())
+        self.assertRaises(ValueError, PopulationEvaluator, build, self.portfolio, hits, processes=0)
+        with PopulationEvaluator(build, self.portfolio, hits, processes=1) as evaluator:
+            self.assertRaises(ValueError, evaluator.evaluate, [90.0, 1.0])
@@ -0,0 +1,98 @@
+import os
+import sys
+import tempfile
+import time
+from unittest import TestCase
+
+from src.fuzzy_asteroids.fuzzy_controller import *
+from src.fuzzy_asteroids.fuzzy_asteroids import HeadlessEnvironment, Scenario
+from src.fuzzy_asteroids.profiling import ControllerProfiler
+
+from .test_fuzzy_game import Shooter
+
+
+class Aiming(Shooter):
+    def nearest(self, input_data: Dict[str, Any]) -> float:
+        return min(sum(value * value for value in asteroid["position"]) for asteroid in input_data["asteroids"])
+
+    def actions(self, ship: SpaceShip, input_data: Dict[str, Any]) -> None:
+        self.nearest(input_data)
+        super().actions(ship, input_data)
+
+
+class Sleepy(Shooter):
+    def wait(self) -> None:
+        time.sleep(0.005)
+
+    def actions(self, ship: SpaceShip, input_data: Dict[str, Any]) -> None:
+        self.wait()
+        super().actions(ship, input_data)
+
+
+class SwitchInterval(Shooter):
+    def __init__(self):
+        self.intervals = []
+
+    def actions(self, ship: SpaceShip, input_data: Dict[str, Any]) -> None:
+        self.intervals.append(sys.getswitchinterval())
+        super().actions(ship, input_data)
+
+
+class TestControllerProfiler(TestCase):
+    scenario = Scenario(num_asteroids=5, seed=1, time_limit=1, ship_states=[
+        {"position": (300, 400), "team": 1}, {"position": (700, 400), "team": 2}])
+
+    def run_game(self, setting: Any, controller: ControllerBase):
+        game = HeadlessEnvironment(settings={"controller_profile": setting})
+        self.addCleanup(game.profiler.close)
+        return game.run(controller={1: controller, 2: Shooter()}, scenario=self.scenario)
+
+    def test_deterministic(self):
+        score = self.run_game({"mode": "deterministic", "every": 3}, Aiming())
+        profile, other = score.controller_profiles
+
+        self.assertEqual(profile["calls"], len(range(0, score.frame_count + 1, 3)))
+        functions = [row["function"] for row in profile["top"]]
+        self.assertTrue(any(name.startswith("Aiming.nearest") for name in functions))
+        self.assertTrue(all(row["total"] >= row["self"] for row in profile["top"]))
+        self.assertAlmostEqual(sum(row["fraction"] for row in profile["top"]), 1.0, delta=0.01)
+        self.assertEqual(other["calls"], profile["calls"])
+
+        # Collapsed stacks start at the controller call
+        for line in profile["collapsed"]:
+            stack, microseconds = line.rsplit(" ", 1)
+            self.assertTrue(stack.startswith("call_controller"))
+            self.assertGreater(int(microseconds), 0)
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "team1.folded")
+            profile.write_collapsed(path)
+            with open(path) as file:
+                self.assertEqual(file.read().splitlines(), profile["collapsed"])
+
+    def test_sampling(self):
+        score = self.run_game("sampling", Sleepy())
+        profile = score.controller_profiles[0]
+        self.assertTrue(any("Sleepy.wait" in line for line in profile["collapsed"]))
+
+    def test_switch_interval_restored(self):
+        interval = sys.getswitchinterval()
+        controller = SwitchInterval()
+        self.run_game({"mode": "sampling", "every": 2, "interval": 0.0005}, controller)
+
+        # Only lowered during the sampled calls
+        self.assertEqual(sys.getswitchinterval(), interval)
+        self.assertEqual(controller.intervals[0], 0.0005)
+        self.assertEqual(controller.intervals[1], interval)
+
+    def test_off_by_default(self):
+        game = HeadlessEnvironment()
+        score = game.run(controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario)
+        self.assertIsNone(game.profiler)
+        self.assertFalse(hasattr(score, "controller_profiles"))
+
+    def test_settings(self):
+        self.assertRaises(ValueError, ControllerProfiler, mode="tracing")
+        self.assertRaises(ValueError, ControllerProfiler, every=0)
+        self.assertRaises(ValueError, HeadlessEnvironment, settings={"controller_profile": "sampling",
+                                                                     "controller_isolation": "process"})
@@ -0,0 +1,265 @@
+import copy
+import functools
+import io
+import os
+import random
+import tempfile
+import threading
+import time
+from unittest import TestCase
+
+import numpy as np
+
+from src.fuzzy_asteroids.population import PopulationEvaluator
+from src.fuzzy_asteroids.result_cache import ResultCache, controller_fingerprint, scenario_fingerprint, \
+    simulation_settings, game_key
+from src.fuzzy_asteroids.runner import ScenarioRunner
+from src.fuzzy_asteroids.util import Scenario, Score
+
+from .test_fuzzy_game import Shooter
+from .test_population import Tunable, build, hits
+from .test_scenario_runner import Idle
+
+
+class Locked(Shooter):
+    def __init__(self):
+        self.lock = threading.Lock()
+
+
+def scaled_factory(scale):
+    return lambda parameters: Tunable(scale * parameters[0], parameters[1])
+
+
+def scaled_build(parameters, scale=1.0):
+    return Tunable(scale * parameters[0], parameters[1])
+
+
+def team_build(parameters):
+    return {1: Tunable(*parameters), 2: Idle()}
+
+
+class TestFingerprints(TestCase):
+    scenario = Scenario(name="one", num_asteroids=4, seed=1, time_limit=2)
+
+    def key(self, controller=None, scenario=None, seed=None, settings=None):
+        return game_key(controller_fingerprint(controller if controller else Shooter()),
+                        scenario_fingerprint(scenario if scenario else self.scenario, seed),
+                        simulation_settings(settings), Score)
+
+    def test_stable(self):
+        self.assertEqual(self.key(), self.key())
+        # Neither the name nor freezing the starting state changes the games of a scenario
+        renamed = copy.copy(self.scenario)
+        renamed.name = "other"
+        self.assertEqual(self.key(scenario=renamed), self.key())
+        self.assertEqual(self.key(scenario=copy.deepcopy(self.scenario).freeze()), self.key())
+        # Default settings are the same as no settings
+        self.assertEqual(self.key(settings={"engine": "arcade", "prints": False}), self.key())
+
+    def test_changes(self):
+        keys = {self.key(), self.key(controller=Idle()), self.key(seed=2), self.key(settings={"engine": "numpy"}),
+                self.key(scenario=Scenario(num_asteroids=5, seed=1, time_limit=2)),
+                self.key(controller=Tunable(90.0, 1.0)), self.key(controller=Tunable(90.0, 0.0))}
+        self.assertEqual(len(keys), 7)
+
+        # Parameters of a factory
+        self.assertNotEqual(controller_fingerprint(build, np.array([1.0, 2.0])),
+                            controller_fingerprint(build, np.array([1.0, 3.0])))
+
+    def test_callables_and_sets(self):
+        first, second = Tunable(90.0, 1.0), Tunable(90.0, 1.0)
+        first.aim, second.aim = (lambda angle: angle), (lambda angle: -angle)
+        self.assertNotEqual(self.key(controller=first), self.key(controller=second))
+
+        # Captured values are part of a function
+        def scaled(scale):
+            return lambda angle: scale * angle
+        first.aim, second.aim = scaled(1.0), scaled(2.0)
+        self.assertNotEqual(self.key(controller=first), self.key(controller=second))
+        second.aim = scaled(1.0)
+        self.assertEqual(self.key(controller=first), self.key(controller=second))
+
+        # Sets do not depend on their iteration order
+        first.targets, second.targets = {"asteroid", "ship", 3}, {3, "ship", "asteroid"}
+        self.assertEqual(controller_fingerprint(first), controller_fingerprint(second))
+
+    def test_factories(self):
+        parameters = np.array([90.0, 1.0])
+
+        # Captured values, defaults and partial arguments are part of a factory
+        self.assertNotEqual(controller_fingerprint(scaled_factory(1.0), parameters),
+                            controller_fingerprint(scaled_factory(100.0), parameters))
+        self.assertEqual(controller_fingerprint(scaled_factory(1.0), parameters),
+                         controller_fingerprint(scaled_factory(1.0), parameters))
+        self.assertNotEqual(controller_fingerprint(functools.partial(scaled_build, scale=1.0), parameters),
+                            controller_fingerprint(functools.partial(scaled_build, scale=2.0), parameters))
+
+        # So are the classes of the controllers it builds
+        self.assertNotEqual(controller_fingerprint(build, parameters)["source"],
+                            controller_fingerprint(team_build, parameters)["source"])
+        self.assertNotEqual(controller_fingerprint(build, parameters)["source"],
+                            controller_fingerprint(build)["source"])
+
+    def test_generators(self):
+        first, second = Tunable(90.0, 1.0), Tunable(90.0, 1.0)
+        first.rng, second.rng = random.Random(1), random.Random(2)
+        self.assertNotEqual(controller_fingerprint(first), controller_fingerprint(second))
+        second.rng = random.Random(1)
+        self.assertEqual(controller_fingerprint(first), controller_fingerprint(second))
+
+        first.rng, second.rng = np.random.default_rng(1), np.random.default_rng(2)
+        self.assertNotEqual(controller_fingerprint(first), controller_fingerprint(second))
+        second.rng = np.random.default_rng(1)
+        self.assertEqual(controller_fingerprint(first), controller_fingerprint(second))
+
+    def test_invalid(self):
+        controller = Tunable(90.0, 1.0)
+        controller.graph = {"controller": controller}
+        self.assertRaises(ValueError, controller_fingerprint, controller)
+        controller.graph = threading.Lock()
+        self.assertRaises(ValueError, controller_fingerprint, controller)
+        # State outside of the attributes of an object
+        controller.graph = io.StringIO("state")
+        self.assertRaises(ValueError, controller_fingerprint, controller)
+        self.assertRaises(ValueError, scenario_fingerprint, Scenario(num_asteroids=4))
+
+        # Shared references are not cycles
+        shared = [1.0, 2.0]
+        controller.graph = {"first": shared, "second": shared}
+        controller_fingerprint(controller)
+
+
+class TestResultCache(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(self.directory.name)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_put_get(self):
+        result = {"asteroids_hit": [3, (1, 2)], "value": np.float64(0.5)}
+        self.assertIsNone(self.cache.get("a"))
+        self.cache.put("a", result)
+        self.assertEqual(self.cache.get("a"), result)
+        self.assertEqual((self.cache.hits, self.cache.misses, len(self.cache)), (1, 1, 1))
+        self.assertIn("a", self.cache)
+
+        # Results are found again by another cache on the same directory
+        other = ResultCache(self.directory.name)
+        self.assertEqual(other.size, self.cache.size)
+        self.assertEqual(other.get("a"), result)
+
+    def test_invalidate_clear(self):
+        for key in "abc":
+            self.cache.put(key, key)
+        self.assertTrue(self.cache.invalidate("a"))
+        self.assertFalse(self.cache.invalidate("a"))
+        self.assertNotIn("a", self.cache)
+        self.assertEqual(len(self.cache), 2)
+
+        self.cache.clear()
+        self.assertEqual((len(self.cache), self.cache.size), (0, 0))
+
+    def test_evict_least_recently_used(self):
+        for idx, key in enumerate("abc"):
+            self.cache.put(key, bytes(1000))
+            os.utime(self.cache._path(key), (time.time() - 100 + idx, time.time() - 100 + idx))
+        # Reading a result marks it as recently used
+        self.cache.get("a")
+
+        self.assertEqual(self.cache.evict(max_bytes=2 * self.cache.size // 3), 1)
+        self.assertEqual(["a" in self.cache, "b" in self.cache, "c" in self.cache], [True, False, True])
+
+        # Past the size limit results are evicted as they are added
+        small = ResultCache(self.directory.name, max_bytes=self.cache.size)
+        small.put("d", bytes(1000))
+        self.assertEqual(len(small), 2)
+        self.assertNotIn("c", small)
+        self.assertLessEqual(small.size, small.max_bytes)
+
+        self.assertRaises(ValueError, ResultCache, self.directory.name, max_bytes=0)
+
+    def test_failed_put(self):
+        with self.assertRaises(Exception):
+            self.cache.put("a", lambda: None)
+        self.assertEqual(os.listdir(self.directory.name), [])
+        self.assertEqual((len(self.cache), self.cache.size), (0, 0))
+
+
+class TestCachedEvaluations(TestCase):
+    portfolio = [Scenario(name=f"Scenario {seed}", num_asteroids=4 + seed, seed=seed, time_limit=2)
+                 for seed in range(2)]
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_runner(self):
+        cache = ResultCache(self.directory.name)
+        runner = ScenarioRunner({"shooter": Shooter(), "idle": Idle()}, self.portfolio, cache=cache)
+        expected = runner.run_parallel(processes=2, controller_timeout=False)
+        self.assertEqual((cache.hits, len(cache)), (0, 4))
+
+        # Every game comes from the cache
+        self.assertEqual(runner.run_parallel(processes=2, controller_timeout=False), expected)
+        self.assertEqual(cache.hits, 4)
+
+        # Sequential runs time controllers out, so their games have other keys
+        runner.game = ScenarioRunner.create_environment(runner.hidden_settings, headless=True)
+        first = runner.run_all_controllers(graphics_on=False)
+        self.assertEqual(cache.hits, 4)
+        self.assertEqual(len(cache), 8)
+        self.assertEqual(runner.run_all_controllers(graphics_on=False), first)
+        self.assertEqual(cache.hits, 8)
+
+        # Unseeded games, and controllers which cannot be fingerprinted, are played every time
+        runner = ScenarioRunner({"shooter": Shooter()}, [Scenario(num_asteroids=4, time_limit=1)], cache=cache)
+        runner.run_parallel(processes=2, controller_timeout=False)
+        runner = ScenarioRunner({"locked": Locked()}, self.portfolio, cache=cache)
+        runner.game = ScenarioRunner.create_environment(runner.hidden_settings, headless=True)
+        self.assertEqual(list(runner.run_all_controllers(graphics_on=False)["Shooter"]),
+                         [scenario.name for scenario in self.portfolio])
+        self.assertEqual((cache.hits, len(cache)), (8, 8))
+
+    def test_population(self):
+        parameters = np.array([[90.0, 1.0], [45.0, 0.0]])
+        with PopulationEvaluator(build, self.portfolio, hits, seeds=(None, 7), processes=1) as evaluator:
+            expected = evaluator.evaluate(parameters)
+
+        cache = ResultCache(self.directory.name)
+        with PopulationEvaluator(build, self.portfolio, hits, seeds=(None, 7), processes=2, cache=cache) as evaluator:
+            np.testing.assert_array_equal(evaluator.evaluate(parameters), expected)
+            self.assertEqual((cache.hits, len(cache)), (0, 8))
+
+            # Only the new candidate is played
+            more = np.concatenate([parameters, [[-120.0, 1.0]]])
+            fitness = evaluator.evaluate(more)
+            np.testing.assert_array_equal(fitness[:2], expected)
+            self.assertEqual((cache.hits, len(cache)), (8, 12))
+
+        # Another fitness function is computed from the cached scores
+        with PopulationEvaluator(build, self.portfolio, lambda score: -hits(score), seeds=(None, 7), processes=1,
+                                 cache=cache) as evaluator:
+            np.testing.assert_array_equal(evaluator.evaluate(parameters), -expected)
+            self.assertEqual(cache.hits, 16)
+
+    def test_population_repeat(self):
+        # The games of the scenario seeds and of the given seeds are cached under their own keys
+        parameters = np.array([[90.0, 1.0], [-120.0, 1.0]])
+        cache = ResultCache(self.directory.name)
+        with PopulationEvaluator(build, self.portfolio, hits, seeds=(None, 7), processes=1, cache=cache) as evaluator:
+            expected = evaluator.evaluate(parameters)
+            np.testing.assert_array_equal(evaluator.evaluate(parameters), expected)
+            self.assertEqual((cache.hits, len(cache)), (8, 8))
+
+        with PopulationEvaluator(build, self.portfolio, hits, seeds=(None, 7), processes=1) as evaluator:
+            np.testing.assert_array_equal(evaluator.evaluate(parameters), expected)
+
+        # Unseeded games are played every time
+        unseeded = [Scenario(num_asteroids=4, time_limit=1)]
+        with PopulationEvaluator(build, unseeded, hits, processes=1, cache=cache) as evaluator:
+            evaluator.evaluate(parameters)
+            self.assertEqual((cache.hits, len(cache)), (8, 8))
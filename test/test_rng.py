@@ -0,0 +1,38 @@
+import random
+from unittest import TestCase
+
+from src.fuzzy_asteroids.rng import make_rng, BufferedRandom
+
+
+class TestMakeRng(TestCase):
+    def test_plain_matches_global(self):
+        random.seed(7)
+        expected = [random.random() for _ in range(5)]
+        rng = make_rng(7)
+        self.assertEqual([rng.random() for _ in range(5)], expected)
+
+    def test_buffered(self):
+        self.assertIsInstance(make_rng(7, buffer_size=16), BufferedRandom)
+        with self.assertRaises(ValueError):
+            BufferedRandom(7, buffer_size=0)
+
+
+class TestBufferedRandom(TestCase):
+    def test_reproducible(self):
+        # The values only depend on the seed, across buffer refills
+        first, second = BufferedRandom(3, buffer_size=4), BufferedRandom(3, buffer_size=4)
+        self.assertEqual([first.random() for _ in range(10)], [second.random() for _ in range(10)])
+        self.assertEqual([first.choice("abcdef") for _ in range(10)], [second.choice("abcdef") for _ in range(10)])
+
+        first.seed(3)
+        second.seed(4)
+        self.assertNotEqual([first.random() for _ in range(10)], [second.random() for _ in range(10)])
+
+    def test_state(self):
+        rng = BufferedRandom(3, buffer_size=4)
+        rng.random()
+        state = rng.getstate()
+        expected = [rng.random() for _ in range(10)]
+
+        rng.setstate(state)
+        self.assertEqual([rng.random() for _ in range(10)], expected)
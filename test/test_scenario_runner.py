@@ -1,7 +1,47 @@
 from unittest import TestCase
 
 from src.fuzzy_asteroids.runner import ScenarioRunner
+from src.fuzzy_asteroids.util import Scenario
+
+from .test_fuzzy_game import Shooter
+
+
+class Idle(Shooter):
+    @property
+    def name(self) -> str:
+        return "Idle"
+
+    def actions(self, ship, input_data) -> None:
+        pass
 
 
 class TestScenarioRunner(TestCase):
-    pass
+    portfolio = [Scenario(name=f"Scenario {seed}", num_asteroids=4, seed=seed, time_limit=2) for seed in range(3)]
+
+    # Timing dependent entries of the competition score
+    timing_keys = ("mean_eval_time", "median_eval_time", "min_eval_time", "max_eval_time", "evaluation_times",
+                   "team_evaluation_times", "evaluation_stats")
+
+    def outcome(self, results):
+        return {name: {scenario: {key: value for key, value in score.items() if key not in self.timing_keys}
+                       for scenario, score in scores.items()} for name, scores in results.items()}
+
+    def test_parallel_matches_serial(self):
+        runner = ScenarioRunner({"shooter": Shooter(), "idle": Idle()}, self.portfolio)
+        results = runner.run_parallel(processes=2, controller_timeout=False)
+
+        # Ordered by controller, then by portfolio
+        self.assertEqual(list(results), ["Shooter", "Idle"])
+        self.assertEqual(list(results["Shooter"]), [scenario.name for scenario in self.portfolio])
+
+        game = ScenarioRunner.create_environment(runner.hidden_settings, headless=True, controller_timeout=False)
+        expected = {controller.name: {scenario.name: ScenarioRunner._run_one_scenario(game, controller, scenario,
+                                                                                      None).__dict__
+                                      for scenario in runner.portfolio}
+                    for controller in (Shooter(), Idle())}
+        self.assertEqual(self.outcome(results), self.outcome(expected))
+
+    def test_parallel_needs_headless(self):
+        runner = ScenarioRunner({"shooter": Shooter()}, self.portfolio)
+        with self.assertRaises(ValueError):
+            runner.run_all_controllers(graphics_on=True, processes=2)
@@ -0,0 +1,97 @@
+import pickle
+from unittest import TestCase
+
+from src.fuzzy_asteroids.fuzzy_controller import *
+from src.fuzzy_asteroids.fuzzy_asteroids import HeadlessEnvironment, Scenario, StoppingCondition
+from src.fuzzy_asteroids.snapshot import GameSnapshot
+
+
+class Wanderer(ControllerBase):
+    @property
+    def name(self) -> str:
+        return "Wanderer"
+
+    def actions(self, ship: SpaceShip, input_data: Dict[str, Any]) -> None:
+        # Changes its decision over the game, so ships move, respawn and stop firing
+        frame = input_data["frame"]
+        ship.thrust = 200.0 if (frame // 30) % 2 else -100.0
+        ship.turn_rate = 120.0 if (frame // 45) % 2 else -60.0
+        ship.fire_bullet = frame % 7 < 4
+
+
+class TestSnapshot(TestCase):
+    scenario = Scenario(num_asteroids=8, seed=3, time_limit=8, ship_states=[
+        {"position": (300, 400), "team": 1}, {"position": (700, 400), "team": 2}])
+
+    def finish(self, game):
+        while game.game_over == StoppingCondition.none:
+            game.on_update(1 / game.frequency)
+        return dict(game.score.__dict__)
+
+    def start(self, engine, frames, **settings):
+        game = HeadlessEnvironment(settings={"engine": engine, **settings})
+        game.start_new_game(controller={1: Wanderer(), 2: Wanderer()}, scenario=self.scenario)
+        for _ in range(frames):
+            game.on_update(1 / game.frequency)
+        return game
+
+    def test_restored_game_continues_identically(self):
+        for engine in ("arcade", "numpy"):
+            expected = HeadlessEnvironment(settings={"engine": engine}).run(
+                controller={1: Wanderer(), 2: Wanderer()}, scenario=self.scenario).__dict__
+
+            game = self.start(engine, 100)
+            snapshot = game.snapshot()
+            self.assertEqual(snapshot.frame, 100)
+            self.assertEqual(self.finish(game), expected)
+
+            # Restoring many times, from the end of the game and from the middle of another branch
+            score = game.score
+            for frames in (0, 37, 0):
+                game.restore(snapshot)
+                for _ in range(frames):
+                    game.on_update(1 / game.frequency)
+                if frames:
+                    continue
+                self.assertEqual(game.game_over, StoppingCondition.none)
+                self.assertEqual(game.data["frame"], 100)
+                self.assertEqual(self.finish(game), expected)
+            self.assertIs(game.score, score)
+
+    def test_snapshot_is_independent(self):
+        game = self.start("numpy", 60)
+        snapshot = game.snapshot()
+        asteroids, hits = snapshot.asteroids.copy(), list(snapshot.score["asteroids_hit"])
+        self.finish(game)
+
+        self.assertTrue((snapshot.asteroids == asteroids).all())
+        self.assertEqual(snapshot.score["asteroids_hit"], hits)
+
+    def test_engines_agree(self):
+        snapshots = [self.start(engine, 80).snapshot() for engine in ("arcade", "numpy")]
+        for name in ("asteroids", "bullets", "ships"):
+            self.assertEqual(getattr(snapshots[0], name).tolist(), getattr(snapshots[1], name).tolist())
+        self.assertEqual(snapshots[0].score, snapshots[1].score)
+
+    def test_action_repeat(self):
+        for engine in ("arcade", "numpy"):
+            expected = self.finish(self.start(engine, 0, action_repeat=3))
+
+            # The snapshot is taken between two controller calls, with the fire orders held
+            game = self.start(engine, 50, action_repeat=3)
+            snapshot = game.snapshot()
+            self.finish(game)
+            game.restore(snapshot)
+            self.assertEqual(self.finish(game), expected)
+
+    def test_pickle(self):
+        for engine in ("arcade", "numpy"):
+            game = self.start(engine, 90)
+            snapshot = pickle.loads(pickle.dumps(game.snapshot()))
+            self.assertIsInstance(snapshot, GameSnapshot)
+            expected = self.finish(game)
+
+            # Restored in another environment with the same settings
+            other = self.start(engine, 10)
+            other.restore(snapshot)
+            self.assertEqual(self.finish(other), expected)
@@ -0,0 +1,58 @@
+import random
+from unittest import TestCase
+
+import arcade
+
+from src.fuzzy_asteroids.fuzzy_asteroids import HeadlessEnvironment, Scenario
+from src.fuzzy_asteroids.sprites import AsteroidSprite, BulletSprite, SpritePool, get_texture, BULLET_IMAGE
+from .test_fuzzy_game import Shooter
+
+
+class TestTextureCache(TestCase):
+    def test_same_texture(self):
+        self.assertIs(get_texture(BULLET_IMAGE), get_texture(BULLET_IMAGE))
+        self.assertIs(BulletSprite(30, 0.0, (0, 0)).texture, get_texture(BULLET_IMAGE))
+
+
+class TestSpritePool(TestCase):
+    def setUp(self):
+        self.pool = SpritePool(AsteroidSprite)
+        self.sprites = arcade.SpriteList()
+
+    def test_reuse_after_recycle(self):
+        asteroid = self.pool.acquire(30, position=(100, 100), size=4)
+        self.sprites.append(asteroid)
+        # Removing the asteroid releases it to the pool it came from
+        asteroid.remove_from_sprite_lists()
+
+        # Released sprites are only reused once the frame is over
+        self.assertIsNot(self.pool.acquire(30, position=(0, 0), size=2), asteroid)
+        self.pool.recycle()
+        self.assertIs(self.pool.acquire(30, position=(0, 0), size=2), asteroid)
+        self.assertEqual((self.pool.created, self.pool.reused), (2, 1))
+
+    def test_pools_per_environment(self):
+        scenario = Scenario(num_asteroids=5, seed=1, time_limit=2, ship_states=[{"position": (400, 400)}])
+        games = [HeadlessEnvironment(settings={"prints": False}) for _ in range(2)]
+        self.assertIsNot(games[0].bullet_pool, games[1].bullet_pool)
+        self.assertIsNot(games[0].asteroid_pool, games[1].asteroid_pool)
+
+        # Sprites only go back to the pools of the environment which created them
+        games[0].run(controller={1: Shooter(), 2: Shooter()}, scenario=scenario)
+        self.assertGreater(games[0].bullet_pool.reused, 0)
+        self.assertGreater(games[0].asteroid_pool.created, 5)
+        self.assertEqual((len(games[1].bullet_pool), len(games[1].asteroid_pool)), (0, 0))
+        self.assertTrue(all(asteroid.pool is games[0].asteroid_pool for asteroid in games[0].asteroid_list))
+
+    def test_reset_matches_new_sprite(self):
+        dead = AsteroidSprite(30, position=(100, 100), size=4)
+        dead.on_update()
+
+        random.seed(3)
+        dead.reset(30, position=(500, 200), size=1)
+        random.seed(3)
+        new = AsteroidSprite(30, position=(500, 200), size=1)
+
+        self.assertEqual(dead.state, new.state)
+        self.assertEqual(dead.get_adjusted_hit_box(), new.get_adjusted_hit_box())
+        self.assertEqual(dead.collision_radius, new.collision_radius)
@@ -0,0 +1,75 @@
+import random
+import statistics
+from unittest import TestCase
+
+from src.fuzzy_asteroids.fuzzy_asteroids import HeadlessEnvironment, Scenario
+from src.fuzzy_asteroids.stats import StreamingStats, EvaluationStats, combined
+
+from .test_fuzzy_game import Shooter
+
+
+class TestStreamingStats(TestCase):
+    def setUp(self):
+        rng = random.Random(1)
+        self.values = [rng.lognormvariate(-7, 1) for _ in range(5000)]
+
+    def test_matches_exact_statistics(self):
+        stats = StreamingStats()
+        for value in self.values:
+            stats.add(value)
+
+        self.assertEqual(stats.count, len(self.values))
+        self.assertAlmostEqual(stats.mean, statistics.mean(self.values))
+        self.assertAlmostEqual(stats.variance, statistics.variance(self.values))
+        self.assertEqual((stats.min, stats.max), (min(self.values), max(self.values)))
+
+        exact = statistics.quantiles(self.values, n=100)
+        for q, idx in ((0.5, 49), (0.95, 94), (0.99, 98)):
+            self.assertAlmostEqual(stats.quantile(q) / exact[idx], 1.0, delta=0.06)
+
+    def test_merge(self):
+        halves = [StreamingStats(), StreamingStats()]
+        for idx, value in enumerate(self.values):
+            halves[idx % 2].add(value)
+        whole = StreamingStats()
+        for value in self.values:
+            whole.add(value)
+
+        halves[0].merge(halves[1])
+        self.assertEqual(halves[0].histogram, whole.histogram)
+        self.assertAlmostEqual(halves[0].mean, whole.mean)
+        self.assertAlmostEqual(halves[0].variance, whole.variance)
+        self.assertRaises(ValueError, whole.merge, StreamingStats(bins_per_decade=10))
+
+    def test_empty(self):
+        summary = EvaluationStats().summary()
+        self.assertEqual((summary["count"], summary["min"], summary["p99"]), (0, 0.0, 0.0))
+
+    def test_asteroids_histogram(self):
+        stats = EvaluationStats(asteroid_bin_width=5)
+        for num_asteroids, value in ((3, 1E-4), (4, 1E-4), (12, 1E-2)):
+            stats.add(value, num_asteroids)
+
+        histogram = stats.summary()["asteroids_histogram"]
+        self.assertEqual(list(histogram["asteroids"]), ["0", "10"])
+        self.assertEqual(sum(histogram["asteroids"]["0"]), 2)
+        self.assertEqual(len(histogram["asteroids"]["10"]), len(histogram["time_bins"]))
+        self.assertEqual(combined([stats, stats]).count, 6)
+
+
+class TestEvaluationSamples(TestCase):
+    scenario = Scenario(num_asteroids=5, seed=1, time_limit=1, ship_states=[
+        {"position": (300, 400), "team": 1}, {"position": (700, 400), "team": 2}])
+
+    def test_samples_are_opt_in(self):
+        score = HeadlessEnvironment(track_compute_cost=True).run(controller={1: Shooter(), 2: Shooter()},
+                                                                 scenario=self.scenario)
+        self.assertEqual((score.evaluation_times, score.num_asteroids), ([], []))
+        self.assertEqual([stats["count"] for stats in score.evaluation_stats], [score.frame_count + 1] * 2)
+        self.assertGreater(score.mean_eval_time, 0.0)
+
+        score = HeadlessEnvironment(settings={"keep_eval_samples": True}, track_compute_cost=True).run(
+            controller={1: Shooter(), 2: Shooter()}, scenario=self.scenario)
+        self.assertEqual(len(score.evaluation_times), 2 * (score.frame_count + 1))
+        self.assertEqual(score.median_eval_time, statistics.median(score.evaluation_times))
+        self.assertEqual(score.max_eval_time, max(score.evaluation_times))
@@ -1,10 +1,52 @@
+import random
 from unittest import TestCase
 
-from src.fuzzy_asteroids.util import Scenario, Map, Score
+from src.fuzzy_asteroids.util import Scenario, FrozenScenario, Map, Score
 
 
 class TestScenario(TestCase):
-    pass
+    def test_max_asteroids_from_sizes(self):
+        scenario = Scenario(asteroid_states=[{"position": (0, 0), "size": 1}, {"position": (0, 0), "size": 3}, {}])
+        self.assertEqual(scenario.max_asteroids, 1 + 13 + 40)
+
+        scenario = Scenario(num_asteroids=5, ammo_limit_multiplier=0.5)
+        self.assertEqual(scenario.bullet_limit, 100)
+
+    def test_max_asteroids_invalid_size(self):
+        scenario = Scenario(asteroid_states=[{"position": (0, 0), "size": 5}])
+        with self.assertRaises(ValueError):
+            _ = scenario.max_asteroids
+
+
+class TestFrozenScenario(TestCase):
+    def test_cached_asteroids_match(self):
+        scenario = Scenario(num_asteroids=20, seed=4, asteroid_states=None)
+        frozen = scenario.freeze()
+        self.assertIsInstance(frozen, FrozenScenario)
+        self.assertIs(frozen.freeze(), frozen)
+
+        expected = [asteroid.state for asteroid in scenario.asteroids(30)]
+        expected_draw = random.random()
+
+        frozen.asteroids(30)
+        for _ in range(2):
+            # Served from the cache, the random number generator must end up in the same state
+            self.assertEqual([asteroid.state for asteroid in frozen.asteroids(30)], expected)
+            self.assertEqual(random.random(), expected_draw)
+
+        self.assertEqual(frozen.max_asteroids, scenario.max_asteroids)
+        self.assertEqual(frozen.bullet_limit, scenario.bullet_limit)
+
+    def test_seed_change(self):
+        frozen = Scenario(num_asteroids=3, seed=1).freeze()
+        first = [asteroid.state for asteroid in frozen.asteroids(30)]
+        frozen.seed = 2
+        self.assertNotEqual([asteroid.state for asteroid in frozen.asteroids(30)], first)
+
+    def test_read_only(self):
+        frozen = Scenario(num_asteroids=3).freeze()
+        with self.assertRaises(AttributeError):
+            frozen.time_limit = 10.0
 
 
 class TestMap(TestCase):
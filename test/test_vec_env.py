@@ -0,0 +1,54 @@
+from unittest import TestCase
+
+import numpy as np
+
+from src.fuzzy_asteroids.engine import EntityBatch, ASTEROID_FIELDS
+from src.fuzzy_asteroids.fuzzy_asteroids import HeadlessEnvironment, Scenario
+from src.fuzzy_asteroids.vec_env import VecEnv
+
+from .test_fuzzy_game import Shooter
+
+
+class TestEntityBatch(TestCase):
+    def test_rows_grow_together(self):
+        batch = EntityBatch({"x": float, "alive": bool}, num_rows=2, capacity=2)
+        for idx in range(5):
+            batch.rows[0].append(x=idx, alive=True)
+        batch.rows[1].append(x=10, alive=True)
+
+        self.assertGreaterEqual(batch.capacity, 5)
+        self.assertEqual(batch.rows[0]["x"].tolist(), [0, 1, 2, 3, 4])
+        self.assertEqual(batch["x"][1, 0], 10)
+        self.assertEqual(batch.valid().sum(axis=1).tolist(), [5, 1])
+
+
+class TestVecEnv(TestCase):
+    scenarios = [Scenario(num_asteroids=6, seed=seed, time_limit=3, ship_states=[
+        {"position": (300, 400), "team": 1}, {"position": (700, 400), "team": 2}]) for seed in range(3)]
+
+    # Same actions as the Shooter controller, NaN leaves the thrust unchanged
+    actions = {"turn_rate": np.full((3, 2), 90.0), "thrust": np.full((3, 2), np.nan),
+               "fire_bullet": np.ones((3, 2), dtype=bool)}
+
+    def test_matches_single_environments(self):
+        env = VecEnv(self.scenarios, auto_reset=False)
+        while not env.finished.all():
+            observation, done = env.step(self.actions)
+
+        for scenario, results in zip(self.scenarios, env.results):
+            expected = HeadlessEnvironment(settings={"engine": "numpy"}).run(
+                controller={1: Shooter(), 2: Shooter()}, scenario=scenario)
+            self.assertEqual(len(results), 1)
+            self.assertEqual(results[0].__dict__, expected.__dict__)
+
+    def test_auto_reset(self):
+        env = VecEnv(self.scenarios[0], num_envs=2)
+        actions = {name: values[:2] for name, values in self.actions.items()}
+        for _ in range(3 * 30 + 1):
+            observation, done = env.step(actions)
+
+        self.assertTrue(done.all())
+        self.assertEqual([len(results) for results in env.results], [1, 1])
+        self.assertEqual([score.frame_count for score in env.scores], [0, 0])
+        self.assertEqual(observation["asteroids"]["mask"].sum(axis=1).tolist(), [6, 6])
+        self.assertEqual(observation["ships"]["x"].shape, (2, 2))